@@ -0,0 +1,266 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import uuid
+from multiprocessing.pool import ThreadPool
+
+import numpy as np
+
+from audio.synthesis import batch_spectrograms
+
+# Directory backed by shared memory on Linux. Memory mapped files created inside of it never
+# touch the disk.
+SHARED_MEMORY_DIR = '/dev/shm'
+
+# Vocoder used by a worker process to invert spectrogram batches.
+# Set once by `_initialize_worker` when the worker process is started.
+_worker_vocoder = None
+
+
+class SynthesisExecutor(object):
+    """
+    Base class for executors inverting spectrogram's into audio time series on a pool of workers.
+
+    The spectrogram's passed to `synthesize` are grouped into length sorted batches
+    (see `audio.synthesis.batch_spectrograms`). Each batch is inverted by a single worker using
+    `audio.vocoders.Vocoder.invert_batch`.
+
+    The worker pool is created once and is reused by all calls to `synthesize` until `close` is
+    called. Executors can be used as context managers.
+
+    Arguments:
+        vocoder (audio.vocoders.Vocoder):
+            Vocoder used to invert the spectrogram batches.
+
+        n_workers (int):
+            Number of workers to invert batches concurrently.
+
+        batch_size (:obj:`int`, optional):
+            Maximal number of spectrogram's to invert in a single batch.
+            If None, the spectrogram's are split evenly over all workers. Defaults to None.
+    """
+
+    def __init__(self, vocoder, n_workers, batch_size=None):
+        self.vocoder = vocoder
+        self.n_workers = n_workers
+        self.batch_size = batch_size
+
+    def synthesize(self, mags):
+        """
+        Convert a list of linear scale magnitude spectrogram's into audio time series.
+
+        Arguments:
+            mags (:obj:`list` of :obj:`np.ndarray`):
+                Linear scale magnitude spectrogram's. Each spectrogram is expected to be of
+                shape=(1 + n_fft // 2, T), with T being the number of frames of the spectrogram.
+
+        Returns:
+            (:obj:`list` of :obj:`np.ndarray`):
+                Audio time series for each spectrogram in the same order as `mags`.
+                The shape of each array is shape=(hop_length * (T - 1),) and the arrays dtype is
+                np.float32.
+        """
+        if len(mags) == 0:
+            return []
+
+        batch_size = self.batch_size
+        if batch_size is None:
+            # Split the spectrogram's evenly so that every worker gets a batch.
+            batch_size = -(-len(mags) // self.n_workers)
+
+        batches = list(batch_spectrograms(mags, batch_size))
+        results = self._map(batches)
+
+        wavs = [None] * len(mags)
+        for (indices, _, lengths), audio in zip(batches, results):
+            for j, i in enumerate(indices):
+                wavs[i] = audio[j, :self.vocoder.hop_length * max(lengths[j] - 1, 0)]
+
+        return wavs
+
+    def close(self):
+        """
+        Shut down the worker pool.
+        """
+        raise NotImplementedError()
+
+    def _map(self, batches):
+        """
+        Invert a list of batches on the worker pool.
+
+        Arguments:
+            batches (:obj:`list` of :obj:`tuple`):
+                Batches as yielded by `audio.synthesis.batch_spectrograms`.
+
+        Returns:
+            (:obj:`list` of :obj:`np.ndarray`):
+                Zero padded audio time series of shape=(B, hop_length * (T_max - 1)) for each
+                batch.
+        """
+        raise NotImplementedError()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ThreadSynthesisExecutor(SynthesisExecutor):
+    """
+    Executor inverting spectrogram batches on a pool of threads.
+
+    The numpy FFT and array operations release the GIL, however the Python glue code in between
+    them does not. Hence, this backend does not scale to many cores.
+
+    See `SynthesisExecutor` for the arguments.
+    """
+
+    def __init__(self, vocoder, n_workers, batch_size=None):
+        super().__init__(vocoder, n_workers, batch_size=batch_size)
+
+        self.__pool = ThreadPool(n_workers)
+
+    def close(self):
+        self.__pool.close()
+        self.__pool.join()
+
+    def _map(self, batches):
+        def __invert(_batch):
+            _, _stacked, _lengths = _batch
+            return self.vocoder.invert_batch(_stacked, _lengths)
+
+        return self.__pool.map(__invert, batches)
+
+
+class ProcessSynthesisExecutor(SynthesisExecutor):
+    """
+    Executor inverting spectrogram batches on a persistent pool of worker processes.
+
+    Spectrogram's and the resulting audio are not pickled to be sent between the processes.
+    Instead, each batch is written into a memory mapped file in a shared memory directory which
+    the worker maps into its own address space. The worker writes the audio into a second memory
+    mapped file allocated by the executor.
+
+    Arguments:
+        start_method (:obj:`str`, optional):
+            Multiprocessing start method used to create the worker processes.
+            The default 'spawn' does not fork the (possibly multi-threaded and GPU holding)
+            parent process. Defaults to 'spawn'.
+
+    See `SynthesisExecutor` for the remaining arguments.
+    """
+
+    def __init__(self, vocoder, n_workers, batch_size=None, start_method='spawn'):
+        super().__init__(vocoder, n_workers, batch_size=batch_size)
+
+        # Place the memory mapped files in shared memory if available.
+        shared_dir = SHARED_MEMORY_DIR if os.path.isdir(SHARED_MEMORY_DIR) else None
+        self.__buffer_dir = tempfile.mkdtemp(prefix='synthesis-', dir=shared_dir)
+
+        context = multiprocessing.get_context(start_method)
+        self.__pool = context.Pool(n_workers,
+                                   initializer=_initialize_worker,
+                                   initargs=(vocoder,))
+
+    def close(self):
+        self.__pool.close()
+        self.__pool.join()
+        shutil.rmtree(self.__buffer_dir, ignore_errors=True)
+
+    def _map(self, batches):
+        hop_length = self.vocoder.hop_length
+
+        tasks = []
+        for _, stacked, lengths in batches:
+            name = uuid.uuid4().hex
+            input_path = os.path.join(self.__buffer_dir, '{}-spec.npy'.format(name))
+            output_path = os.path.join(self.__buffer_dir, '{}-audio.npy'.format(name))
+
+            # Write the spectrogram's into shared memory.
+            spectrograms = np.lib.format.open_memmap(input_path, mode='w+',
+                                                     dtype=np.float32,
+                                                     shape=stacked.shape)
+            spectrograms[...] = stacked
+            del spectrograms
+
+            # Allocate the audio buffer the worker writes its results into.
+            n_samples = hop_length * (stacked.shape[2] - 1)
+            audio = np.lib.format.open_memmap(output_path, mode='w+',
+                                              dtype=np.float32,
+                                              shape=(stacked.shape[0], n_samples))
+            del audio
+
+            tasks.append((input_path, output_path, lengths))
+
+        try:
+            self.__pool.map(_invert_shared_batch, tasks)
+
+            results = []
+            for input_path, output_path, _ in tasks:
+                results.append(np.array(np.load(output_path, mmap_mode='r')))
+        finally:
+            for input_path, output_path, _ in tasks:
+                os.remove(input_path)
+                os.remove(output_path)
+
+        return results
+
+
+# Available executor backends, addressable by name.
+EXECUTOR_BACKENDS = {
+    'thread': ThreadSynthesisExecutor,
+    'process': ProcessSynthesisExecutor
+}
+
+
+def create_executor(backend, vocoder, n_workers, batch_size=None):
+    """
+    Create a synthesis executor by backend name.
+
+    Arguments:
+        backend (str):
+            Name of the executor backend. One of `EXECUTOR_BACKENDS`.
+
+    See `SynthesisExecutor` for the remaining arguments.
+
+    Returns:
+        SynthesisExecutor
+    """
+    if backend not in EXECUTOR_BACKENDS:
+        raise ValueError('Unknown synthesis backend "{}". Available backends: {}.'
+                         .format(backend, ', '.join(sorted(EXECUTOR_BACKENDS))))
+
+    return EXECUTOR_BACKENDS[backend](vocoder, n_workers, batch_size=batch_size)
+
+
+def _initialize_worker(vocoder):
+    """
+    Store the vocoder in a newly started worker process.
+
+    Arguments:
+        vocoder (audio.vocoders.Vocoder):
+            Vocoder used to invert the spectrogram batches.
+    """
+    global _worker_vocoder
+    _worker_vocoder = vocoder
+
+
+def _invert_shared_batch(task):
+    """
+    Invert a batch of spectrogram's stored in shared memory inside a worker process.
+
+    Arguments:
+        task (tuple):
+            Tuple (input_path, output_path, lengths) of the memory mapped spectrogram batch, the
+            memory mapped audio buffer and the number of frames of each spectrogram.
+    """
+    input_path, output_path, lengths = task
+
+    spectrograms = np.load(input_path, mmap_mode='r')
+    audio = _worker_vocoder.invert_batch(spectrograms, lengths)
+
+    output = np.load(output_path, mmap_mode='r+')
+    output[...] = audio
+    output.flush()
@@ -1,6 +1,10 @@
+import functools
+
 import librosa
 import numpy as np
 
+from audio.conversion import ms_to_samples
+
 
 def mel_scale_spectrogram(wav, n_fft, sampling_rate, n_mels, fmin, fmax, hop_length, win_length,
                           power):
@@ -70,18 +74,13 @@ def mel_scale_spectrogram(wav, n_fft, sampling_rate, n_mels, fmin, fmax, hop_len
     # Return shape: (n_fft/2 + 1, n_frames).
     linear_spec = mag_spec ** power
 
-    # Create a filter-bank matrix to combine FFT bins into Mel-frequency bins.
+    # Get the (cached) filter-bank matrix to combine FFT bins into Mel-frequency bins.
     # Return shape: (n_mels, n_fft/2 + 1).
-    mel_basis = librosa.filters.mel(sr=sampling_rate,
-                                    n_fft=n_fft,
-                                    n_mels=n_mels,
-                                    fmin=fmin,
-                                    fmax=fmax,
-                                    htk=True)
+    mel_filters = mel_basis(sampling_rate, n_fft, n_mels, fmin, fmax)
 
     # Apply Mel-filters to create a Mel-scaled spectrogram.
     # Return shape: (n_mels, n_frames).
-    mel_spec = np.dot(mel_basis, linear_spec)
+    mel_spec = np.dot(mel_filters, linear_spec)
 
     return mel_spec
 
@@ -143,3 +142,157 @@ def linear_scale_spectrogram(wav, n_fft, hop_length=None, win_length=None):
             The shape is of the matrix will be shape=(1 + n_fft/2, t).
     """
     return librosa.stft(wav, n_fft=n_fft, hop_length=hop_length, win_length=win_length)
+
+
+@functools.lru_cache(maxsize=None)
+def mel_basis(sampling_rate, n_fft, n_mels, fmin, fmax):
+    """
+    Create a filter-bank matrix to combine FFT bins into Mel-frequency bins.
+
+    The matrix is only created once for each distinct configuration and is cached afterwards.
+    The returned array is shared by all callers and therefore read-only.
+
+    Arguments:
+        sampling_rate (int):
+            Sampling rate of the audio time series the filters are applied to.
+
+        n_fft (int):
+            FFT window size.
+
+        n_mels (int):
+            Number of Mel bands to generate.
+
+        fmin (float):
+            Lowest frequency (in Hz).
+
+        fmax (float):
+            Highest frequency (in Hz).
+            If `None`, use `fmax = sampling_rate / 2.0`.
+
+    Returns:
+        np.ndarray:
+            Mel filter-bank matrix of shape=(n_mels, 1 + n_fft // 2).
+    """
+    basis = librosa.filters.mel(sr=sampling_rate,
+                                n_fft=n_fft,
+                                n_mels=n_mels,
+                                fmin=fmin,
+                                fmax=fmax,
+                                htk=True)
+
+    # Prevent callers from modifying the cached matrix in place.
+    basis.flags.writeable = False
+
+    return basis
+
+
+class FeatureExtractor(object):
+    """
+    Joint extraction of linear scale and Mel scale magnitude spectrogram's from audio time series.
+
+    Both spectrogram's are derived from a single STFT of the signal. The results are identical to
+    calling `linear_scale_spectrogram` and `mel_scale_spectrogram` separately, which calculates
+    the STFT twice.
+
+    Arguments:
+        sampling_rate (int):
+            Sampling rate of the audio time series.
+
+        n_fft (int):
+            FFT window size.
+
+        hop_length (int):
+            Number of audio samples to hop between frames.
+
+        win_length (int):
+            Length of each frame in audio samples.
+            The window length is required to fulfill the condition `win_length` <= `n_fft`.
+
+        n_mels (int):
+            Number of Mel bands to generate.
+
+        fmin (float):
+            Lowest frequency (in Hz).
+
+        fmax (float):
+            Highest frequency (in Hz).
+            If `None`, use `fmax = sampling_rate / 2.0`.
+
+        power (:obj:`float`, optional):
+            Exponent for the magnitudes of the linear-scale spectrogram the Mel-scaled spectrogram
+            is calculated from. Defaults to 1.
+    """
+
+    def __init__(self, sampling_rate, n_fft, hop_length, win_length, n_mels, fmin, fmax,
+                 power=1):
+        self.sampling_rate = sampling_rate
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.win_length = win_length
+        self.n_mels = n_mels
+        self.fmin = fmin
+        self.fmax = fmax
+        self.power = power
+
+    @classmethod
+    def from_params(cls, hparams, sampling_rate=None):
+        """
+        Create a feature extractor configured by the model hyper-parameters.
+
+        Arguments:
+            hparams (tf.contrib.training.HParams):
+                Model hyper-parameters (see `tacotron.params.model`).
+
+            sampling_rate (:obj:`int`, optional):
+                Sampling rate of the audio time series to extract features from.
+                If None, `hparams.sampling_rate` is used. Defaults to None.
+
+        Returns:
+            FeatureExtractor
+        """
+        if sampling_rate is None:
+            sampling_rate = hparams.sampling_rate
+
+        # The window parameters are configured in milliseconds relative to the models rate.
+        return cls(sampling_rate=sampling_rate,
+                   n_fft=hparams.n_fft,
+                   hop_length=ms_to_samples(hparams.win_hop, hparams.sampling_rate),
+                   win_length=ms_to_samples(hparams.win_len, hparams.sampling_rate),
+                   n_mels=hparams.n_mels,
+                   fmin=hparams.mel_fmin,
+                   fmax=hparams.mel_fmax)
+
+    def extract(self, wav):
+        """
+        Calculate the linear scale and the Mel scale magnitude spectrogram of a signal.
+
+        Arguments:
+            wav (np.ndarray):
+                Audio time series.
+                The shape is expected to be shape=(n,).
+
+        Returns:
+            (np.ndarray, np.ndarray):
+                linear_mag (np.ndarray):
+                    Linear scale magnitude spectrogram of shape=(1 + n_fft // 2, t).
+
+                mel_spec (np.ndarray):
+                    Mel scale spectrogram of shape=(n_mels, t).
+        """
+        # Short-time Fourier transform of the signal, calculated only once for both features.
+        stft = librosa.stft(y=wav,
+                            n_fft=self.n_fft,
+                            hop_length=self.hop_length,
+                            win_length=self.win_length)
+
+        # Extract the magnitudes from the linear-scale spectrogram.
+        linear_mag = np.abs(stft)
+
+        # Raise the linear-scale spectrogram magnitudes to the power of `power`.
+        linear_spec = linear_mag if self.power == 1 else linear_mag ** self.power
+
+        # Apply the cached Mel-filters to create a Mel-scaled spectrogram.
+        filters = mel_basis(self.sampling_rate, self.n_fft, self.n_mels, self.fmin, self.fmax)
+        mel_spec = np.dot(filters, linear_spec)
+
+        return linear_mag, mel_spec
@@ -1,3 +1,6 @@
+import io
+import wave
+
 import librosa
 import numpy as np
 
@@ -51,3 +54,42 @@ def save_wav(wav_path, wav, sampling_rate, norm=False):
             For floating point `wav`, scale the data to the range [-1, +1].
     """
     librosa.output.write_wav(wav_path, wav.astype(np.float32), sampling_rate, norm=norm)
+
+
+def wav_to_bytes(wav, sampling_rate, norm=False):
+    """
+    Encode a mono waveform as 16 bit PCM WAV file in memory.
+
+    Arguments:
+        wav (np.ndarray):
+            Floating point audio time series in the range [-1, +1] of shape=(n,).
+
+        sampling_rate (int):
+            Sampling rate of `wav`.
+
+        norm (:obj:`bool`, optional):
+            Enable amplitude normalization.
+            Scale the data to the range [-1, +1] before encoding it.
+
+    Returns:
+        bytes:
+            Content of the WAV file.
+    """
+    wav = wav.astype(np.float32)
+
+    if norm:
+        peak = np.max(np.abs(wav)) if len(wav) > 0 else 0.0
+        if peak > 0.0:
+            wav = wav / peak
+
+    # Convert the samples into 16 bit integers.
+    samples = (np.clip(wav, -1.0, 1.0) * np.iinfo(np.int16).max).astype('<i2')
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sampling_rate)
+        wav_file.writeframes(samples.tobytes())
+
+    return buffer.getvalue()
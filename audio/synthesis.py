@@ -1,6 +1,13 @@
-import librosa
+import inspect
+
 import numpy as np
 
+# Writing FFT results into existing arrays (`out` argument) is only supported by numpy >= 2.0.
+try:
+    _FFT_SUPPORTS_OUT = 'out' in inspect.signature(np.fft.rfft).parameters
+except (TypeError, ValueError):
+    _FFT_SUPPORTS_OUT = False
+
 
 def spectrogram_to_wav(mag, win_length, hop_length, n_fft, n_iter):
     """
@@ -75,51 +82,841 @@ def griffin_lim_v2(spectrogram, win_length, hop_length, n_fft, n_iter):
     """
     # Based on: https://github.com/librosa/librosa/issues/434
 
-    mse = None
-
-    # TODO: The code is extremely slow. We should try to implement a faster version.
-    # TODO: Another approach to speed this up could be to implement it on the gpu using tf.signal.
-    window = 'hann'
+    # All buffers required by the iterations are allocated once and updated in place.
+    workspace = GriffinLimWorkspace(spectrogram[np.newaxis, ...], None,
+                                    win_length=win_length,
+                                    hop_length=hop_length,
+                                    n_fft=n_fft)
 
     # Initialize the phase component.
-    angles = np.exp(2j * np.pi * np.random.rand(*spectrogram.shape))
+    workspace.initialize_phase()
 
     # Note: Instead of randomly initializing an estimated signal (just to immediately replace its
     # magnitude components during the first reconstruction iteration) we only randomly initialize
     # the phases.
 
-    for i in range(n_iter):
-        # Substitution of the estimated STFT magnitudes (STFTM) with the given target STFTM.
-        full = np.abs(spectrogram).astype(np.complex) * angles
+    mse = None
+    for _ in range(n_iter):
+        # Substitute the target magnitudes, revert the estimated STFT back into a time domain
+        # signal, compute its STFT and extract the phase components.
+        workspace.iterate()
 
-        # Revert the estimated STFT back into a time domain signal.
-        estimated_signal = librosa.istft(full,
-                                         win_length=win_length,
-                                         hop_length=hop_length,
-                                         window=window)
+    if n_iter > 0:
+        # Reconstruction quality measurement.
+        mse = workspace.mse()[0]
 
-        # Compute the STFT from the estimated time domain signal.
-        estimated_stft = librosa.stft(estimated_signal,
-                                      n_fft=n_fft,
-                                      win_length=win_length,
-                                      hop_length=hop_length,
-                                      window=window)
+    # Revert the final estimated STFT back into a time domain signal.
+    audio = workspace.synthesize()
 
-        # Extract the phase components from the estimated STFT.
-        angles = np.exp(1j * np.angle(estimated_stft))
+    return audio[0], mse
 
-        # Reconstruction quality measurement.
-        mse = np.square(np.abs(spectrogram) - np.abs(estimated_stft)).mean()
-        # For debugging purposes only.
-        # print("iter: {}, mse: {}".format(i + 1, mse))
 
-    # Calculate the final estimate STFT.
-    full = np.abs(spectrogram).astype(np.complex) * angles
+def spectrograms_to_wavs(mags, win_length, hop_length, n_fft, n_iter, batch_size=None,
+                         momentum=0.0, tolerance=None):
+    """
+    Convert a list of linear scale magnitude spectrogram's into audio time series.
+
+    The spectrogram's are sorted by their length and inverted in batches of `batch_size`
+    spectrogram's (see `batch_spectrograms`) using `griffin_lim_batch`. Sorting keeps the amount
+    of padding frames in each batch small.
+
+    Arguments:
+        mags (:obj:`list` of :obj:`np.ndarray`):
+            Linear scale magnitude spectrogram's. Each spectrogram is expected to be of
+            shape=(1 + n_fft // 2, T), with T being the number of frames of the spectrogram.
+
+        win_length (int):
+            Length of each frame in audio samples.
+            The window length is required to fulfill the condition `win_length` <= `n_fft`.
+
+        hop_length (int):
+            Number of audio samples to hop between frames.
+
+        n_fft (int):
+            FFT window size.
+
+        n_iter (int):
+            Number of reconstruction iterations used for the Griffin-Lim algorithm.
+
+        batch_size (:obj:`int`, optional):
+            Maximal number of spectrogram's to invert in a single batch.
+            If None, all spectrogram's are inverted in a single batch. Defaults to None.
+
+        momentum (:obj:`float`, optional):
+            Momentum of the fast Griffin-Lim phase update. See `griffin_lim_batch`.
+            Defaults to 0.0.
+
+        tolerance (:obj:`float`, optional):
+            Spectral convergence improvement below which the reconstruction of a batch is stopped
+            early. See `griffin_lim_batch`. Defaults to None.
+
+    Returns:
+        (:obj:`list` of :obj:`np.ndarray`):
+            Audio time series for each spectrogram in the same order as `mags`.
+            The shape of each array is shape=(hop_length * (T - 1),) and the arrays dtype is
+            np.float32.
+    """
+    wavs = [None] * len(mags)
+    for indices, stacked, lengths in batch_spectrograms(mags, batch_size):
+        audio, audio_lengths, _, _ = griffin_lim_batch(stacked, lengths,
+                                                       win_length=win_length,
+                                                       hop_length=hop_length,
+                                                       n_fft=n_fft,
+                                                       n_iter=n_iter,
+                                                       momentum=momentum,
+                                                       tolerance=tolerance)
+
+        for j, i in enumerate(indices):
+            wavs[i] = audio[j, :audio_lengths[j]]
+
+    return wavs
+
+
+def batch_spectrograms(mags, batch_size=None):
+    """
+    Group spectrogram's of different length into zero padded batches.
+
+    The spectrogram's are sorted by their length before being grouped, which keeps the amount of
+    padding frames in each batch small.
+
+    Arguments:
+        mags (:obj:`list` of :obj:`np.ndarray`):
+            Linear scale magnitude spectrogram's. Each spectrogram is expected to be of
+            shape=(1 + n_fft // 2, T), with T being the number of frames of the spectrogram.
+
+        batch_size (:obj:`int`, optional):
+            Maximal number of spectrogram's in a single batch.
+            If None, all spectrogram's are put into a single batch. Defaults to None.
+
+    Yields:
+        (indices, stacked, lengths):
+            indices (:obj:`list` of int):
+                Positions of the batched spectrogram's in `mags`.
+            stacked (np.ndarray):
+                Zero padded spectrogram's of shape=(B, 1 + n_fft // 2, T_max) and dtype
+                np.float32.
+            lengths (:obj:`list` of int):
+                Number of frames of each batched spectrogram.
+    """
+    n_mags = len(mags)
+    if batch_size is None:
+        batch_size = max(1, n_mags)
+
+    # Sort the spectrogram's by length to minimize the padding inside each batch.
+    order = sorted(range(n_mags), key=lambda i: mags[i].shape[1])
+
+    for start in range(0, n_mags, batch_size):
+        indices = order[start:start + batch_size]
+        lengths = [mags[i].shape[1] for i in indices]
+
+        # Zero pad all spectrogram's in the time axis to the longest one in the batch.
+        stacked = np.zeros((len(indices), mags[indices[0]].shape[0], max(lengths)),
+                           dtype=np.float32)
+        for j, i in enumerate(indices):
+            stacked[j, :, :lengths[j]] = mags[i]
+
+        yield indices, stacked, lengths
+
+
+def spectrogram_to_wav_stream(mag, win_length, hop_length, n_fft, n_iter, block_length=64,
+                              overlap=8, momentum=0.0, angles=None):
+    """
+    Convert a linear scale magnitude spectrogram into an audio time series block by block.
+
+    The spectrogram is split into blocks of `block_length` frames, with consecutive blocks
+    sharing `overlap` frames. Each block is inverted separately using `n_iter` Griffin-Lim
+    iterations. The phases of the frames a block shares with its predecessor are initialized
+    with the final phase estimate of the predecessor, so that both reconstructions stay
+    coherent. The audio of the shared frames is linearly cross-faded between both blocks.
+
+    Audio is yielded as soon as it is final, i.e. the first chunk is available after the first
+    block has been inverted instead of after the whole spectrogram.
+
+    Arguments:
+        mag (np.ndarray):
+            Linear scale magnitude spectrogram of shape=(1 + n_fft // 2, T).
+
+        win_length (int):
+            Length of each frame in audio samples.
+            The window length is required to fulfill the condition `win_length` <= `n_fft`.
+
+        hop_length (int):
+            Number of audio samples to hop between frames.
+
+        n_fft (int):
+            FFT window size.
+
+        n_iter (int):
+            Number of reconstruction iterations used for each block.
+
+        block_length (:obj:`int`, optional):
+            Number of frames in each block. Defaults to 64.
+
+        overlap (:obj:`int`, optional):
+            Number of frames shared by consecutive blocks.
+            The overlap is required to fulfill the condition 2 <= `overlap` < `block_length`.
+            Defaults to 8.
+
+        momentum (:obj:`float`, optional):
+            Momentum of the fast Griffin-Lim phase update. See `griffin_lim_batch`.
+            Defaults to 0.0.
+
+        angles (:obj:`np.ndarray`, optional):
+            Complex unit phases of shape=(1 + n_fft // 2, T) used to initialize each block.
+            If None, the phases are initialized randomly. Setting `n_iter` to 0 only splits the
+            inversion of a given phase estimate into blocks. Defaults to None.
+
+    Yields:
+        np.ndarray:
+            Consecutive chunks of the audio time series with dtype np.float32.
+            The concatenation of all chunks has the shape=(hop_length * (T - 1),).
+    """
+    assert 2 <= overlap < block_length, \
+        'The overlap is required to fulfill the condition 2 <= overlap < block_length.'
+
+    n_frames = mag.shape[1]
+    step = block_length - overlap
+
+    # Linear cross-fade over the audio samples spanned by the shared frames.
+    n_fade = hop_length * (overlap - 1)
+    fade_in = (np.arange(n_fade, dtype=np.float32) + 0.5) / n_fade
+
+    # Audio of the shared frames of the previous block and the final phases of these frames.
+    tail = None
+    tail_angles = None
+
+    for start in range(0, max(n_frames - overlap, 1), step):
+        end = min(start + block_length, n_frames)
+        is_last = end == n_frames
+
+        workspace = GriffinLimWorkspace(mag[np.newaxis, :, start:end], None,
+                                        win_length=win_length,
+                                        hop_length=hop_length,
+                                        n_fft=n_fft)
+
+        # Initialize the phase component, warm starting the frames shared with the last block.
+        if angles is None:
+            workspace.initialize_phase()
+        else:
+            workspace.initialize_phase(angles[np.newaxis, :, start:end])
+        if tail_angles is not None:
+            workspace.angles[0, :overlap] = tail_angles
+
+        for _ in range(n_iter):
+            workspace.iterate(momentum)
+
+        audio = workspace.synthesize()[0]
+
+        # Cross-fade the audio of the shared frames with the tail of the previous block.
+        if tail is not None:
+            audio[:n_fade] = tail * (1.0 - fade_in) + audio[:n_fade] * fade_in
+
+        if is_last:
+            yield audio
+            return
+
+        # Keep the shared frames until the next block has been inverted.
+        yield audio[:hop_length * step]
+        tail = audio[hop_length * step:]
+        tail_angles = workspace.angles[0, step:].copy()
+
+
+def phase_gradient_integration(mag, win_length, hop_length, n_fft, tolerance=1e-5):
+    """
+    Estimate the phase of a linear scale magnitude spectrogram without iterations by
+    integrating the phase gradient derived from the magnitudes [1].
+
+    For a Gaussian window the time and frequency derivatives of the STFT phase are fully
+    determined by the frequency and time derivatives of the log-magnitudes. The Hann window used
+    for the STFT is approximated by a Gaussian window with λ = 0.25645 * `win_length` ** 2.
+
+    Instead of the heap traversal of [1], the gradient is integrated frame by frame in a
+    vectorized manner (similar to the real-time variant of PGHI): the phase of each spectral peak
+    is integrated along time from the previous frame, all other bins are integrated along
+    frequency starting at their nearest peak.
+
+    References:
+        [1] Prusa, Z., Balazs, P., & Sondergaard, P. L. (2017).
+            A Noniterative Method for Reconstruction of Phase From STFT Magnitude.
+            IEEE/ACM Transactions on Audio, Speech, and Language Processing, 25(5), 1154-1164.
+
+    Arguments:
+        mag (np.ndarray):
+            Linear scale magnitude spectrogram of shape=(1 + n_fft // 2, T).
+
+        win_length (int):
+            Length of each frame in audio samples.
+            The window length is required to fulfill the condition `win_length` <= `n_fft`.
+
+        hop_length (int):
+            Number of audio samples to hop between frames.
+
+        n_fft (int):
+            FFT window size.
+
+        tolerance (:obj:`float`, optional):
+            Peaks with a magnitude below `tolerance` times the maximal magnitude are ignored.
+            Defaults to 1e-5.
+
+    Returns:
+        np.ndarray:
+            Complex unit phases of shape=(1 + n_fft // 2, T).
+    """
+    # Work on frame major magnitudes, shape => (T, 1 + n_fft // 2).
+    magnitudes = np.abs(mag).T
+    n_frames, n_bins = magnitudes.shape
+    bins = np.arange(n_bins)
+
+    # Time-frequency ratio of the Gaussian window approximating the Hann window.
+    gamma = 0.25645 * win_length ** 2
+
+    log_magnitudes = np.log(np.maximum(magnitudes, 1e-10))
+
+    # Phase derivative along time (radians per hop).
+    time_gradient = 2.0 * np.pi * hop_length * bins / n_fft
+    time_gradient = time_gradient + (hop_length * n_fft / gamma) * np.gradient(log_magnitudes,
+                                                                              axis=1)
+
+    # Phase derivative along frequency (radians per bin). The additional -pi per bin accounts for
+    # the phase being referenced to the start instead of the center of each frame.
+    frequency_gradient = -(gamma / (hop_length * n_fft)) * np.gradient(log_magnitudes, axis=0)
+    frequency_gradient -= np.pi
+
+    # Trapezoidal integral of the frequency derivative starting at the first bin of each frame.
+    frequency_integral = np.zeros_like(frequency_gradient)
+    frequency_integral[:, 1:] = np.cumsum(
+        0.5 * (frequency_gradient[:, 1:] + frequency_gradient[:, :-1]), axis=1)
+
+    threshold = tolerance * magnitudes.max()
+
+    phase = np.zeros_like(magnitudes)
+    for n in range(n_frames):
+        frame = magnitudes[n]
+
+        # Local maxima along frequency that are not negligible.
+        is_peak = np.zeros(n_bins, dtype=bool)
+        is_peak[1:-1] = (frame[1:-1] >= frame[:-2]) & (frame[1:-1] > frame[2:])
+        is_peak &= frame > threshold
+        peaks = np.flatnonzero(is_peak)
+
+        if len(peaks) == 0:
+            continue
+
+        # Integrate the phase of the peaks along time (trapezoidal rule).
+        if n > 0:
+            phase[n, peaks] = phase[n - 1, peaks] + 0.5 * (time_gradient[n - 1, peaks] +
+                                                           time_gradient[n, peaks])
+
+        # Assign each bin to its nearest peak.
+        right = np.minimum(np.searchsorted(peaks, bins), len(peaks) - 1)
+        left = np.maximum(right - 1, 0)
+        owner = np.where(bins - peaks[left] <= peaks[right] - bins, peaks[left], peaks[right])
+
+        # Integrate the phase of all other bins along frequency starting at their peak.
+        phase[n] = phase[n, owner] + frequency_integral[n] - frequency_integral[n, owner]
+
+    return np.exp(1j * phase).T
+
+
+def griffin_lim_batch(spectrograms, lengths, win_length, hop_length, n_fft, n_iter, momentum=0.0,
+                      tolerance=None):
+    """
+    Applies Griffin-Lim reconstruction to a batch of zero padded spectrogram's at once.
+
+    Every iteration inverts and re-analyses the whole batch with a single vectorized FFT call
+    each. The analysis window, the overlap-add normalization and the reflect padding indices are
+    calculated only once and are reused by all iterations.
+
+    The results match `griffin_lim_v2` (up to the random phase initialization) for each batch
+    entry, since the normalization and padding is calculated separately for each entry length.
+
+    Setting `momentum` > 0 enables the fast Griffin-Lim algorithm (FGLA) [1], which extrapolates
+    each phase estimate along the difference to the previous estimate and converges in far fewer
+    iterations. Setting `tolerance` stops the iteration once the spectral convergence of no
+    batch entry improves by more than `tolerance` between two iterations.
+
+    References:
+        [1] Perraudin, N., Balazs, P., & Sondergaard, P. L. (2013).
+            A fast Griffin-Lim algorithm. In 2013 IEEE Workshop on Applications of Signal
+            Processing to Audio and Acoustics (pp. 1-4).
+
+    Arguments:
+        spectrograms (np.ndarray):
+            Linear scale magnitude spectrogram's. The shape is expected to be
+            shape=(B, 1 + n_fft // 2, T_max), with B being the batch size and T_max being the
+            number of frames of the longest spectrogram. Shorter spectrogram's are expected to be
+            zero padded in the time axis.
+
+        lengths (:obj:`list` of int):
+            Number of valid (non padding) frames for each spectrogram in the batch.
+            If None, all spectrogram's are considered to have T_max frames.
+
+        win_length (int):
+            Length of each frame in audio samples.
+            The window length is required to fulfill the condition `win_length` <= `n_fft`.
+
+        hop_length (int):
+            Number of audio samples to hop between frames.
+
+        n_fft (int):
+            FFT window size.
+
+        n_iter (int):
+            Number of reconstruction iterations to be used.
+            If `tolerance` is set, this is the maximal number of iterations.
+
+        momentum (:obj:`float`, optional):
+            Momentum of the fast Griffin-Lim phase update. A value of 0.0 results in the original
+            Griffin-Lim algorithm. Values around 0.99 are recommended for FGLA. Defaults to 0.0.
+
+        tolerance (:obj:`float`, optional):
+            Spectral convergence improvement below which the iteration is stopped early.
+            If None, exactly `n_iter` iterations are performed. Defaults to None.
+
+    Returns:
+        (audio, audio_lengths, mse, n_iterations):
+            audio (np.ndarray):
+                Zero padded audio time series. The shape of the returned array is
+                shape=(B, hop_length * (T_max - 1)) and the arrays dtype is np.float32.
+            audio_lengths (np.ndarray):
+                Number of valid audio samples for each batch entry.
+                The shape of the returned array is shape=(B,).
+            mse (np.ndarray):
+                Mean-squared reconstruction error for each batch entry.
+                The shape of the returned array is shape=(B,).
+            n_iterations (int):
+                Number of reconstruction iterations that were actually performed.
+    """
+    # All buffers required by the iterations are allocated once and updated in place.
+    workspace = GriffinLimWorkspace(spectrograms, lengths,
+                                    win_length=win_length,
+                                    hop_length=hop_length,
+                                    n_fft=n_fft)
+
+    # Initialize the phase component.
+    workspace.initialize_phase()
+
+    previous_convergence = None
+    for _ in range(n_iter):
+        workspace.iterate(momentum)
+
+        # Stop once no entry improves its spectral convergence by more than the tolerance.
+        if tolerance is not None:
+            convergence = workspace.spectral_convergence()
+            if previous_convergence is not None \
+                    and np.all(previous_convergence - convergence < tolerance):
+                break
+            previous_convergence = convergence
+
+    # Reconstruction quality measurement of the last iteration.
+    mse = None
+    if workspace.n_iterations > 0:
+        mse = workspace.mse()
+
+    # Revert the final STFT estimate back into time domain signals.
+    audio = workspace.synthesize()
+
+    return audio, workspace.audio_lengths, mse, workspace.n_iterations
+
+
+class GriffinLimWorkspace:
+    """
+    Buffers and precomputed constants for the Griffin-Lim reconstruction of a batch of
+    zero padded spectrogram's.
+
+    The target magnitudes, the phase estimate, the FFT input and output arrays and the
+    overlap-add buffer are allocated once when the workspace is created. Each iteration updates
+    them in place, so no temporary arrays are allocated inside the reconstruction loop (given
+    numpy >= 2.0, older versions do not support writing FFT results into existing arrays).
+
+    The analysis window, the overlap-add normalization and the reflect padding indices are
+    calculated separately for each entry length, so that the results of each entry match the
+    unbatched reconstruction.
+
+    Arguments:
+        spectrograms (np.ndarray):
+            Linear scale magnitude spectrogram's. The shape is expected to be
+            shape=(B, 1 + n_fft // 2, T_max), with B being the batch size and T_max being the
+            number of frames of the longest spectrogram. Shorter spectrogram's are expected to be
+            zero padded in the time axis.
+
+        lengths (:obj:`list` of int):
+            Number of valid (non padding) frames for each spectrogram in the batch.
+            If None, all spectrogram's are considered to have T_max frames.
+
+        win_length (int):
+            Length of each frame in audio samples.
+            The window length is required to fulfill the condition `win_length` <= `n_fft`.
+
+        hop_length (int):
+            Number of audio samples to hop between frames.
+
+        n_fft (int):
+            FFT window size.
+
+        dtype (:obj:`np.dtype`, optional):
+            Floating point type of the buffers. The complex buffers use the matching complex
+            type. Defaults to `np.float32`. Single precision halves the memory traffic of each
+            iteration and numpy >= 2.0 computes the FFTs in single precision, while the
+            reconstruction quality is limited by the phase estimate rather than the precision.
+    """
+
+    def __init__(self, spectrograms, lengths, win_length, hop_length, n_fft, dtype=np.float32):
+        n_batch, n_bins, n_frames = spectrograms.shape
+        if lengths is None:
+            lengths = [n_frames] * n_batch
+        lengths = np.asarray(lengths, dtype=np.int64)
+
+        self.hop_length = hop_length
+        self.n_fft = n_fft
+        self.lengths = lengths
+
+        # Real and complex data types of the buffers.
+        self.dtype = np.dtype(dtype)
+        complex_dtype = np.result_type(self.dtype, np.complex64)
+
+        # Number of reconstruction iterations performed so far.
+        self.n_iterations = 0
+
+        # Work on frame major spectrogram's, shape => (B, T_max, 1 + n_fft // 2).
+        self.magnitudes = np.ascontiguousarray(np.transpose(np.abs(spectrograms), (0, 2, 1)),
+                                               dtype=self.dtype)
+
+        # Mask marking the valid frames of each batch entry, shape => (B, T_max, 1).
+        self.frame_mask = (np.arange(n_frames)[np.newaxis, :] < lengths[:, np.newaxis])
+        self.frame_mask = self.frame_mask[..., np.newaxis]
+
+        # Norm of the target magnitudes used to calculate the spectral convergence of each entry.
+        self.magnitude_norms = np.maximum(
+            np.sqrt(np.square(self.magnitudes, dtype=np.float64).sum(axis=(1, 2))), 1e-16)
+
+        # Number of samples in the (non padded) estimated signals.
+        n_samples = hop_length * (n_frames - 1)
+        self.audio_lengths = hop_length * np.maximum(lengths - 1, 0)
+
+        # Number of samples the signals are padded with on each side before the analysis.
+        self.n_pad = n_fft // 2
+
+        window = _stft_window(win_length, n_fft)
+        self.window = window.astype(self.dtype)
+
+        # Overlap-add normalization (window sum-square) computed from the valid frames of each
+        # entry.
+        window_sum = _overlap_add(self.frame_mask * np.square(window), hop_length)
+        window_sum = window_sum[:, self.n_pad:self.n_pad + n_samples]
+
+        # Combined normalization, trimming and length masking factor for the overlap-add signals.
+        self.inv_window_sum = np.ones_like(window_sum)
+        nonzero = window_sum > np.finfo(window_sum.dtype).tiny
+        self.inv_window_sum[nonzero] = 1.0 / window_sum[nonzero]
+        self.inv_window_sum[np.arange(n_samples)[np.newaxis, :] >=
+                            self.audio_lengths[:, np.newaxis]] = 0.0
+        self.inv_window_sum = self.inv_window_sum.astype(self.dtype)
+
+        # Gather indices that reflect pad each entry of the flattened batch signal.
+        self.pad_indices = _reflect_padding_indices(self.audio_lengths, n_samples,
+                                                    n_samples + n_fft, self.n_pad)
+
+        # Unit phase estimate, shape => (B, T_max, 1 + n_fft // 2).
+        self.angles = np.zeros(self.magnitudes.shape, dtype=complex_dtype)
+
+        # Latest STFT estimate and the STFT estimate of the previous iteration (only allocated
+        # once momentum is used).
+        self.estimate = np.zeros_like(self.angles)
+        self.previous = None
+
+        # Scratch buffers for the spectrum to be inverted and for magnitudes.
+        self._spectrum = np.zeros_like(self.angles)
+        self._magnitudes = np.zeros_like(self.magnitudes)
+
+        # Scratch buffer for the frames of the inverse and the forward FFT.
+        self._frames = np.zeros((n_batch, n_frames, n_fft), dtype=self.dtype)
+
+        # Scratch buffer for the overlap-add, shape => (B, T_max + ceil(n_fft / hop) - 1, hop).
+        n_blocks = -(-n_fft // hop_length)
+        self._overlap = np.zeros((n_batch, n_frames + n_blocks - 1, hop_length),
+                                 dtype=self.dtype)
+
+        # Flat signal buffer with a trailing zero element referenced by all padding positions.
+        self._signal = np.zeros(n_batch * n_samples + 1, dtype=self.dtype)
+        self._signals = self._signal[:-1].reshape((n_batch, n_samples))
+
+        # Reflect padded signals and a (read only) frame view onto them.
+        self._padded = np.zeros(self.pad_indices.shape, dtype=self.dtype)
+        self._padded_frames = np.lib.stride_tricks.as_strided(
+            self._padded,
+            shape=(n_batch, n_frames, n_fft),
+            strides=(self._padded.strides[0],
+                     hop_length * self._padded.strides[1],
+                     self._padded.strides[1]),
+            writeable=False)
+
+    def initialize_phase(self, angles=None):
+        """
+        Initialize the phase estimate and reset the iteration state.
+
+        Arguments:
+            angles (:obj:`np.ndarray`, optional):
+                Complex unit phases of shape=(B, 1 + n_fft // 2, T_max).
+                If None, the phases are initialized randomly. Defaults to None.
+        """
+        if angles is None:
+            phase = np.random.rand(*self.angles.shape)
+            np.exp(2j * np.pi * phase, out=self.angles)
+        else:
+            self.angles[...] = np.transpose(angles, (0, 2, 1))
+
+        self.n_iterations = 0
+        if self.previous is not None:
+            self.previous.fill(0.0)
+
+    def iterate(self, momentum=0.0):
+        """
+        Perform a single (fast) Griffin-Lim iteration.
+
+        The target magnitudes are combined with the phase estimate, inverted into time domain
+        signals and re-analysed. The phase of the resulting STFT becomes the new phase estimate.
+
+        Arguments:
+            momentum (:obj:`float`, optional):
+                Momentum of the fast Griffin-Lim phase update. A value of 0.0 results in the
+                original Griffin-Lim algorithm. Defaults to 0.0.
+        """
+        # Revert the estimated STFT back into time domain signals.
+        self._istft()
+
+        # Compute the STFT from the reflect padded estimated time domain signals.
+        np.take(self._signal, self.pad_indices, out=self._padded)
+        np.multiply(self._padded_frames, self.window, out=self._frames)
+        _rfft(self._frames, out=self.estimate)
+
+        # The FGLA update is written in terms of the previous re-analysed STFT (as in librosa).
+        momentum_factor = momentum / (1.0 + momentum)
+
+        # Extract the unit phase components from the (accelerated) STFT estimate.
+        if momentum_factor > 0.0:
+            if self.previous is None:
+                self.previous = np.zeros_like(self.estimate)
+
+            np.multiply(self.previous, -momentum_factor, out=self.angles)
+            self.angles += self.estimate
+            self.previous[...] = self.estimate
+        else:
+            self.angles[...] = self.estimate
+
+        np.abs(self.angles, out=self._magnitudes)
+        np.maximum(self._magnitudes, 1e-16, out=self._magnitudes)
+        self.angles /= self._magnitudes
+
+        self.n_iterations += 1
+
+    def spectral_convergence(self):
+        """
+        Calculate the spectral convergence of the latest STFT estimate for each batch entry.
+
+        Returns:
+            np.ndarray:
+                Spectral convergence of shape=(B,).
+        """
+        return np.sqrt(self._squared_error()) / self.magnitude_norms
+
+    def mse(self):
+        """
+        Calculate the mean-squared error of the latest STFT estimate for each batch entry.
+
+        Returns:
+            np.ndarray:
+                Mean-squared error of shape=(B,).
+        """
+        return self._squared_error() / np.maximum(self.lengths * self.magnitudes.shape[2], 1)
+
+    def synthesize(self):
+        """
+        Revert the target magnitudes combined with the current phase estimate into time domain
+        signals.
+
+        Returns:
+            np.ndarray:
+                Zero padded audio time series of shape=(B, hop_length * (T_max - 1)) and
+                dtype np.float32.
+        """
+        self._istft()
+
+        return self._signals.astype(np.float32)
+
+    def _squared_error(self):
+        """
+        Sum of the squared magnitude errors of the latest STFT estimate for each batch entry.
+
+        Returns:
+            np.ndarray:
+                Summed squared errors of shape=(B,).
+        """
+        np.abs(self.estimate, out=self._magnitudes)
+        self._magnitudes -= self.magnitudes
+        self._magnitudes *= self.frame_mask
+        np.square(self._magnitudes, out=self._magnitudes)
+
+        return self._magnitudes.sum(axis=(1, 2), dtype=np.float64)
+
+    def _istft(self):
+        """
+        Inverse short-time Fourier transform of the target magnitudes combined with the current
+        phase estimate into the flat signal buffer.
+        """
+        np.multiply(self.angles, self.magnitudes, out=self._spectrum)
+        _irfft(self._spectrum, self.n_fft, out=self._frames)
+        self._frames *= self.window
+
+        signal = _overlap_add(self._frames, self.hop_length, out=self._overlap)
+        signal = signal[:, self.n_pad:self.n_pad + self._signals.shape[1]]
+
+        np.multiply(signal, self.inv_window_sum, out=self._signals)
+
+
+def _rfft(frames, out):
+    """
+    Real input FFT along the last axis written into an existing array.
+
+    Arguments:
+        frames (np.ndarray):
+            Real valued frames of shape=(..., n_fft).
+
+        out (np.ndarray):
+            Complex output array of shape=(..., 1 + n_fft // 2).
+
+    Returns:
+        np.ndarray:
+            The output array `out`.
+    """
+    if _FFT_SUPPORTS_OUT:
+        return np.fft.rfft(frames, axis=-1, out=out)
+
+    out[...] = np.fft.rfft(frames, axis=-1)
+    return out
+
+
+def _irfft(spectrum, n_fft, out):
+    """
+    Inverse real FFT along the last axis written into an existing array.
+
+    Arguments:
+        spectrum (np.ndarray):
+            Complex spectrum of shape=(..., 1 + n_fft // 2).
+
+        n_fft (int):
+            FFT window size.
+
+        out (np.ndarray):
+            Real output array of shape=(..., n_fft).
+
+    Returns:
+        np.ndarray:
+            The output array `out`.
+    """
+    if _FFT_SUPPORTS_OUT:
+        return np.fft.irfft(spectrum, n=n_fft, axis=-1, out=out)
+
+    out[...] = np.fft.irfft(spectrum, n=n_fft, axis=-1)
+    return out
+
+
+def _stft_window(win_length, n_fft):
+    """
+    Create the periodic Hann window used by `librosa.stft` and `librosa.istft`.
+
+    Arguments:
+        win_length (int):
+            Length of the window in audio samples.
+
+        n_fft (int):
+            FFT window size. The window is zero padded on both sides to this length.
+
+    Returns:
+        np.ndarray:
+            Window of shape=(n_fft,).
+    """
+    window = np.hanning(win_length + 1)[:-1]
+
+    l_pad = (n_fft - win_length) // 2
+    return np.pad(window, (l_pad, n_fft - win_length - l_pad), mode='constant')
+
+
+def _overlap_add(frames, hop_length, out=None):
+    """
+    Overlap-add a batch of frames into signals.
+
+    Instead of adding each frame separately the frames are split into blocks of `hop_length`
+    samples. All j'th blocks of all frames are added to the signals at once, requiring only
+    `ceil(n_fft / hop_length)` vectorized additions.
+
+    Arguments:
+        frames (np.ndarray):
+            Frames to be added. The shape is expected to be shape=(B, T, n_fft).
+
+        hop_length (int):
+            Number of audio samples to hop between frames.
+
+        out (:obj:`np.ndarray`, optional):
+            Contiguous buffer of shape=(B, T + ceil(n_fft / hop_length) - 1, hop_length) the
+            signals are accumulated in. If None, a new buffer is allocated. Defaults to None.
+
+    Returns:
+        np.ndarray:
+            Signals of shape=(B, n_fft + hop_length * (T - 1)).
+            If `out` is given, the signals are a view onto `out`.
+    """
+    n_batch, n_frames, n_fft = frames.shape
+    n_blocks = -(-n_fft // hop_length)
+
+    if out is None:
+        out = np.zeros((n_batch, n_frames + n_blocks - 1, hop_length), dtype=frames.dtype)
+    else:
+        out.fill(0.0)
+
+    for j in range(n_blocks):
+        # The last block of each frame may be shorter than `hop_length`.
+        block = frames[:, :, j * hop_length:(j + 1) * hop_length]
+        out[:, j:j + n_frames, :block.shape[2]] += block
+
+    return out.reshape((n_batch, -1))[:, :n_fft + hop_length * (n_frames - 1)]
+
+
+def _reflect_padding_indices(audio_lengths, n_samples, n_padded, n_pad):
+    """
+    Calculate gather indices that reflect pad the signals of a flattened batch.
+
+    Each entry is reflect padded with `n_pad` samples on both sides based on its own length,
+    just like `librosa.stft` does with centered frames. Positions behind the padded signal
+    reference the last element of the flattened batch, which is expected to be zero.
+
+    Arguments:
+        audio_lengths (np.ndarray):
+            Number of valid samples for each entry of the batch.
+
+        n_samples (int):
+            Number of samples of each entry in the flattened batch.
+
+        n_padded (int):
+            Number of samples of each padded entry.
+
+        n_pad (int):
+            Number of samples to pad on each side.
+
+    Returns:
+        np.ndarray:
+            Gather indices of shape=(B, n_padded).
+    """
+    n_batch = len(audio_lengths)
+
+    # All positions reference the trailing zero element by default.
+    indices = np.full((n_batch, n_padded), n_batch * n_samples, dtype=np.int64)
+
+    for b, length in enumerate(audio_lengths):
+        if length == 0:
+            continue
 
-    # Revert the estimated STFT back into a time domain signal.
-    estimated_signal = librosa.istft(full,
-                                     win_length=win_length,
-                                     hop_length=hop_length,
-                                     window=window)
+        reflected = np.pad(np.arange(length), n_pad, mode='reflect')
+        indices[b, :len(reflected)] = b * n_samples + reflected
 
-    return estimated_signal, mse
+    return indices
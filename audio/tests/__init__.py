@@ -0,0 +1,6 @@
+"""
+This module implements tests for the audio processing functions.
+"""
+
+__author__ = 'Yves-Noel Weweler <y.weweler@fh-muenster.de>'
+__status__ = 'Development'
@@ -0,0 +1,14 @@
+import pytest
+
+from audio.tests.signals import chirp
+
+
+@pytest.fixture
+def wav():
+    """
+    Creates a two second long test signal consisting of a linear chirp.
+
+    Returns:
+        np.ndarray
+    """
+    return chirp(2.0)
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from audio.executors import create_executor
+from audio.vocoders import GriffinLimVocoder
+
+N_FFT = 512
+WIN_LENGTH = 400
+HOP_LENGTH = 100
+
+
+@pytest.mark.parametrize('backend', ['thread', 'process'])
+def test_executor_synthesize(backend):
+    """
+    Test if the executor backends return audio of the expected length for each spectrogram in
+    the order they were passed.
+
+    Arguments:
+        backend (str):
+            Name of the executor backend to test.
+    """
+    random = np.random.RandomState(0)
+    mags = [random.rand(1 + N_FFT // 2, n_frames) for n_frames in [30, 10, 20, 5, 25]]
+
+    vocoder = GriffinLimVocoder(WIN_LENGTH, HOP_LENGTH, N_FFT, n_iter=2)
+
+    with create_executor(backend, vocoder, 2) as executor:
+        # The pool is expected to be reusable across calls.
+        for _ in range(2):
+            wavs = executor.synthesize(mags)
+
+            assert len(wavs) == len(mags)
+            for mag, wav in zip(mags, wavs):
+                assert wav.dtype == np.float32
+                assert wav.shape == (HOP_LENGTH * (mag.shape[1] - 1),)
+
+
+def test_executor_unknown_backend():
+    """
+    Test if requesting an unknown backend raises an error.
+    """
+    with pytest.raises(ValueError):
+        create_executor('gpu', GriffinLimVocoder(WIN_LENGTH, HOP_LENGTH, N_FFT, n_iter=2), 2)
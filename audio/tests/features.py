@@ -0,0 +1,41 @@
+import numpy as np
+
+from audio.features import FeatureExtractor, linear_scale_spectrogram, mel_basis, \
+    mel_scale_spectrogram
+from audio.tests.signals import HOP_LENGTH, N_FFT, SAMPLING_RATE, WIN_LENGTH
+
+N_MELS = 80
+FMIN = 0
+FMAX = 8000
+
+
+def test_feature_extractor(wav):
+    """
+    Test if the linear and mel scale spectrograms extracted from a single STFT match the
+    separately calculated features.
+
+    Arguments:
+        wav (np.ndarray):
+            Test signal.
+    """
+    extractor = FeatureExtractor(SAMPLING_RATE, N_FFT, HOP_LENGTH, WIN_LENGTH, N_MELS, FMIN, FMAX)
+    linear_mag, mel_spec = extractor.extract(wav)
+
+    expected_linear = np.abs(linear_scale_spectrogram(wav, N_FFT, HOP_LENGTH, WIN_LENGTH))
+    expected_mel = mel_scale_spectrogram(wav, N_FFT, SAMPLING_RATE, N_MELS, FMIN, FMAX,
+                                         HOP_LENGTH, WIN_LENGTH, 1)
+
+    np.testing.assert_allclose(linear_mag, expected_linear)
+    np.testing.assert_allclose(mel_spec, expected_mel)
+
+
+def test_mel_basis_cache():
+    """
+    Test if the mel filter-bank matrix is only created once for the same parameters and is
+    protected against modification.
+    """
+    basis = mel_basis(SAMPLING_RATE, N_FFT, N_MELS, FMIN, FMAX)
+
+    assert mel_basis(SAMPLING_RATE, N_FFT, N_MELS, FMIN, FMAX) is basis
+    assert basis.shape == (N_MELS, 1 + N_FFT // 2)
+    assert not basis.flags.writeable
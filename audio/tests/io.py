@@ -0,0 +1,25 @@
+import io
+import wave
+
+import numpy as np
+
+from audio.io import wav_to_bytes
+
+
+def test_wav_to_bytes():
+    """
+    Test if a waveform is encoded into a mono 16 bit PCM WAV file containing the normalized
+    samples.
+    """
+    wav = 0.25 * np.sin(np.linspace(0.0, 20.0 * np.pi, 1600))
+
+    with wave.open(io.BytesIO(wav_to_bytes(wav, 16000, norm=True)), 'rb') as wav_file:
+        assert wav_file.getnchannels() == 1
+        assert wav_file.getframerate() == 16000
+        assert wav_file.getnframes() == len(wav)
+
+        samples = np.frombuffer(wav_file.readframes(len(wav)), dtype='<i2')
+
+    # The normalized waveform uses the full 16 bit range.
+    np.testing.assert_allclose(samples / np.iinfo(np.int16).max, wav / np.max(np.abs(wav)),
+                               atol=1e-4)
@@ -0,0 +1,57 @@
+import librosa
+import numpy as np
+
+# STFT parameters shared by the audio tests.
+SAMPLING_RATE = 22050
+N_FFT = 2048
+WIN_LENGTH = 1102
+HOP_LENGTH = 275
+
+
+def chirp(duration=2.0):
+    """
+    Creates a test signal consisting of a linear chirp.
+
+    Arguments:
+        duration (:obj:`float`, optional):
+            Duration of the signal in seconds. Defaults to 2.0.
+
+    Returns:
+        np.ndarray
+    """
+    t = np.arange(int(duration * SAMPLING_RATE)) / SAMPLING_RATE
+
+    return 0.5 * np.sin(2.0 * np.pi * (200.0 + 300.0 * t) * t)
+
+
+def stft(wav):
+    """
+    Short-time Fourier transform using the parameters shared by the audio tests.
+
+    Arguments:
+        wav (np.ndarray):
+            Audio time series.
+
+    Returns:
+        np.ndarray:
+            STFT matrix of shape=(1 + n_fft // 2, T).
+    """
+    return librosa.stft(wav, n_fft=N_FFT, hop_length=HOP_LENGTH, win_length=WIN_LENGTH,
+                        pad_mode='reflect')
+
+
+def spectral_convergence(wav, mag):
+    """
+    Calculate the spectral convergence between a signal and a target magnitude spectrogram.
+
+    Arguments:
+        wav (np.ndarray):
+            Audio time series.
+
+        mag (np.ndarray):
+            Target magnitude spectrogram.
+
+    Returns:
+        float
+    """
+    return np.linalg.norm(np.abs(stft(wav)) - mag) / np.linalg.norm(mag)
@@ -0,0 +1,195 @@
+import librosa
+import numpy as np
+
+from audio.synthesis import GriffinLimWorkspace, griffin_lim_batch, griffin_lim_v2, \
+    spectrograms_to_wavs, spectrogram_to_wav_stream
+from audio.tests.signals import HOP_LENGTH, N_FFT, WIN_LENGTH, spectral_convergence, stft
+
+
+def test_batch_istft(wav):
+    """
+    Test if the batched inverse STFT matches `librosa.istft` for entries of different length.
+
+    Arguments:
+        wav (np.ndarray):
+            Test signal.
+    """
+    spec = stft(wav)
+    n_frames = spec.shape[1]
+    lengths = np.array([n_frames, n_frames - 40])
+
+    # Stack the full and a shortened zero padded STFT.
+    stacked = np.zeros((2,) + spec.shape, dtype=np.complex128)
+    stacked[0] = spec
+    stacked[1, :, :lengths[1]] = spec[:, :lengths[1]]
+
+    workspace = GriffinLimWorkspace(np.abs(stacked), lengths, WIN_LENGTH, HOP_LENGTH, N_FFT)
+    workspace.initialize_phase(np.exp(1j * np.angle(stacked)))
+    audio = workspace.synthesize()
+
+    for i, length in enumerate(lengths):
+        expected = librosa.istft(spec[:, :length], hop_length=HOP_LENGTH, win_length=WIN_LENGTH)
+
+        assert np.allclose(audio[i, :len(expected)], expected, atol=1e-5)
+        assert np.all(audio[i, len(expected):] == 0.0)
+
+
+def test_batch_stft(wav):
+    """
+    Test if the batched re-analysis of an iteration matches `librosa.stft`.
+
+    Arguments:
+        wav (np.ndarray):
+            Test signal.
+    """
+    spec = stft(wav)
+
+    workspace = GriffinLimWorkspace(np.abs(spec)[np.newaxis, ...], None,
+                                    WIN_LENGTH, HOP_LENGTH, N_FFT)
+    workspace.initialize_phase(np.exp(1j * np.angle(spec))[np.newaxis, ...])
+    workspace.iterate()
+
+    expected = stft(librosa.istft(spec, hop_length=HOP_LENGTH, win_length=WIN_LENGTH))
+
+    assert workspace.n_iterations == 1
+    assert np.allclose(workspace.estimate[0].T, expected, atol=1e-5)
+
+
+def test_single_precision(wav):
+    """
+    Test if the workspace computes in single precision by default and if its reconstruction
+    matches the double precision reconstruction.
+
+    Arguments:
+        wav (np.ndarray):
+            Test signal.
+    """
+    magnitudes = np.abs(stft(wav))[np.newaxis, ...]
+    angles = np.exp(2j * np.pi * np.random.RandomState(42).rand(*magnitudes.shape))
+
+    audio = []
+    for dtype in [np.float32, np.float64]:
+        workspace = GriffinLimWorkspace(magnitudes, None, WIN_LENGTH, HOP_LENGTH, N_FFT,
+                                        dtype=dtype)
+        workspace.initialize_phase(angles)
+        for _ in range(10):
+            workspace.iterate(momentum=0.99)
+
+        audio.append(workspace.synthesize())
+
+    # The default buffers are single precision.
+    workspace = GriffinLimWorkspace(magnitudes, None, WIN_LENGTH, HOP_LENGTH, N_FFT)
+    assert workspace.magnitudes.dtype == np.float32
+    assert workspace.estimate.dtype == np.complex64
+
+    assert np.allclose(audio[0], audio[1], atol=1e-4)
+
+
+def test_batch_lengths(wav):
+    """
+    Test if the batched reconstruction returns audio of the expected length for each entry.
+
+    Arguments:
+        wav (np.ndarray):
+            Test signal.
+    """
+    mag = np.abs(stft(wav))
+    mags = [mag, mag[:, :50], mag[:, :120]]
+
+    wavs = spectrograms_to_wavs(mags, WIN_LENGTH, HOP_LENGTH, N_FFT, n_iter=2, batch_size=2)
+
+    for _mag, _wav in zip(mags, wavs):
+        assert _wav.dtype == np.float32
+        assert len(_wav) == HOP_LENGTH * (_mag.shape[1] - 1)
+
+
+def test_batch_reconstruction(wav):
+    """
+    Test if the batched reconstruction of padded entries converges towards the target.
+
+    Arguments:
+        wav (np.ndarray):
+            Test signal.
+    """
+    mag = np.abs(stft(wav))
+    n_frames = mag.shape[1]
+
+    # A full length entry and a short entry padded with zero frames.
+    stacked = np.zeros((2,) + mag.shape)
+    stacked[0] = mag
+    stacked[1, :, :80] = mag[:, :80]
+
+    audio, audio_lengths, mse, n_iterations = griffin_lim_batch(stacked, [n_frames, 80],
+                                                                win_length=WIN_LENGTH,
+                                                                hop_length=HOP_LENGTH,
+                                                                n_fft=N_FFT,
+                                                                n_iter=50)
+
+    assert mse.shape == (2,)
+    assert n_iterations == 50
+    assert spectral_convergence(audio[0, :audio_lengths[0]], mag) < 0.2
+    assert spectral_convergence(audio[1, :audio_lengths[1]], mag[:, :80]) < 0.2
+
+
+def test_fast_reconstruction(wav):
+    """
+    Test if the fast Griffin-Lim algorithm with early stopping converges in fewer iterations.
+
+    Arguments:
+        wav (np.ndarray):
+            Test signal.
+    """
+    mag = np.abs(stft(wav))[np.newaxis, ...]
+
+    audio, audio_lengths, mse, n_iterations = griffin_lim_batch(mag, None,
+                                                                win_length=WIN_LENGTH,
+                                                                hop_length=HOP_LENGTH,
+                                                                n_fft=N_FFT,
+                                                                n_iter=50,
+                                                                momentum=0.99,
+                                                                tolerance=1e-3)
+
+    assert n_iterations < 50
+    assert spectral_convergence(audio[0, :audio_lengths[0]], mag[0]) < 0.2
+
+
+def test_griffin_lim_v2(wav):
+    """
+    Test if the unbatched reconstruction converges towards the target.
+
+    Arguments:
+        wav (np.ndarray):
+            Test signal.
+    """
+    mag = np.abs(stft(wav))
+
+    audio, mse = griffin_lim_v2(mag, WIN_LENGTH, HOP_LENGTH, N_FFT, n_iter=50)
+
+    assert audio.shape == (HOP_LENGTH * (mag.shape[1] - 1),)
+    assert spectral_convergence(audio, mag) < 0.2
+
+
+def test_stream_reconstruction(wav):
+    """
+    Test if the streamed block wise reconstruction yields audio of the expected length that
+    converges towards the target.
+
+    Arguments:
+        wav (np.ndarray):
+            Test signal.
+    """
+    mag = np.abs(stft(wav))
+
+    stream = spectrogram_to_wav_stream(mag, WIN_LENGTH, HOP_LENGTH, N_FFT, n_iter=30,
+                                       block_length=48, overlap=8, momentum=0.99)
+
+    # The first chunk is available after inverting the first block only.
+    chunks = [next(stream)]
+    assert len(chunks[0]) == HOP_LENGTH * (48 - 8)
+
+    chunks.extend(stream)
+    audio = np.concatenate(chunks)
+
+    assert audio.dtype == np.float32
+    assert audio.shape == (HOP_LENGTH * (mag.shape[1] - 1),)
+    assert spectral_convergence(audio, mag) < 0.2
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from audio.tests.signals import HOP_LENGTH, N_FFT, WIN_LENGTH, spectral_convergence, stft
+from audio.vocoders import VOCODERS, create_vocoder
+
+
+@pytest.fixture
+def mag(wav):
+    """
+    Creates the magnitude spectrogram of the test signal.
+
+    Arguments:
+        wav (np.ndarray):
+            Test signal.
+
+    Returns:
+        np.ndarray
+    """
+    return np.abs(stft(wav))
+
+
+def create(name):
+    """
+    Create a vocoder using the parameters of the vocoder tests.
+
+    Arguments:
+        name (str):
+            Name of the vocoder.
+
+    Returns:
+        audio.vocoders.Vocoder
+    """
+    config = {'win_length': WIN_LENGTH, 'hop_length': HOP_LENGTH, 'n_fft': N_FFT,
+              'block_length': 48, 'overlap': 8}
+    if name == 'griffin_lim':
+        config.update({'n_iter': 30, 'momentum': 0.99})
+
+    return create_vocoder(name, **config)
+
+
+@pytest.mark.parametrize('name', sorted(VOCODERS))
+def test_vocoder_synthesize(mag, name):
+    """
+    Test if the vocoders reconstruct spectrogram's of different length in a single batch.
+
+    Arguments:
+        mag (np.ndarray):
+            Target magnitude spectrogram.
+
+        name (str):
+            Name of the vocoder to test.
+    """
+    mags = [mag, mag[:, :80]]
+
+    wavs = create(name).synthesize(mags)
+
+    for _mag, _wav in zip(mags, wavs):
+        assert _wav.dtype == np.float32
+        assert _wav.shape == (HOP_LENGTH * (_mag.shape[1] - 1),)
+        assert spectral_convergence(_wav, _mag) < 0.2
+
+
+@pytest.mark.parametrize('name', sorted(VOCODERS))
+def test_vocoder_stream(mag, name):
+    """
+    Test if streaming with the vocoders yields audio of the expected length.
+
+    Arguments:
+        mag (np.ndarray):
+            Target magnitude spectrogram.
+
+        name (str):
+            Name of the vocoder to test.
+    """
+    chunks = list(create(name).stream(mag))
+    audio = np.concatenate(chunks)
+
+    assert len(chunks) > 1
+    assert audio.shape == (HOP_LENGTH * (mag.shape[1] - 1),)
+    assert spectral_convergence(audio, mag) < 0.2
+
+
+def test_unknown_vocoder():
+    """
+    Test if requesting an unknown vocoder raises an error.
+    """
+    with pytest.raises(ValueError):
+        create_vocoder('wavenet')
@@ -0,0 +1,308 @@
+import numpy as np
+
+from audio.conversion import ms_to_samples
+from audio.synthesis import GriffinLimWorkspace, batch_spectrograms, griffin_lim_batch, \
+    phase_gradient_integration, spectrogram_to_wav_stream
+
+
+class Vocoder(object):
+    """
+    Base class for vocoders converting linear scale magnitude spectrogram's into audio time
+    series.
+
+    Implementations have to provide `invert_batch`, which inverts a batch of zero padded
+    spectrogram's. Converting lists of spectrogram's and streaming are built on top of it.
+    Vocoders only hold their configuration, so they can be passed to worker processes.
+
+    Arguments:
+        win_length (int):
+            Length of each frame in audio samples.
+            The window length is required to fulfill the condition `win_length` <= `n_fft`.
+
+        hop_length (int):
+            Number of audio samples to hop between frames.
+
+        n_fft (int):
+            FFT window size.
+
+        block_length (:obj:`int`, optional):
+            Number of frames in each block when streaming. Defaults to 64.
+
+        overlap (:obj:`int`, optional):
+            Number of frames shared by consecutive blocks when streaming. Defaults to 8.
+    """
+
+    def __init__(self, win_length, hop_length, n_fft, block_length=64, overlap=8):
+        self.win_length = win_length
+        self.hop_length = hop_length
+        self.n_fft = n_fft
+        self.block_length = block_length
+        self.overlap = overlap
+
+    @classmethod
+    def from_params(cls, hparams):
+        """
+        Create a vocoder configured by the model hyper-parameters.
+
+        Arguments:
+            hparams (tf.contrib.training.HParams):
+                Model hyper-parameters (see `tacotron.params.model`).
+
+        Returns:
+            Vocoder
+        """
+        return cls(**cls._params_config(hparams))
+
+    @staticmethod
+    def _params_config(hparams):
+        """
+        Collect the vocoder arguments from the model hyper-parameters.
+
+        Arguments:
+            hparams (tf.contrib.training.HParams):
+                Model hyper-parameters (see `tacotron.params.model`).
+
+        Returns:
+            dict:
+                Keyword arguments for the vocoders constructor.
+        """
+        return {
+            'win_length': ms_to_samples(hparams.win_len, hparams.sampling_rate),
+            'hop_length': ms_to_samples(hparams.win_hop, hparams.sampling_rate),
+            'n_fft': hparams.n_fft,
+            'block_length': hparams.reconstruction_block_length,
+            'overlap': hparams.reconstruction_block_overlap
+        }
+
+    def invert_batch(self, spectrograms, lengths):
+        """
+        Invert a batch of zero padded spectrogram's.
+
+        Arguments:
+            spectrograms (np.ndarray):
+                Linear scale magnitude spectrogram's of shape=(B, 1 + n_fft // 2, T_max).
+
+            lengths (:obj:`list` of int):
+                Number of valid (non padding) frames for each spectrogram in the batch.
+
+        Returns:
+            np.ndarray:
+                Zero padded audio time series of shape=(B, hop_length * (T_max - 1)) and dtype
+                np.float32.
+        """
+        raise NotImplementedError()
+
+    def synthesize(self, mags, batch_size=None):
+        """
+        Convert a list of linear scale magnitude spectrogram's into audio time series.
+
+        Arguments:
+            mags (:obj:`list` of :obj:`np.ndarray`):
+                Linear scale magnitude spectrogram's. Each spectrogram is expected to be of
+                shape=(1 + n_fft // 2, T), with T being the number of frames of the spectrogram.
+
+            batch_size (:obj:`int`, optional):
+                Maximal number of spectrogram's to invert in a single batch.
+                If None, all spectrogram's are inverted in a single batch. Defaults to None.
+
+        Returns:
+            (:obj:`list` of :obj:`np.ndarray`):
+                Audio time series for each spectrogram in the same order as `mags`.
+                The shape of each array is shape=(hop_length * (T - 1),) and the arrays dtype is
+                np.float32.
+        """
+        wavs = [None] * len(mags)
+        for indices, stacked, lengths in batch_spectrograms(mags, batch_size):
+            audio = self.invert_batch(stacked, lengths)
+
+            for j, i in enumerate(indices):
+                wavs[i] = audio[j, :self.hop_length * max(lengths[j] - 1, 0)]
+
+        return wavs
+
+    def stream(self, mag):
+        """
+        Convert a linear scale magnitude spectrogram into an audio time series chunk by chunk.
+
+        Arguments:
+            mag (np.ndarray):
+                Linear scale magnitude spectrogram of shape=(1 + n_fft // 2, T).
+
+        Yields:
+            np.ndarray:
+                Consecutive chunks of the audio time series with dtype np.float32.
+        """
+        yield self.synthesize([mag])[0]
+
+
+class GriffinLimVocoder(Vocoder):
+    """
+    Vocoder based on (fast) Griffin-Lim phase reconstruction.
+
+    Arguments:
+        n_iter (int):
+            Number of reconstruction iterations.
+
+        momentum (:obj:`float`, optional):
+            Momentum of the fast Griffin-Lim phase update. Defaults to 0.0.
+
+        tolerance (:obj:`float`, optional):
+            Spectral convergence improvement below which the reconstruction is stopped early.
+            Defaults to None.
+
+    See `Vocoder` for the remaining arguments.
+    """
+
+    def __init__(self, win_length, hop_length, n_fft, n_iter, momentum=0.0, tolerance=None,
+                 block_length=64, overlap=8):
+        super().__init__(win_length, hop_length, n_fft,
+                         block_length=block_length,
+                         overlap=overlap)
+
+        self.n_iter = n_iter
+        self.momentum = momentum
+        self.tolerance = tolerance
+
+    @staticmethod
+    def _params_config(hparams):
+        config = Vocoder._params_config(hparams)
+        config.update({
+            'n_iter': hparams.reconstruction_iterations,
+            'momentum': hparams.reconstruction_momentum,
+            'tolerance': hparams.reconstruction_tolerance
+        })
+
+        return config
+
+    def invert_batch(self, spectrograms, lengths):
+        audio, _, _, _ = griffin_lim_batch(spectrograms, lengths,
+                                           win_length=self.win_length,
+                                           hop_length=self.hop_length,
+                                           n_fft=self.n_fft,
+                                           n_iter=self.n_iter,
+                                           momentum=self.momentum,
+                                           tolerance=self.tolerance)
+
+        return audio
+
+    def stream(self, mag):
+        return spectrogram_to_wav_stream(mag,
+                                         win_length=self.win_length,
+                                         hop_length=self.hop_length,
+                                         n_fft=self.n_fft,
+                                         n_iter=self.n_iter,
+                                         block_length=self.block_length,
+                                         overlap=self.overlap,
+                                         momentum=self.momentum)
+
+
+class PhaseGradientVocoder(Vocoder):
+    """
+    Non-iterative vocoder based on phase gradient integration
+    (see `audio.synthesis.phase_gradient_integration`).
+
+    The phase is estimated in a single pass over the spectrogram, which is an order of
+    magnitude faster than Griffin-Lim reconstruction.
+
+    Arguments:
+        tolerance (:obj:`float`, optional):
+            Peaks with a magnitude below `tolerance` times the maximal magnitude are ignored.
+            Defaults to 1e-5.
+
+    See `Vocoder` for the remaining arguments.
+    """
+
+    def __init__(self, win_length, hop_length, n_fft, tolerance=1e-5, block_length=64,
+                 overlap=8):
+        super().__init__(win_length, hop_length, n_fft,
+                         block_length=block_length,
+                         overlap=overlap)
+
+        self.tolerance = tolerance
+
+    @staticmethod
+    def _params_config(hparams):
+        config = Vocoder._params_config(hparams)
+        config.update({
+            'tolerance': hparams.phase_gradient_tolerance
+        })
+
+        return config
+
+    def invert_batch(self, spectrograms, lengths):
+        # Estimate the phases of the valid frames of each spectrogram.
+        angles = np.ones(spectrograms.shape, dtype=np.complex128)
+        for i, length in enumerate(lengths):
+            angles[i, :, :length] = self.__estimate_phase(spectrograms[i, :, :length])
+
+        workspace = GriffinLimWorkspace(spectrograms, lengths,
+                                        win_length=self.win_length,
+                                        hop_length=self.hop_length,
+                                        n_fft=self.n_fft)
+        workspace.initialize_phase(angles)
+
+        return workspace.synthesize()
+
+    def stream(self, mag):
+        return spectrogram_to_wav_stream(mag,
+                                         win_length=self.win_length,
+                                         hop_length=self.hop_length,
+                                         n_fft=self.n_fft,
+                                         n_iter=0,
+                                         block_length=self.block_length,
+                                         overlap=self.overlap,
+                                         angles=self.__estimate_phase(mag))
+
+    def __estimate_phase(self, mag):
+        return phase_gradient_integration(mag,
+                                          win_length=self.win_length,
+                                          hop_length=self.hop_length,
+                                          n_fft=self.n_fft,
+                                          tolerance=self.tolerance)
+
+
+# Available vocoders, addressable by name.
+VOCODERS = {
+    'griffin_lim': GriffinLimVocoder,
+    'phase_gradient': PhaseGradientVocoder
+}
+
+
+def create_vocoder(name, **kwargs):
+    """
+    Create a vocoder by name.
+
+    Arguments:
+        name (str):
+            Name of the vocoder. One of `VOCODERS`.
+
+        **kwargs:
+            Arguments passed to the vocoders constructor.
+
+    Returns:
+        Vocoder
+    """
+    return _vocoder_class(name)(**kwargs)
+
+
+def vocoder_from_params(hparams):
+    """
+    Create the vocoder selected and configured by the model hyper-parameters.
+
+    Arguments:
+        hparams (tf.contrib.training.HParams):
+            Model hyper-parameters (see `tacotron.params.model`).
+            The vocoder is selected by `hparams.vocoder`.
+
+    Returns:
+        Vocoder
+    """
+    return _vocoder_class(hparams.vocoder).from_params(hparams)
+
+
+def _vocoder_class(name):
+    if name not in VOCODERS:
+        raise ValueError('Unknown vocoder "{}". Available vocoders: {}.'
+                         .format(name, ', '.join(sorted(VOCODERS))))
+
+    return VOCODERS[name]
@@ -3,8 +3,8 @@ import os
 import librosa
 import numpy as np
 
-from audio.conversion import ms_to_samples, magnitude_to_decibel, normalize_decibel
-from audio.features import linear_scale_spectrogram, mel_scale_spectrogram
+from audio.conversion import magnitude_to_decibel, normalize_decibel
+from audio.features import FeatureExtractor
 from audio.io import load_wav
 from datasets.dataset_helper import DatasetHelper
 from datasets.statistics import collect_decibel_statistics, collect_duration_statistics
@@ -86,11 +86,6 @@ class CMUDatasetHelper(DatasetHelper):
 
     @staticmethod
     def load_audio(file_path):
-        # Window length in audio samples.
-        win_len = ms_to_samples(model_params.win_len, model_params.sampling_rate)
-        # Window hop in audio samples.
-        hop_len = ms_to_samples(model_params.win_hop, model_params.sampling_rate)
-
         # Load the actual audio file.
         wav, sr = load_wav(file_path.decode())
 
@@ -99,20 +94,16 @@ class CMUDatasetHelper(DatasetHelper):
         # some random initial silence delay after which it is allowed to speak.
         wav, _ = librosa.effects.trim(wav)
 
-        # Calculate the linear scale spectrogram.
-        # Note the spectrogram shape is transposed to be (T_spec, 1 + n_fft // 2) so dense layers
-        # for example are applied to each frame automatically.
-        linear_spec = linear_scale_spectrogram(wav, model_params.n_fft, hop_len, win_len).T
+        # Calculate the linear and the Mel. scale spectrogram from a single STFT.
+        extractor = FeatureExtractor.from_params(model_params, sampling_rate=sr)
+        linear_mag, mel_spec = extractor.extract(wav)
 
-        # Calculate the Mel. scale spectrogram.
-        # Note the spectrogram shape is transposed to be (T_spec, n_mels) so dense layers for
-        # example are applied to each frame automatically.
-        mel_spec = mel_scale_spectrogram(wav, model_params.n_fft, sr, model_params.n_mels,
-                                         model_params.mel_fmin, model_params.mel_fmax, hop_len,
-                                         win_len, 1).T
+        # Note the spectrogram shapes are transposed to be (T_spec, 1 + n_fft // 2) and
+        # (T_spec, n_mels) so dense layers for example are applied to each frame automatically.
+        linear_mag = linear_mag.T
+        mel_spec = mel_spec.T
 
         # Convert the linear spectrogram into decibel representation.
-        linear_mag = np.abs(linear_spec)
         linear_mag_db = magnitude_to_decibel(linear_mag)
         linear_mag_db = normalize_decibel(linear_mag_db,
                                           CMUDatasetHelper.linear_ref_db,
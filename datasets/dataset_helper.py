@@ -1,8 +1,29 @@
 import abc
+import hashlib
+import json
+import multiprocessing
 import os
+import time
 
 import numpy as np
 
+from datasets.feature_store import FeatureStoreWriter, feature_key
+from tacotron.params.model import model_params
+
+# Name of the manifest file written into the dataset folder by `pre_compute_features`.
+FEATURE_MANIFEST_FILE = 'features-manifest.json'
+
+# Model hyper-parameters influencing the features calculated by `load_audio`.
+FEATURE_PARAMS = ['sampling_rate', 'n_fft', 'win_len', 'win_hop', 'n_mels', 'mel_fmin',
+                  'mel_fmax', 'reduction']
+
+# Names of the features calculated by `load_audio`.
+FEATURE_NAMES = ['mel_mag_db', 'linear_mag_db']
+
+# Dataset helper attributes influencing the features calculated by `load_audio`.
+FEATURE_ATTRIBUTES = ['mel_mag_ref_db', 'mel_mag_max_db', 'linear_ref_db', 'linear_mag_max_db',
+                      'raw_silence_db']
+
 
 class DatasetHelper:
     """
@@ -281,27 +302,6 @@ class DatasetHelper:
         """
         raise NotImplementedError
 
-    @staticmethod
-    def cache_precalculated_features(wav_paths):
-        """
-        Loads pre-calculated feature from disk and holds them in RAM.
-
-        Arguments:
-            wav_paths (:obj:`list` of str):
-                Paths to the waveform files for which to load pre-processed features.
-
-        Returns:
-            cache (dict):
-                Dictionary containing the cached features with the file paths as keys for access.
-        """
-        __cache = dict()
-
-        for wav_path in wav_paths:
-            file_path = os.path.splitext(wav_path)[0]
-            __cache[file_path] = np.load('{}.npz'.format(file_path))
-
-        return __cache
-
     @staticmethod
     @abc.abstractstaticmethod
     def load_audio(file_path):
@@ -323,7 +323,28 @@ class DatasetHelper:
         """
         raise NotImplementedError
 
-    def pre_compute_features(self, paths):
+    @classmethod
+    def feature_fingerprint(cls):
+        """
+        Calculate a fingerprint of the configuration used by `load_audio` to calculate features.
+
+        Pre-computed features are only valid as long as the fingerprint does not change.
+
+        Returns:
+            str:
+                Hexadecimal SHA-1 digest of the feature configuration.
+        """
+        config = {
+            'loader': cls.__name__,
+            'params': {name: getattr(model_params, name) for name in FEATURE_PARAMS},
+            'attributes': {name: getattr(cls, name, None) for name in FEATURE_ATTRIBUTES}
+        }
+
+        serialized = json.dumps(config, sort_keys=True).encode()
+
+        return hashlib.sha1(serialized).hexdigest()
+
+    def pre_compute_features(self, paths, n_workers=None, force=False, report_interval=100):
         """
         Loads all audio files from the dataset, computes features and saves these pre-computed
         features as numpy .npz files to disk.
@@ -331,28 +352,164 @@ class DatasetHelper:
         For example: The features of an audio file <path>/<filename>.wav are saved next to the
         audio file in <path>/<filename>.npz.
 
+        The files are processed by a pool of worker processes. The pre-computation is resumable:
+        A manifest (see `FEATURE_MANIFEST_FILE`) in the dataset folder records the modification
+        time and size of each processed audio file along with the feature configuration
+        fingerprint (see `feature_fingerprint`). Files whose source and configuration did not
+        change since they were processed are skipped. Files that could not be processed are
+        recorded in the manifest instead of aborting the pre-computation. The progress reports
+        only count them, they are returned to be listed once the pre-computation finished.
+
         Arguments:
             paths (:obj:`list` of :obj:`str`):
                 File paths for all audio files of the dataset to pre-compute features for.
+
+            n_workers (:obj:`int`, optional):
+                Number of worker processes. If None, the number of available cores is used.
+                Defaults to None.
+
+            force (:obj:`bool`, optional):
+                Flag controlling if all files should be processed, regardless of the manifest.
+                Defaults to False.
+
+            report_interval (:obj:`int`, optional):
+                Number of processed files after which progress is reported and the manifest is
+                written to disk. Defaults to 100.
+
+        Returns:
+            dict:
+                Dictionary mapping the paths of files that could not be processed to their error
+                messages.
         """
         # Get the total number of samples in the dataset.
         n_samples = len(paths)
 
         print('Loaded {} dataset entries.'.format(n_samples))
 
+        manifest_path = os.path.join(self._dataset_folder, FEATURE_MANIFEST_FILE)
+        fingerprint = self.feature_fingerprint()
+
+        # Load the manifest of a previous run, which is discarded if the configuration changed.
+        manifest = self.__load_manifest(manifest_path)
+        if force or manifest.get('fingerprint') != fingerprint:
+            manifest = {'fingerprint': fingerprint, 'files': dict(), 'failures': dict()}
+
+        # Collect all files whose features are missing or outdated.
+        pending = [wav_path for wav_path in paths
+                   if not self.__is_up_to_date(wav_path, manifest['files'].get(wav_path))]
+
+        print('Skipping {} up to date entries, pre-computing features for {} entries.'
+              .format(n_samples - len(pending), len(pending)))
+
+        if n_workers is None:
+            n_workers = multiprocessing.cpu_count()
+
+        start = time.time()
+        n_processed = 0
+        with multiprocessing.Pool(n_workers) as pool:
+            for wav_path, source, error in pool.imap_unordered(_compute_features,
+                                                               [(self.load_audio, wav_path)
+                                                                for wav_path in pending],
+                                                               chunksize=4):
+                if error is None:
+                    manifest['files'][wav_path] = source
+                    manifest['failures'].pop(wav_path, None)
+                else:
+                    manifest['files'].pop(wav_path, None)
+                    manifest['failures'][wav_path] = error
+
+                n_processed += 1
+                if n_processed % report_interval == 0:
+                    # Report the progress and persist the manifest so the run can be resumed.
+                    elapsed = time.time() - start
+                    rate = n_processed / max(elapsed, 1e-6)
+                    print('Processed {}/{} entries ({:.1f} files/s, {} failed, ETA {:.0f}s)'
+                          .format(n_processed, len(pending), rate, len(manifest['failures']),
+                                  (len(pending) - n_processed) / rate))
+
+                    self.__write_manifest(manifest_path, manifest)
+
+        self.__write_manifest(manifest_path, manifest)
+        print('Finished pre-computing features for {} entries in {:.1f}s ({} failed).'
+              .format(n_processed, time.time() - start, len(manifest['failures'])))
+
+        return dict(manifest['failures'])
+
+    def pack_features(self, paths, store_folder, dtype='float32'):
+        """
+        Packs the pre-computed .npz features of all audio files into a single feature store
+        (see `datasets.feature_store`).
+
+        Arguments:
+            paths (:obj:`list` of :obj:`str`):
+                File paths for all audio files of the dataset to pack the features of.
+                Files without pre-computed features are skipped.
+
+            store_folder (str):
+                Path to the feature store folder to be written.
+
+            dtype (:obj:`str`, optional):
+                Data type the features are stored in. Either 'float32' or 'float16'.
+                Defaults to 'float32'.
+
+        Returns:
+            (:obj:`list` of :obj:`str`):
+                File paths of the audio files that were skipped.
+        """
+        writer = None
+        skipped = []
+
         for wav_path in paths:
-            # Load and process the audio file.
-            mel_mag_db, linear_mag_db = self.load_audio(wav_path.encode())
+            npz_path = '{}.npz'.format(os.path.splitext(wav_path)[0])
+            if not os.path.exists(npz_path):
+                skipped.append(wav_path)
+                continue
 
-            # Extract the file path and file name without the extension.
-            file_path = os.path.splitext(wav_path)[0]
+            with np.load(npz_path) as data:
+                features = {name: data[name] for name in FEATURE_NAMES}
 
-            # Create the target file path.
-            out_path = '{}.npz'.format(file_path)
-            print('Writing: "{}"'.format(out_path))
+            # Derive the feature dimensions from the first file.
+            if writer is None:
+                feature_dims = {name: feature.shape[1] for name, feature in features.items()}
+                writer = FeatureStoreWriter(store_folder, feature_dims, dtype=dtype)
 
-            # Save the audio file as a numpy .npz file.
-            np.savez(out_path, mel_mag_db=mel_mag_db, linear_mag_db=linear_mag_db)
+            writer.append(feature_key(wav_path, self._dataset_folder), features)
+
+        if writer is not None:
+            writer.close()
+
+        print('Packed {} entries into "{}" ({} skipped).'
+              .format(len(paths) - len(skipped), store_folder, len(skipped)))
+
+        return skipped
+
+    @staticmethod
+    def __load_manifest(manifest_path):
+        if not os.path.exists(manifest_path):
+            return dict()
+
+        with open(manifest_path, 'r') as manifest_file:
+            return json.load(manifest_file)
+
+    @staticmethod
+    def __write_manifest(manifest_path, manifest):
+        # Write to a temporary file first, so an interrupted run never leaves a corrupt manifest.
+        tmp_path = '{}.tmp'.format(manifest_path)
+        with open(tmp_path, 'w') as manifest_file:
+            json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+
+        os.replace(tmp_path, manifest_path)
+
+    @staticmethod
+    def __is_up_to_date(wav_path, entry):
+        if entry is None:
+            return False
+
+        out_path = '{}.npz'.format(os.path.splitext(wav_path)[0])
+        if not os.path.exists(out_path) or not os.path.exists(wav_path):
+            return False
+
+        return entry == _source_info(wav_path)
 
     @staticmethod
     def apply_reduction_padding(mel_mag_db, linear_mag_db, reduction_factor):
@@ -399,3 +556,57 @@ class DatasetHelper:
         linear_mag_db = linear_mag_db.reshape((-1, linear_mag_db.shape[1] * reduction_factor))
 
         return mel_mag_db, linear_mag_db
+
+
+def _source_info(wav_path):
+    """
+    Collect the information used to detect changes of an audio file.
+
+    Arguments:
+        wav_path (str):
+            Path to the audio file.
+
+    Returns:
+        dict:
+            Dictionary containing the modification time and size of the file.
+    """
+    stat = os.stat(wav_path)
+
+    return {'mtime': stat.st_mtime, 'size': stat.st_size}
+
+
+def _compute_features(task):
+    """
+    Calculate and save the features of a single audio file inside a worker process.
+
+    Arguments:
+        task (tuple):
+            Tuple (load_audio, wav_path) of the datasets `load_audio` function and the path of
+            the audio file to be processed.
+
+    Returns:
+        (wav_path, source, error):
+            wav_path (str):
+                Path of the processed audio file.
+            source (dict):
+                Modification time and size of the audio file (see `_source_info`).
+                None if the file could not be processed.
+            error (str):
+                Error message in case the file could not be processed, None otherwise.
+    """
+    load_audio, wav_path = task
+
+    try:
+        # Record the state of the source before processing, so later changes are detected.
+        source = _source_info(wav_path)
+
+        # Load and process the audio file.
+        mel_mag_db, linear_mag_db = load_audio(wav_path.encode())
+
+        # Save the features as a numpy .npz file next to the audio file.
+        out_path = '{}.npz'.format(os.path.splitext(wav_path)[0])
+        np.savez(out_path, mel_mag_db=mel_mag_db, linear_mag_db=linear_mag_db)
+    except Exception as error:
+        return wav_path, None, '{}: {}'.format(type(error).__name__, error)
+
+    return wav_path, source, None
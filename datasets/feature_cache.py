@@ -0,0 +1,104 @@
+import threading
+from collections import OrderedDict
+
+
+class FeatureCache(object):
+    """
+    Thread-safe least recently used (LRU) cache for decoded features with a memory budget.
+
+    The cache holds tuples of numpy arrays. Whenever the total size of the cached arrays exceeds
+    the budget, the least recently used entries are evicted. Entries that are larger than the
+    entire budget are not cached at all.
+
+    Arguments:
+        max_bytes (int):
+            Maximal number of bytes occupied by the cached arrays.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+
+        # Number of bytes currently occupied by the cached arrays.
+        self.n_bytes = 0
+
+        # Number of lookups that were answered from the cache.
+        self.hits = 0
+
+        # Number of lookups that had to load the features.
+        self.misses = 0
+
+        # Number of entries that were evicted to stay within the memory budget.
+        self.evictions = 0
+
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key, load_fn):
+        """
+        Get the features stored under a key, loading and caching them on a miss.
+
+        Arguments:
+            key (str):
+                Key identifying the features.
+
+            load_fn (function):
+                Function without arguments loading the features in case of a cache miss.
+                The function is expected to return a tuple of numpy arrays.
+
+        Returns:
+            tuple:
+                Tuple of numpy arrays. The arrays are shared with the cache and must not be
+                modified.
+        """
+        with self.__lock:
+            if key in self.__entries:
+                self.hits += 1
+                self.__entries.move_to_end(key)
+                return self.__entries[key]
+
+            self.misses += 1
+
+        # Load the features outside of the lock so other threads are not blocked.
+        features = load_fn()
+        self.__insert(key, features)
+
+        return features
+
+    def counters(self):
+        """
+        Get the cache counters.
+
+        Returns:
+            (hits, misses, evictions, n_bytes):
+                Number of hits, misses and evictions and the number of bytes occupied by the
+                cached arrays.
+        """
+        with self.__lock:
+            return self.hits, self.misses, self.evictions, self.n_bytes
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, key):
+        return key in self.__entries
+
+    def __insert(self, key, features):
+        size = sum(feature.nbytes for feature in features)
+
+        # Entries exceeding the entire budget would evict everything without ever being reused.
+        if size > self.max_bytes:
+            return
+
+        with self.__lock:
+            # Another thread might have loaded the same features in the meantime.
+            if key in self.__entries:
+                return
+
+            self.__entries[key] = features
+            self.n_bytes += size
+
+            # Evict the least recently used entries until the budget is met.
+            while self.n_bytes > self.max_bytes:
+                _, evicted = self.__entries.popitem(last=False)
+                self.n_bytes -= sum(feature.nbytes for feature in evicted)
+                self.evictions += 1
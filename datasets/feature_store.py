@@ -0,0 +1,245 @@
+import json
+import os
+import zipfile
+
+import numpy as np
+
+# Name of the index file inside of a feature store folder.
+INDEX_FILE = 'index.json'
+
+# File extension of the packed data file of each feature.
+DATA_EXTENSION = '.bin'
+
+
+def feature_key(wav_path, dataset_folder):
+    """
+    Derive the key under which the features of an audio file are stored.
+
+    The key is the path of the audio file relative to the dataset folder without its extension,
+    so a feature store stays valid if the dataset folder is moved.
+
+    Arguments:
+        wav_path (str):
+            Path to the audio file.
+
+        dataset_folder (str):
+            Path to the dataset folder.
+
+    Returns:
+        str:
+            Feature store key.
+    """
+    return os.path.relpath(os.path.splitext(wav_path)[0], dataset_folder)
+
+
+def npz_frame_count(npz_path, name='mel_mag_db'):
+    """
+    Read the number of frames of a feature stored in a .npz file without loading its data.
+
+    Arguments:
+        npz_path (str):
+            Path to the .npz file.
+
+        name (:obj:`str`, optional):
+            Name of the feature. Defaults to 'mel_mag_db'.
+
+    Returns:
+        int:
+            Number of frames (first dimension) of the feature.
+    """
+    with zipfile.ZipFile(npz_path) as archive:
+        with archive.open('{}.npy'.format(name)) as member:
+            # Only parse the header of the .npy file inside of the archive.
+            version = np.lib.format.read_magic(member)
+            if version == (1, 0):
+                shape, _, _ = np.lib.format.read_array_header_1_0(member)
+            else:
+                shape, _, _ = np.lib.format.read_array_header_2_0(member)
+
+    return shape[0]
+
+
+class FeatureStoreWriter(object):
+    """
+    Writer packing the features of many utterances into a feature store.
+
+    A feature store is a folder containing one contiguous data file per feature and an index.
+    The features of all utterances are appended frame by frame to the data files. The index
+    records the offset and number of frames of each utterance, which are shared by all features.
+    Writers can be used as context managers.
+
+    Arguments:
+        store_folder (str):
+            Path to the feature store folder. The folder is created if it does not exist.
+
+        feature_dims (dict):
+            Dictionary mapping each feature name to the number of values per frame.
+
+        dtype (:obj:`str`, optional):
+            Data type the features are stored in. Either 'float32' or 'float16'.
+            Defaults to 'float32'.
+    """
+
+    def __init__(self, store_folder, feature_dims, dtype='float32'):
+        if dtype not in ('float32', 'float16'):
+            raise ValueError('Unsupported feature store dtype "{}".'.format(dtype))
+
+        self.store_folder = store_folder
+        self.feature_dims = dict(feature_dims)
+        self.dtype = dtype
+
+        self.__keys = []
+        self.__offsets = []
+        self.__lengths = []
+        self.__n_frames = 0
+
+        os.makedirs(store_folder, exist_ok=True)
+
+        # Open the data files of all features for writing.
+        self.__files = dict()
+        for name in self.feature_dims:
+            path = os.path.join(store_folder, '{}{}'.format(name, DATA_EXTENSION))
+            self.__files[name] = open(path, 'wb')
+
+    def append(self, key, features):
+        """
+        Append the features of a single utterance to the store.
+
+        Arguments:
+            key (str):
+                Key under which the features are stored (see `feature_key`).
+
+            features (dict):
+                Dictionary mapping each feature name to an array of shape=(T, dim), with T being
+                the number of frames of the utterance.
+        """
+        n_frames = None
+        for name, dim in self.feature_dims.items():
+            feature = features[name]
+
+            if feature.ndim != 2 or feature.shape[1] != dim:
+                raise ValueError('Feature "{}" of "{}" has shape {}, expected (T, {}).'
+                                 .format(name, key, feature.shape, dim))
+
+            # All features of an utterance share the same offset and length.
+            if n_frames is not None and feature.shape[0] != n_frames:
+                raise ValueError('The features of "{}" differ in their number of frames.'
+                                 .format(key))
+            n_frames = feature.shape[0]
+
+        for name in self.feature_dims:
+            data = np.ascontiguousarray(features[name], dtype=self.dtype)
+            self.__files[name].write(data.tobytes())
+
+        self.__keys.append(key)
+        self.__offsets.append(self.__n_frames)
+        self.__lengths.append(n_frames)
+        self.__n_frames += n_frames
+
+    def close(self):
+        """
+        Close the data files and write the index.
+        """
+        for data_file in self.__files.values():
+            data_file.close()
+
+        index = {
+            'dtype': self.dtype,
+            'features': self.feature_dims,
+            'n_frames': self.__n_frames,
+            'keys': self.__keys,
+            'offsets': self.__offsets,
+            'lengths': self.__lengths
+        }
+
+        # The index is written last, so an incomplete store can not be opened.
+        with open(os.path.join(self.store_folder, INDEX_FILE), 'w') as index_file:
+            json.dump(index, index_file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class FeatureStore(object):
+    """
+    Read-only access to a feature store written by `FeatureStoreWriter`.
+
+    The data files are memory mapped. Hence, opening a store only reads the index and features
+    are returned as zero-copy slices of the mapped files. Several processes reading the same
+    store share the operating systems page cache.
+
+    Arguments:
+        store_folder (str):
+            Path to the feature store folder.
+    """
+
+    def __init__(self, store_folder):
+        self.store_folder = store_folder
+
+        with open(os.path.join(store_folder, INDEX_FILE), 'r') as index_file:
+            index = json.load(index_file)
+
+        self.dtype = np.dtype(index['dtype'])
+        self.feature_dims = index['features']
+
+        self.__lookup = dict()
+        for key, offset, length in zip(index['keys'], index['offsets'], index['lengths']):
+            self.__lookup[key] = (offset, length)
+
+        # Map the data file of each feature as an array of shape=(n_frames, dim).
+        self.__data = dict()
+        for name, dim in self.feature_dims.items():
+            path = os.path.join(store_folder, '{}{}'.format(name, DATA_EXTENSION))
+            if index['n_frames'] == 0:
+                self.__data[name] = np.zeros((0, dim), dtype=self.dtype)
+            else:
+                self.__data[name] = np.memmap(path, dtype=self.dtype, mode='r',
+                                              shape=(index['n_frames'], dim))
+
+    def keys(self):
+        """
+        Get the keys of all utterances in the store.
+
+        Returns:
+            (:obj:`list` of str)
+        """
+        return list(self.__lookup.keys())
+
+    def n_frames(self, key):
+        """
+        Get the number of frames of an utterance without accessing its features.
+
+        Arguments:
+            key (str):
+                Key under which the features are stored (see `feature_key`).
+
+        Returns:
+            int
+        """
+        return self.__lookup[key][1]
+
+    def __len__(self):
+        return len(self.__lookup)
+
+    def __contains__(self, key):
+        return key in self.__lookup
+
+    def __getitem__(self, key):
+        """
+        Get the features of a single utterance.
+
+        Arguments:
+            key (str):
+                Key under which the features are stored (see `feature_key`).
+
+        Returns:
+            dict:
+                Dictionary mapping each feature name to a read-only array of shape=(T, dim).
+                The arrays are views into the memory mapped data files.
+        """
+        offset, length = self.__lookup[key]
+
+        return {name: data[offset:offset + length] for name, data in self.__data.items()}
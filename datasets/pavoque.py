@@ -2,9 +2,9 @@ import os
 
 import numpy as np
 
-from audio.conversion import ms_to_samples, magnitude_to_decibel, normalize_decibel
+from audio.conversion import magnitude_to_decibel, normalize_decibel
 from audio.effects import silence_interval_from_spectrogram
-from audio.features import linear_scale_spectrogram, mel_scale_spectrogram
+from audio.features import FeatureExtractor
 from audio.io import load_wav
 from datasets.dataset_helper import DatasetHelper
 from datasets.statistics import collect_duration_statistics
@@ -102,24 +102,23 @@ class PAVOQUEDatasetHelper(DatasetHelper):
 
     @staticmethod
     def load_audio(file_path):
-        # Window length in audio samples.
-        win_len = ms_to_samples(model_params.win_len, model_params.sampling_rate)
-        # Window hop in audio samples.
-        hop_len = ms_to_samples(model_params.win_hop, model_params.sampling_rate)
-
         # Load the actual audio file.
         wav, sr = load_wav(file_path.decode())
 
-        # Calculate the linear scale spectrogram.
-        # Note the spectrogram shape is transposed to be (T_spec, 1 + n_fft // 2) so dense layers
-        # for example are applied to each frame automatically.
-        linear_spec = linear_scale_spectrogram(wav, model_params.n_fft, hop_len, win_len).T
+        # Calculate the linear and the Mel. scale spectrogram from a single STFT.
+        extractor = FeatureExtractor.from_params(model_params, sampling_rate=sr)
+        linear_mag, mel_spec = extractor.extract(wav)
+
+        # Note the spectrogram shapes are transposed to be (T_spec, 1 + n_fft // 2) and
+        # (T_spec, n_mels) so dense layers for example are applied to each frame automatically.
+        linear_mag = linear_mag.T
+        mel_spec = mel_spec.T
 
         # TODO: Experimental noise removal <64Hz
-        linear_spec[:, 0:8] = 0
+        # Note that the Mel. scale spectrogram is calculated before the noise removal.
+        linear_mag[:, 0:8] = 0
 
         # Convert the linear spectrogram into decibel representation.
-        linear_mag = np.abs(linear_spec)
         linear_mag_db = magnitude_to_decibel(linear_mag)
 
         linear_mag_db = normalize_decibel(linear_mag_db,
@@ -132,13 +131,6 @@ class PAVOQUEDatasetHelper(DatasetHelper):
                                                                  PAVOQUEDatasetHelper.raw_silence_db,
                                                                  np.max)
 
-        # Calculate the Mel. scale spectrogram.
-        # Note the spectrogram shape is transposed to be (T_spec, n_mels) so dense layers for
-        # example are applied to each frame automatically.
-        mel_spec = mel_scale_spectrogram(wav, model_params.n_fft, sr, model_params.n_mels,
-                                         model_params.mel_fmin, model_params.mel_fmax, hop_len,
-                                         win_len, 1).T
-
         # Convert the mel spectrogram into decibel representation.
         mel_mag = np.abs(mel_spec)
         mel_mag_db = magnitude_to_decibel(mel_mag)
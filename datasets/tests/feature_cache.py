@@ -0,0 +1,65 @@
+import numpy as np
+
+from datasets.feature_cache import FeatureCache
+
+
+def features(n_bytes):
+    """
+    Creates a features tuple occupying `n_bytes` bytes.
+
+    Arguments:
+        n_bytes (int):
+            Number of bytes occupied by both feature arrays together.
+
+    Returns:
+        tuple
+    """
+    return np.zeros(n_bytes // 2, dtype=np.uint8), np.zeros(n_bytes // 2, dtype=np.uint8)
+
+
+def test_feature_cache_hits():
+    """
+    Test if a cached entry is returned without loading it again and if the hit, miss, eviction
+    and size counters are updated accordingly.
+    """
+    cache = FeatureCache(max_bytes=100)
+
+    first = cache.get('a', lambda: features(10))
+    second = cache.get('a', lambda: features(10))
+
+    assert first is second
+    assert cache.counters() == (1, 1, 0, 10)
+
+
+def test_feature_cache_eviction():
+    """
+    Test if the least recently used entry is evicted once the byte budget would be exceeded.
+    """
+    cache = FeatureCache(max_bytes=100)
+
+    cache.get('a', lambda: features(40))
+    cache.get('b', lambda: features(40))
+
+    # Accessing 'a' makes 'b' the least recently used entry.
+    cache.get('a', lambda: features(40))
+    cache.get('c', lambda: features(40))
+
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert 'c' in cache
+    assert cache.counters() == (1, 3, 1, 80)
+
+
+def test_feature_cache_oversized():
+    """
+    Test if entries larger than the byte budget are returned without being cached.
+    """
+    cache = FeatureCache(max_bytes=100)
+
+    cache.get('a', lambda: features(40))
+    cache.get('b', lambda: features(200))
+
+    # Oversized entries do not evict other entries.
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert cache.counters() == (0, 2, 0, 40)
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from datasets.feature_store import FeatureStore, FeatureStoreWriter, feature_key, \
+    npz_frame_count
+
+FEATURE_DIMS = {'mel_mag_db': 4, 'linear_mag_db': 6}
+
+
+@pytest.fixture
+def features():
+    """
+    Creates random features for utterances of different lengths.
+
+    Returns:
+        dict:
+            Dictionary mapping the utterance keys to their features.
+    """
+    random = np.random.RandomState(42)
+
+    return {
+        'wavs/{}'.format(i): {name: random.rand(length, dim).astype(np.float32)
+                              for name, dim in FEATURE_DIMS.items()}
+        for i, length in enumerate([3, 1, 7, 5])
+    }
+
+
+@pytest.mark.parametrize('dtype', ['float32', 'float16'])
+def test_feature_store(tmpdir, features, dtype):
+    """
+    Test if the features written into a store are read back as read-only views with the
+    stored data type and the correct number of frames.
+
+    Arguments:
+        tmpdir (py.path.local):
+            Temporary folder to create the store in.
+
+        features (dict):
+            Dictionary mapping the utterance keys to their features.
+
+        dtype (str):
+            Data type to store the features in.
+    """
+    store_folder = str(tmpdir.join('store'))
+
+    with FeatureStoreWriter(store_folder, FEATURE_DIMS, dtype=dtype) as writer:
+        for key, utterance in features.items():
+            writer.append(key, utterance)
+
+    store = FeatureStore(store_folder)
+    assert len(store) == len(features)
+    assert sorted(store.keys()) == sorted(features.keys())
+
+    for key, utterance in features.items():
+        stored = store[key]
+        for name, feature in utterance.items():
+            # The features are read-only views into the mapped data files.
+            assert stored[name].dtype == np.dtype(dtype)
+            assert not stored[name].flags.writeable
+            np.testing.assert_allclose(stored[name], feature, rtol=1e-3)
+
+        assert store.n_frames(key) == len(utterance['mel_mag_db'])
+
+
+def test_feature_store_frame_mismatch(tmpdir):
+    """
+    Test if appending features with different numbers of frames raises a ValueError.
+
+    Arguments:
+        tmpdir (py.path.local):
+            Temporary folder to create the store in.
+    """
+    with FeatureStoreWriter(str(tmpdir), FEATURE_DIMS) as writer:
+        with pytest.raises(ValueError):
+            writer.append('wav', {'mel_mag_db': np.zeros((3, 4)),
+                                  'linear_mag_db': np.zeros((2, 6))})
+
+
+def test_feature_key():
+    """
+    Test deriving the store key of an audio file from its path relative to the dataset folder.
+    """
+    assert feature_key('/data/ljspeech/wavs/LJ001-0001.wav', '/data/ljspeech') == \
+           'wavs/LJ001-0001'
+
+
+def test_npz_frame_count(tmpdir):
+    """
+    Test reading the number of frames from the header of an .npz feature file.
+
+    Arguments:
+        tmpdir (py.path.local):
+            Temporary folder to write the .npz file into.
+    """
+    npz_path = str(tmpdir.join('features.npz'))
+    np.savez(npz_path, mel_mag_db=np.zeros((7, 4)), linear_mag_db=np.zeros((7, 6)))
+
+    assert npz_frame_count(npz_path) == 7
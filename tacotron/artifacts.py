@@ -0,0 +1,86 @@
+import os
+import queue
+import threading
+
+import numpy as np
+
+
+class ArtifactWriter(object):
+    """
+    Writes diagnostic artifacts (e.g. attention alignments) as numpy .npz files on a background
+    thread, so that the disk I/O does not delay the caller.
+
+    The number of artifacts waiting to be written is bounded by `max_pending`. If the writer
+    falls behind, `write` blocks until an artifact was written. Errors raised while writing are
+    re-raised by the next call to `write` or `close`. Writers can be used as context managers.
+
+    Arguments:
+        output_dir (str):
+            Folder to write the artifacts into.
+
+        max_pending (:obj:`int`, optional):
+            Maximal number of artifacts held in memory waiting to be written. Defaults to 16.
+    """
+
+    def __init__(self, output_dir, max_pending=16):
+        self.output_dir = output_dir
+
+        self.__queue = queue.Queue(maxsize=max_pending)
+        self.__error = None
+
+        self.__thread = threading.Thread(target=self.__worker, daemon=True)
+        self.__thread.start()
+
+    def write(self, name, **arrays):
+        """
+        Queue arrays to be written into a single .npz file.
+
+        Arguments:
+            name (str):
+                Name of the file to write, without the .npz extension.
+
+            **arrays:
+                The arrays to write, stored under their keyword names.
+        """
+        self.__raise_error()
+
+        self.__queue.put((name, arrays))
+
+    def close(self):
+        """
+        Wait until all queued artifacts were written and stop the background thread.
+        """
+        if self.__thread.is_alive():
+            self.__queue.put(None)
+            self.__thread.join()
+
+        self.__raise_error()
+
+    def __worker(self):
+        while True:
+            item = self.__queue.get()
+            if item is None:
+                break
+
+            name, arrays = item
+            try:
+                path = os.path.join(self.output_dir, '{}.npz'.format(name))
+
+                # Write into a temporary file first, so that readers never see partial files.
+                tmp_path = '{}.tmp.npz'.format(path[:-len('.npz')])
+                np.savez(tmp_path, **arrays)
+                os.replace(tmp_path, path)
+            except Exception as error:
+                # Errors are raised in the callers thread by the next `write` or `close` call.
+                self.__error = error
+
+    def __raise_error(self):
+        if self.__error is not None:
+            error, self.__error = self.__error, None
+            raise RuntimeError('Writing an artifact failed: {}'.format(error))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
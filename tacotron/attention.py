@@ -29,77 +29,101 @@ class AttentionScore:
     CONCAT = 'concat'
 
 
-def _luong_local_compute_attention(attention_mechanism, cell_output, attention_state,
-                                   attention_layer):
-    """Computes the attention and alignments for the Luong style local attention mechanism."""
-    alignments, next_attention_state = attention_mechanism(
-        cell_output, state=attention_state)
+def _gather_windows(memory, window_positions):
+    """
+    Gather windows from a batch of memory sequences.
+
+    Positions outside of the memory sequence result in zero vectors, which is equivalent to
+    slicing the window out of the memory and zero padding it up to the window size.
+
+    Arguments:
+        memory (tf.Tensor):
+            Memory sequences of shape=(B, T, depth).
 
-    # Reshape from [batch_size, memory_time] to [batch_size, 1, memory_time]
-    expanded_alignments = tf.expand_dims(alignments, 1)
+        window_positions (tf.Tensor):
+            Integer memory positions of each window of shape=(B, W), with W being the window
+            size. Positions may lie outside of the range [0, T).
 
-    context_windows = []
-    padded_alignment_windows = []
+    Returns:
+        tf.Tensor:
+            Windows of shape=(B, W, depth).
+    """
+    batch_size = tf.shape(memory)[0]
+    memory_length = tf.shape(memory)[1]
+    window_size = tf.shape(window_positions)[1]
 
-    window_start = attention_mechanism.window_start
-    window_stop = attention_mechanism.window_stop
+    # Mask all positions outside of the memory.
+    valid = tf.logical_and(window_positions >= 0, window_positions < memory_length)
+    positions = tf.clip_by_value(window_positions, 0, memory_length - 1)
 
-    pre_padding = attention_mechanism.window_pre_padding
-    post_padding = attention_mechanism.window_post_padding
+    # Gather the (clipped) positions of all batch entries at once.
+    batch_indices = tf.tile(tf.expand_dims(tf.range(batch_size), 1), [1, window_size])
+    windows = tf.gather_nd(memory, tf.stack([batch_indices, positions], axis=-1))
 
-    full_pre_padding = attention_mechanism.full_seq_pre_padding
-    full_post_padding = attention_mechanism.full_seq_post_padding
+    return windows * tf.expand_dims(tf.cast(valid, memory.dtype), -1)
 
-    for i in range(0, attention_mechanism.const_batch_size):
-        # Slice out the window from the memory.
-        value_window = attention_mechanism.values[i, window_start[i][0]:window_stop[i][0], :]
 
-        # Add zero padding to the slice in order to ensure the window size is (2D+1).
-        value_window_paddings = [
-            [pre_padding[i][0], post_padding[i][0]],
-            [0, 0]
-        ]
-        value_window = tf.pad(value_window, value_window_paddings, 'CONSTANT')
+def _scatter_windows(window_values, window_positions, memory_length):
+    """
+    Scatter window values back to their positions in memory sequences.
 
-        # Shape information is lost after padding ;(.
-        value_window.set_shape((attention_mechanism.window_size,
-                                attention_mechanism._num_units))
+    This is the inverse of `_gather_windows` for scalar values. Values at positions outside of
+    the memory are dropped and all positions not covered by a window are zero, which is
+    equivalent to zero padding the window up to the memory length.
 
-        # Calculate the context vector for the current batch entry using only information from
-        # teh window.
-        context_window = tf.matmul(expanded_alignments[i], value_window)
-        context_windows.append(context_window)
+    Arguments:
+        window_values (tf.Tensor):
+            Values of shape=(B, W), with W being the window size.
 
-        if attention_mechanism.force_gaussian is True:
-            # Apply gaussian weighting of the window contents.
-            point_dist = tf.cast(tf.range(start=window_start[i][0],
-                                          limit=window_stop[i][0],
-                                          delta=1), dtype=tf.float32) - attention_mechanism.p[i][0]
+        window_positions (tf.Tensor):
+            Integer memory positions of each window of shape=(B, W).
 
-            gaussian_weights = tf.exp(-(point_dist ** 2) / 2 * (attention_mechanism.d / 2) ** 2)
+        memory_length (tf.Tensor):
+            Length T of the memory sequences.
+
+    Returns:
+        tf.Tensor:
+            Values of shape=(B, T).
+    """
+    # One-hot encodings of positions outside of [0, T) are all zero.
+    # shape => (B, W, T)
+    scatter = tf.one_hot(window_positions, depth=memory_length, dtype=window_values.dtype)
+
+    # shape => (B, 1, W) x (B, W, T) => (B, 1, T)
+    return tf.squeeze(tf.matmul(tf.expand_dims(window_values, 1), scatter), [1])
 
-            __alignments = alignments[i] * gaussian_weights
-        else:
-            # Use the raw window contents.
-            __alignments = alignments[i]
 
-        # Add padding to the alignments to get from the window size 2D+1 up to the original
-        # memory length.
-        alignment_seq_paddings = [
-            [full_pre_padding[i][0], full_post_padding[i][0]],
-        ]
-        __alignments = tf.pad(__alignments, alignment_seq_paddings, 'CONSTANT')
+def _luong_local_compute_attention(attention_mechanism, cell_output, attention_state,
+                                   attention_layer):
+    """Computes the attention and alignments for the Luong style local attention mechanism."""
+    alignments, next_attention_state = attention_mechanism(
+        cell_output, state=attention_state)
+
+    window_positions = attention_mechanism.window_positions
+
+    # Extract the windows of all batch entries from the memory.
+    # shape => (B, 2D+1, depth)
+    value_windows = _gather_windows(attention_mechanism.values, window_positions)
+
+    # Calculate the context vectors using only information from the windows.
+    # shape => (B, 1, 2D+1) x (B, 2D+1, depth) => (B, depth)
+    context = tf.squeeze(tf.matmul(tf.expand_dims(alignments, 1), value_windows), [1])
+
+    if attention_mechanism.force_gaussian is True:
+        # Apply gaussian weighting of the window contents.
+        point_dist = tf.cast(window_positions, dtype=tf.float32) - attention_mechanism.p
 
-        padded_alignment_windows.append(__alignments)
+        gaussian_weights = tf.exp(-(point_dist ** 2) / 2 * (attention_mechanism.d / 2) ** 2)
 
-    # Stack all context vectors into one tensor.
-    context = tf.stack(context_windows)
-    # Squeeze out the helper dimension used for calculating the context.
-    context = tf.squeeze(context, [1])
+        window_alignments = alignments * tf.cast(gaussian_weights, alignments.dtype)
+    else:
+        # Use the raw window contents.
+        window_alignments = alignments
 
-    # Stack all alignment vectors into one tensor. This tensor gives alignments for each encoder
-    # step.
-    padded_alignment = tf.stack(padded_alignment_windows)
+    # Place the window alignments at their positions in the memory to get alignments for each
+    # encoder step.
+    memory_length = tf.shape(attention_mechanism.values)[1]
+    padded_alignment = _scatter_windows(window_alignments, window_positions, memory_length)
 
     if attention_layer is not None:
         attention = attention_layer(tf.concat([cell_output, context], 1))
@@ -121,7 +145,6 @@ class LocalLuongAttention(LuongAttention):
 
     def __init__(self, num_units,
                  memory,
-                 const_batch_size,
                  memory_sequence_length=None,
                  scale=False,
                  probability_fn=None,
@@ -143,10 +166,6 @@ class LocalLuongAttention(LuongAttention):
                 The memory to query; usually the output of an RNN encoder.
                 The shape is expected to be shape=(batch_size, encoder_max_time, ...)
 
-            const_batch_size (int):
-                The constant batch size to expect from every batch. Every batch is expected to
-                contain exactly `const_batch_size` samples.
-
             memory_sequence_length:
                 (optional) Sequence lengths for the batch entries
                 in memory.  If provided, the memory tensor rows are masked with zeros
@@ -209,9 +228,6 @@ class LocalLuongAttention(LuongAttention):
         # Store the scoring function style to be used.
         self.score_mode = score_mode
 
-        # The constant batch size to expect.
-        self.const_batch_size = const_batch_size
-
         self.force_gaussian = force_gaussian
 
     def __call__(self, query, state):
@@ -245,9 +261,9 @@ class LocalLuongAttention(LuongAttention):
 
             if self.attention_mode == AttentionMode.PREDICTIVE:
                 # Predictive selection fo the attention window position.
-                vp = tf.get_variable(name="local_v_p", shape=[num_units, 1], dtype=tf.float32)
+                vp = tf.get_variable(name="local_v_p", shape=[num_units, 1], dtype=query.dtype)
                 wp = tf.get_variable(name="local_w_p", shape=[num_units, num_units],
-                                     dtype=tf.float32)
+                                     dtype=query.dtype)
 
                 # shape => (B, num_units)
                 _intermediate_result = tf.transpose(tf.tensordot(wp, query, [0, 1]))
@@ -256,7 +272,9 @@ class LocalLuongAttention(LuongAttention):
                 _tmp = tf.transpose(tf.tensordot(vp, tf.tanh(_intermediate_result), [0, 1]))
 
                 # Derive p_t as described by Luong for the predictive local-p case.
-                self.p = tf.cast(source_seq_length, tf.float32) * tf.sigmoid(_tmp)
+                # The window position is always calculated in float32.
+                self.p = tf.cast(source_seq_length, tf.float32) * tf.sigmoid(
+                    tf.cast(_tmp, tf.float32))
 
             elif self.attention_mode == AttentionMode.MONOTONIC:
                 # Derive p_t as described by Luong for the predictive local-m case.
@@ -274,52 +292,15 @@ class LocalLuongAttention(LuongAttention):
             start_index = tf.floor(self.p) - self.d
             start_index = tf.cast(start_index, dtype=tf.int32)
 
-            # Prevent the window from leaving the memory.
-            self.window_start = tf.maximum(0, start_index)
-
-            # Calculate the memory sequence index at which the window should stop.
-            stop_index = tf.floor(self.p) + self.d + 1
-            stop_index = tf.cast(stop_index, dtype=tf.int32)
-
-            # Prevent the window from leaving the memory.
-            self.window_stop = tf.minimum(source_seq_length, stop_index)
-
-            # Calculate how many padding frames should be added to the start of the window.
-            # This is used to get up to the total memory length again.
-            self.full_seq_pre_padding = tf.abs(start_index)
-
-            # Calculate how many padding frames should be added to the end of the window.
-            # This is used to get up to the total memory length again.
-            self.full_seq_post_padding = tf.abs(stop_index - source_seq_length)
-
-            # Calculate how many padding frames should be added to the start of the window.
-            # This is used to get the window up to 2D+1 frames.
-            self.window_pre_padding = tf.abs(self.window_start - start_index)
-
-            # Calculate how many padding frames should be added to the end of the window.
-            # This is used to get the window up to 2D+1 frames.
-            self.window_post_padding = tf.abs(self.window_stop - stop_index)
+            # Memory positions covered by the window of each batch entry.
+            # Positions outside of the memory are masked when the windows are extracted.
+            # shape => (B, 2D+1)
+            self.window_positions = start_index + tf.range(self.window_size)
 
-            # Slice the windows for every batch entry.
+            # Extract the windows of all batch entries from the processed memory.
+            # shape => (B, 2D+1, num_units)
             with tf.variable_scope(None, "window_extraction", [query]):
-                windows = []
-                # Iterate the batch entries.
-                for i in range(0, self.const_batch_size):
-                    # Slice out the window from the processed memory.
-                    __window = self._keys[i, self.window_start[i][0]:self.window_stop[i][0], :]
-
-                    # Add zero padding to the slice in order to ensure the window size is (2D+1).
-                    paddings = [
-                        [self.window_pre_padding[i][0], self.window_post_padding[i][0]],
-                        [0, 0]
-                    ]
-                    __window = tf.pad(__window, paddings, 'CONSTANT')
-
-                    # Collect the extracted windows for each batch entry.
-                    windows.append(__window)
-
-                # Merge all extracted windows into one tensor.
-                window = tf.stack(windows)
+                window = _gather_windows(self._keys, self.window_positions)
 
             # Calculate the not not normalized attention score as described by Luong as dot.
             if self.score_mode == AttentionScore.DOT:
@@ -0,0 +1,119 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class DynamicBatcher(object):
+    """
+    Groups requests that are submitted concurrently into batches that are processed at once.
+
+    A batching window is opened as soon as a request arrives. All requests arriving within
+    `max_wait` seconds are collected, the window is closed early once `max_batch_size` requests
+    are waiting. Requests submitted in the meantime wait in order of arrival for the next window.
+    The collected requests are passed to `process_fn` sorted by length. Each batch is processed
+    by a single call to `process_fn` on a background thread.
+
+    Arguments:
+        process_fn (function):
+            Function `process_fn(items)` processing a batch of requests. It has to return a list
+            with one result for each request, in the order the requests were passed.
+
+        max_batch_size (int):
+            Maximal number of requests processed in a single batch.
+
+        max_wait (float):
+            Maximal number of seconds to wait for further requests after the first request of
+            a batching window arrived.
+
+        length_fn (:obj:`function`, optional):
+            Function returning the length of a request used for sorting. Defaults to `len`.
+    """
+
+    def __init__(self, process_fn, max_batch_size, max_wait, length_fn=len):
+        self.process_fn = process_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.length_fn = length_fn
+
+        self.__queue = queue.Queue()
+        self.__thread = threading.Thread(target=self.__worker, daemon=True)
+        self.__thread.start()
+
+    def submit(self, item):
+        """
+        Submit a request to be processed in one of the next batches.
+
+        Arguments:
+            item:
+                The request to process.
+
+        Returns:
+            concurrent.futures.Future:
+                Future resolving to the result of the request.
+        """
+        future = Future()
+        self.__queue.put((item, future))
+
+        return future
+
+    def close(self):
+        """
+        Process all submitted requests and stop the background thread.
+        """
+        if self.__thread.is_alive():
+            self.__queue.put(None)
+            self.__thread.join()
+
+    def __collect(self):
+        # Block until the first request of the window arrives.
+        request = self.__queue.get()
+        if request is None:
+            return [], True
+
+        requests = [request]
+        deadline = time.time() + self.max_wait
+
+        # Close the window early once a batch is full, further requests wait for the next window.
+        while len(requests) < self.max_batch_size:
+            # Wait for further requests until the window is closed.
+            timeout = deadline - time.time()
+            if timeout <= 0.0:
+                break
+
+            try:
+                request = self.__queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+
+            if request is None:
+                return requests, True
+
+            requests.append(request)
+
+        return requests, False
+
+    def __worker(self):
+        stop = False
+        while not stop:
+            requests, stop = self.__collect()
+
+            if len(requests) > 0:
+                # Pass the requests of the batch sorted by length.
+                requests = sorted(requests, key=lambda _request: self.length_fn(_request[0]))
+                self.__process(requests)
+
+    def __process(self, requests):
+        items = [item for item, _ in requests]
+        futures = [future for _, future in requests]
+
+        try:
+            results = self.process_fn(items)
+        except Exception as error:
+            # Propagate the error to all requests of the batch.
+            for future in futures:
+                future.set_exception(error)
+            return
+
+        for future, result in zip(futures, results):
+            future.set_result(result)
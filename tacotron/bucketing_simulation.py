@@ -0,0 +1,95 @@
+from datasets.feature_store import FeatureStore
+from tacotron.input_pipeline import calculate_bucket_boundaries, frame_budget_buckets, \
+    load_frame_counts, simulate_bucketing
+from tacotron.params.dataset import dataset_params
+from tacotron.params.training import training_params
+
+# Largest number of buckets to simulate.
+MAX_BUCKETS = 40
+
+# Relative amount of padded frames (compared to the best simulated configuration) up to which
+# a configuration with fewer buckets is preferred.
+TOLERANCE = 0.01
+
+
+def simulate(sentence_lengths, frame_counts, n_buckets):
+    """
+    Simulate one epoch of the bucketing configured by the training parameters.
+
+    Arguments:
+        sentence_lengths (:obj:`list` of int):
+            Sequence lengths of all sentences including the <EOS> token.
+
+        frame_counts (:obj:`list` of int):
+            Number of spectrogram frames of all samples.
+
+        n_buckets (int):
+            The number of buckets to create.
+
+    Returns:
+        (bucket_boundaries, counts):
+            bucket_boundaries (:obj:`list` of int):
+                Sorted boundaries of the buckets.
+            counts (dict):
+                Real and padded tokens and frames (see `simulate_bucketing`).
+    """
+    if training_params.max_frames_per_batch is not None:
+        # Bucket by frame counts with a batch size for each bucket.
+        bucket_boundaries, bucket_batch_sizes = frame_budget_buckets(
+            frame_counts, n_buckets, training_params.max_frames_per_batch)
+        bucket_lengths = frame_counts
+    else:
+        # Bucket by sentence lengths with a fixed batch size.
+        bucket_boundaries = calculate_bucket_boundaries(sentence_lengths, n_buckets)
+        bucket_batch_sizes = [training_params.batch_size] * (len(bucket_boundaries) + 1)
+        bucket_lengths = sentence_lengths
+
+    counts = simulate_bucketing(bucket_lengths, sentence_lengths, frame_counts,
+                                bucket_boundaries, bucket_batch_sizes)
+
+    return bucket_boundaries, counts
+
+
+if __name__ == '__main__':
+    dataset = dataset_params.dataset_loader(dataset_folder=dataset_params.dataset_folder,
+                                            char_dict=dataset_params.vocabulary_dict,
+                                            fill_dict=False)
+
+    print("Dataset: {}".format(dataset_params.dataset_folder))
+    _, lens, paths = dataset.load(max_samples=training_params.max_samples)
+
+    # The frame counts are read from the pre-computed features.
+    feature_store = None
+    if dataset_params.feature_store_folder is not None:
+        feature_store = FeatureStore(dataset_params.feature_store_folder)
+
+    frames = load_frame_counts(paths, dataset_params.dataset_folder, feature_store)
+
+    if training_params.max_frames_per_batch is not None:
+        print("Bucketing by frame counts, max. {} frames per batch."
+              .format(training_params.max_frames_per_batch))
+    else:
+        print("Bucketing by sentence lengths, batch size {}.".format(training_params.batch_size))
+
+    print('{:>9} {:>9} {:>12} {:>12} {:>14}'.format('n_buckets', 'n_batches', 'tokens [%]',
+                                                    'frames [%]', 'padded frames'))
+
+    results = []
+    for n in range(1, min(MAX_BUCKETS, len(lens)) + 1):
+        boundaries, counts = simulate(lens, frames, n)
+        results.append((n, boundaries, counts))
+
+        print('{:>9} {:>9} {:>12.1f} {:>12.1f} {:>14}'.format(
+            n,
+            counts['n_batches'],
+            100.0 * counts['real_tokens'] / counts['padded_tokens'],
+            100.0 * counts['real_frames'] / counts['padded_frames'],
+            counts['padded_frames'] - counts['real_frames']))
+
+    # Recommend the fewest buckets that come close to the least amount of padding.
+    min_padded = min(counts['padded_frames'] for _, _, counts in results)
+    n, boundaries, _ = next(result for result in results
+                            if result[2]['padded_frames'] <= (1.0 + TOLERANCE) * min_padded)
+
+    print("Recommended: n_buckets={}".format(n))
+    print("bucket_boundaries", boundaries)
@@ -1,4 +1,3 @@
-from datasets.statistics import collect_decibel_statistics
 from tacotron.params.dataset import dataset_params
 
 if __name__ == '__main__':
@@ -12,4 +11,17 @@ if __name__ == '__main__':
 
     # Pre-compute features for all the files.
     print("Pre-computing features for {} files ...".format(len(paths)))
-    dataset.pre_compute_features(paths)
\ No newline at end of file
+    failures = dataset.pre_compute_features(paths,
+                                            n_workers=dataset_params.precalc_n_workers,
+                                            force=dataset_params.precalc_force)
+
+    # List the files that could not be processed.
+    for path, error in sorted(failures.items()):
+        print('Failed: "{}": {}'.format(path, error))
+
+    # Pack the pre-computed features into a single feature store.
+    if dataset_params.feature_store_folder is not None:
+        print("Packing features into the feature store ...")
+        dataset.pack_features(paths,
+                              store_folder=dataset_params.feature_store_folder,
+                              dtype=dataset_params.feature_store_dtype)
@@ -1,8 +1,8 @@
 import os
 
 import tensorflow as tf
-import numpy as np
 
+from tacotron.input_pipeline import batched_dataset_inputs, calculate_bucket_boundaries
 from tacotron.model import Tacotron, Mode
 from tacotron.params.dataset import dataset_params
 from tacotron.params.evaluation import evaluation_params
@@ -20,6 +20,8 @@ def batched_placeholders(dataset, max_samples, batch_size):
     Created batches from an dataset that are bucketed by the input sentences sequence lengths.
     Creates placeholders that are filled by QueueRunners. Before executing the placeholder it is
     therefore required to start the corresponding threads using `tf.train.start_queue_runners`.
+    If `evaluation_params.input_pipeline` is 'dataset', the placeholders are filled by a
+    `tf.data` input pipeline instead (see `tacotron.input_pipeline.batched_dataset_inputs`).
 
     Arguments:
         dataset (datasets.DatasetHelper):
@@ -71,30 +73,29 @@ def batched_placeholders(dataset, max_samples, batch_size):
     n_samples = len(sentence_lengths)
     print('Loaded {} dataset entries.'.format(n_samples))
 
-    # Sort sequence lengths in order to slice them into buckets that contain sequences of roughly
-    # equal length.
-    sorted_sentence_lengths = np.sort(sentence_lengths)
-
-    if n_samples < evaluation_params.n_buckets:
-        raise AssertionError('The number of entries loaded is smaller than the number of '
-                             'buckets to be created. Automatic calculation of the bucket '
-                             'boundaries is not possible.')
-
-    # Slice the sorted lengths into equidistant sections and use the first element of a slice as
-    # the bucket boundary.
-    bucket_step = n_samples // evaluation_params.n_buckets
-    bucket_boundaries = sorted_sentence_lengths[::bucket_step]
-
-    # Throw away the first and last bucket boundaries since the bucketing algorithm automatically
-    # adds two surrounding ones.
-    bucket_boundaries = bucket_boundaries[1:-1].tolist()
-
-    # Remove duplicate boundaries from the list.
-    bucket_boundaries = sorted(list(set(bucket_boundaries)))
+    bucket_boundaries = calculate_bucket_boundaries(sentence_lengths,
+                                                    evaluation_params.n_buckets)
 
     print('bucket_boundaries', bucket_boundaries)
     print('n_buckets: {} + 2'.format(len(bucket_boundaries)))
 
+    # Create the batches using the tf.data based input pipeline if requested.
+    if evaluation_params.input_pipeline == 'dataset':
+        placeholder_dict = batched_dataset_inputs(
+            sentences, sentence_lengths, wav_paths,
+            load_fn=dataset.load_audio,
+            batch_size=batch_size,
+            bucket_boundaries=bucket_boundaries,
+            n_epochs=1,
+            shuffle=evaluation_params.shuffle_samples,
+            seed=evaluation_params.shuffle_seed,
+            n_threads=n_threads,
+            n_prefetch_batches=evaluation_params.n_pre_calc_batches,
+            allow_smaller_batches=evaluation_params.allow_smaller_batches,
+            prefetch_device=evaluation_params.prefetch_device)
+
+        return placeholder_dict, n_samples
+
     # Convert everything into tf.Tensor objects for queue based processing.
     sentences = tf.convert_to_tensor(sentences)
     sentence_lengths = tf.convert_to_tensor(sentence_lengths)
@@ -105,7 +106,8 @@ def batched_placeholders(dataset, max_samples, batch_size):
         [sentences, sentence_lengths, wav_paths],
         capacity=n_threads * batch_size,
         num_epochs=1,
-        shuffle=evaluation_params.shuffle_samples)
+        shuffle=evaluation_params.shuffle_samples,
+        seed=evaluation_params.shuffle_seed)
 
     # The sentence is a integer sequence (char2idx), we need to interpret it as such since it is
     # stored in a tensor that hold objects in order to manage sequences of different lengths in a
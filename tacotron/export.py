@@ -59,12 +59,24 @@ def export(model):
         tensor_info_input = tf.saved_model.utils.build_tensor_info(model.inp_sentences)
         tensor_info_output = tf.saved_model.utils.build_tensor_info(model.output_linear_spec)
 
+        outputs = {
+            'output_linear_spec': tensor_info_output,
+            # Number of valid frames of each spectrogram.
+            'output_lengths': tf.saved_model.utils.build_tensor_info(model.output_lengths)
+        }
+        if model.output_wav is not None:
+            # Export the waveforms reconstructed inside the graph as well.
+            outputs['output_wav'] = tf.saved_model.utils.build_tensor_info(model.output_wav)
+            outputs['output_wav_lengths'] = tf.saved_model.utils.build_tensor_info(
+                model.output_wav_lengths)
+
         # Defines the model signatures, uses the TF Predict API.
-        # It receives an sentence and outputs the linear spectrogram.
+        # It receives an sentence and outputs the linear spectrogram (and the waveforms) along
+        # with the number of valid frames (and samples) of each batch entry.
         prediction_signature = (
             tf.saved_model.signature_def_utils.build_signature_def(
                 inputs={'ph_inp_sentences': tensor_info_input},
-                outputs={'output_linear_spec': tensor_info_output},
+                outputs=outputs,
                 method_name=tf.saved_model.signature_constants.PREDICT_METHOD_NAME))
 
         builder.add_meta_graph_and_variables(
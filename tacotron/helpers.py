@@ -12,7 +12,8 @@ class TacotronInferenceHelper(seq2seq.Helper):
     See: https://github.com/tensorflow/tensorflow/issues/12065
     """
 
-    def __init__(self, batch_size, input_size, max_iterations=None):
+    def __init__(self, batch_size, input_size, max_iterations=None, dtype=tf.float32,
+                 stop_fn=None):
         """
         Creates an TacotronInferenceHelper instance.
 
@@ -26,9 +27,19 @@ class TacotronInferenceHelper(seq2seq.Helper):
             max_iterations (tf.Dimension):
                 The maximal number of frames to generate. Defaults to None.
                 If None generation will continue until the decoder reaches its own limit.
+
+            dtype (:obj:`tf.DType`, optional):
+                Data type of the decoder inputs. Defaults to `tf.float32`.
+
+            stop_fn (:obj:`function`, optional):
+                Function `stop_fn(outputs, state)` returning a boolean tensor of shape=(B)
+                that indicates for each sequence in the batch if decoding can be stopped early.
+                Defaults to None. If None, only `max_iterations` is used to stop decoding.
         """
         self._batch_size = batch_size
         self._input_size = input_size
+        self._dtype = dtype
+        self._stop_fn = stop_fn
 
         # Set the sequence length to be generated according to max_iterations.
         if max_iterations is None:
@@ -105,7 +116,7 @@ class TacotronInferenceHelper(seq2seq.Helper):
 
         # The initial input for the decoder is considered to be a <GO> frame.
         # We will input an zero vector as the <GO> frame.
-        initial_inputs = tf.zeros([self._batch_size, self._input_size], dtype=tf.float32)
+        initial_inputs = tf.zeros([self._batch_size, self._input_size], dtype=self._dtype)
 
         return initial_finished, initial_inputs
 
@@ -131,7 +142,7 @@ class TacotronInferenceHelper(seq2seq.Helper):
         # Returning some tensor of dtype=tf.int32 and random shape seems to be enough.
         return tf.zeros(1, dtype=tf.int32)
 
-    def __is_decoding_finished(self, next_time, outputs):
+    def __is_decoding_finished(self, next_time, outputs, state):
         """
         Determine for each sequence in a batch if decoding is finished or not.
 
@@ -143,6 +154,9 @@ class TacotronInferenceHelper(seq2seq.Helper):
                 Outputs of the last decoder step. The shape is expected to be shape=(B, O),
                 with B being the batch size and O being the RNNs output size.
 
+            state:
+                RNN state after the last decoder step.
+
         Returns:
             tf.Tensor:
                 A tensor indicating for each sequence in the batch whether decoding is
@@ -156,6 +170,10 @@ class TacotronInferenceHelper(seq2seq.Helper):
             # Stop if the desired sequence length was reached.
             finished = (next_time >= self._sequence_length)
 
+        if self._stop_fn is not None:
+            # Stop sequences early that fulfill the stopping criterion.
+            finished = tf.logical_or(finished, self._stop_fn(outputs, state))
+
         return finished
 
     def next_inputs(self, time, outputs, state, sample_ids, name=None):
@@ -191,7 +209,8 @@ class TacotronInferenceHelper(seq2seq.Helper):
 
         # Check if decoding is finished.
         finished = self.__is_decoding_finished(next_time=time + 1,
-                                               outputs=outputs)
+                                               outputs=outputs,
+                                               state=state)
 
         # Use the last steps outputs as the next steps inputs.
         # When using the Tacotron reduction factor r the RNN produces an output of size
@@ -230,6 +249,7 @@ class TacotronTrainingHelper(seq2seq.Helper):
                 Ground truth Mel. spectrogram data used for feeding ground truth frames during
                 training. The shape is expected to be shape=(B, T_spec, n_mels), with B being the
                 batch size and T_spec being the number of frames in the spectrogram.
+                The decoder inputs are fed in the same data type as `outputs`.
 
             input_size (int):
                 The size of the features in the last dimension of `outputs`.
@@ -247,6 +267,9 @@ class TacotronTrainingHelper(seq2seq.Helper):
             self._reduction_factor = reduction_factor
             self._batch_size = batch_size
 
+            # The <GO> frame is fed in the same data type as the ground truth frames.
+            self._dtype = outputs.dtype
+
             # Get the number of time frames the decoder has to produce.
             # Note that we will produce sequences over the entire length of the batch. Maybe this
             # way the network will learn to generate silence after producing the actual sentence.
@@ -334,7 +357,7 @@ class TacotronTrainingHelper(seq2seq.Helper):
 
             # The initial input for the decoder is considered to be a <GO> frame.
             # We will input an zero vector as the <GO> frame.
-            initial_inputs = tf.zeros([self._batch_size, self._input_size], dtype=tf.float32)
+            initial_inputs = tf.zeros([self._batch_size, self._input_size], dtype=self._dtype)
 
         return initial_finished, initial_inputs
 
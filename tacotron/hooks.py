@@ -0,0 +1,514 @@
+import collections
+import glob
+import os
+import queue
+import re
+import threading
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.python.client import timeline
+from tensorflow.python.ops import gen_data_flow_ops, io_ops
+from tensorflow.python.training.saver import BaseSaverBuilder
+
+# Operation types of the queues monitored by the `StepProfilerHook`.
+QUEUE_OPS = ['FIFOQueueV2', 'PaddingFIFOQueueV2', 'RandomShuffleQueueV2', 'PriorityQueueV2']
+
+
+def retained_checkpoints(steps, keep_last, keep_every_steps=None):
+    """
+    Apply the checkpoint retention policy to the global steps of existing checkpoints.
+
+    Arguments:
+        steps (:obj:`list` of int):
+            Global steps of the existing checkpoints.
+
+        keep_last (int):
+            Number of most recent checkpoints to keep.
+
+        keep_every_steps (:obj:`int`, optional):
+            Additionally keep every checkpoint whose global step is a multiple of
+            `keep_every_steps`. If None, only the most recent checkpoints are kept.
+
+    Returns:
+        (:obj:`list` of int):
+            Sorted global steps of the checkpoints to keep.
+    """
+    steps = sorted(steps)
+
+    retained = set()
+    if keep_last > 0:
+        retained.update(steps[-keep_last:])
+
+    if keep_every_steps is not None:
+        retained.update(step for step in steps if step % keep_every_steps == 0)
+
+    return sorted(retained)
+
+
+class AsyncCheckpointSaverHook(tf.train.SessionRunHook):
+    """
+    Saves checkpoints without blocking the training loop while they are serialized.
+
+    Every `save_steps` global steps the variables are copied into host memory (a snapshot) using
+    a single `session.run` after the training step. The snapshot is written to disk by a
+    background thread using a separate graph and session. The number of snapshots held in host
+    memory is bounded by `max_in_flight`. If all slots are taken, the training loop waits for the
+    oldest snapshot to be written.
+
+    The checkpoints contain the same tensors a `tf.train.Saver` writes for the default variable
+    list (including saveable objects such as the canonical CUDNN RNN weights). Hence, they can
+    be restored by a regular saver.
+
+    Checkpoints are retained according to a policy keeping the most recent checkpoints plus
+    every checkpoint whose global step is a multiple of `keep_every_steps`
+    (see `retained_checkpoints`).
+    """
+
+    def __init__(self, checkpoint_dir, save_steps, keep_last, keep_every_steps=None,
+                 max_in_flight=1, checkpoint_basename='model.ckpt'):
+        """
+        Creates an AsyncCheckpointSaverHook instance.
+
+        Arguments:
+            checkpoint_dir (str):
+                Folder to save the checkpoints in.
+
+            save_steps (int):
+                Number of global steps after which to save a checkpoint.
+
+            keep_last (int):
+                Number of most recent checkpoints to keep. Has to be at least 1.
+
+            keep_every_steps (:obj:`int`, optional):
+                Additionally keep every checkpoint whose global step is a multiple of
+                `keep_every_steps`. Defaults to None.
+
+            max_in_flight (:obj:`int`, optional):
+                Maximal number of snapshots waiting to be written or being written.
+                If 0, checkpoints are written synchronously. Defaults to 1.
+
+            checkpoint_basename (:obj:`str`, optional):
+                Base name of the checkpoint files. Defaults to 'model.ckpt'.
+        """
+        if keep_last < 1:
+            raise ValueError('At least the most recent checkpoint has to be kept.')
+
+        self.checkpoint_dir = checkpoint_dir
+        self.keep_last = keep_last
+        self.keep_every_steps = keep_every_steps
+        self.max_in_flight = max_in_flight
+
+        self.__save_path = os.path.join(checkpoint_dir, checkpoint_basename)
+        self.__timer = tf.train.SecondOrStepTimer(every_steps=save_steps)
+
+        # Global steps of the checkpoints on disk.
+        self.__steps = []
+        self.__last_saved_step = None
+
+        self.__global_step = None
+        self.__tensors = None
+
+        # Graph and session used to write the snapshots.
+        self.__writer_graph = None
+        self.__writer_session = None
+        self.__ph_prefix = None
+        self.__ph_tensors = None
+        self.__save_op = None
+
+        # Background writer.
+        self.__slots = threading.Semaphore(max(max_in_flight, 1))
+        self.__queue = queue.Queue()
+        self.__thread = None
+        self.__error = None
+
+    def begin(self):
+        self.__global_step = tf.train.get_global_step()
+        if self.__global_step is None:
+            raise RuntimeError('Global step should be created to use AsyncCheckpointSaverHook.')
+
+        # Collect the tensors a regular saver would write for the default variable list.
+        names, slices, tensors = [], [], []
+        saveables = tf.global_variables() + tf.get_collection(tf.GraphKeys.SAVEABLE_OBJECTS)
+        for name, op in BaseSaverBuilder.OpListToDict(saveables).items():
+            for saveable in BaseSaverBuilder.SaveableObjectsForOp(op, name):
+                for spec in saveable.specs:
+                    names.append(spec.name)
+                    slices.append(spec.slice_spec)
+                    tensors.append(spec.tensor)
+
+        self.__tensors = tensors
+
+        # Create a separate graph writing fed snapshots, so the training graph stays untouched.
+        self.__writer_graph = tf.Graph()
+        with self.__writer_graph.as_default():
+            self.__ph_prefix = tf.placeholder(dtype=tf.string, shape=())
+            self.__ph_tensors = [tf.placeholder(dtype=tensor.dtype.base_dtype)
+                                 for tensor in tensors]
+            self.__save_op = io_ops.save_v2(self.__ph_prefix, names, slices, self.__ph_tensors)
+
+        # Continue applying the retention policy to checkpoints of a previous run.
+        state = tf.train.get_checkpoint_state(self.checkpoint_dir)
+        if state is not None:
+            for path in state.all_model_checkpoint_paths:
+                match = re.search(r'-(\d+)$', path)
+                if match is not None:
+                    self.__steps.append(int(match.group(1)))
+
+    def after_create_session(self, session, coord):
+        # Write the graph definition once, as the synchronous checkpoint saver hook does.
+        tf.train.write_graph(tf.get_default_graph().as_graph_def(add_shapes=True),
+                             self.checkpoint_dir,
+                             'graph.pbtxt')
+
+        self.__writer_session = tf.Session(graph=self.__writer_graph,
+                                           config=tf.ConfigProto(device_count={'GPU': 0}))
+
+        if self.max_in_flight > 0:
+            self.__thread = threading.Thread(target=self.__worker, daemon=True)
+            self.__thread.start()
+
+        # Do not save the checkpoint that was just restored (or initialized) again.
+        global_step = session.run(self.__global_step)
+        self.__timer.update_last_triggered_step(global_step)
+        self.__last_saved_step = global_step
+
+    def before_run(self, run_context):
+        return tf.train.SessionRunArgs(self.__global_step)
+
+    def after_run(self, run_context, run_values):
+        self.__raise_writer_error()
+
+        # The fetched global step was read before the training step incremented it.
+        stale_global_step = run_values.results
+        if self.__timer.should_trigger_for_step(stale_global_step + 1):
+            # The global step is not incremented by every step (e.g. gradient accumulation).
+            global_step = run_context.session.run(self.__global_step)
+            if self.__timer.should_trigger_for_step(global_step):
+                self.__save(run_context.session)
+
+    def end(self, session):
+        # Save the final state of the variables.
+        if session.run(self.__global_step) != self.__last_saved_step:
+            self.__save(session)
+
+        # Wait for all pending snapshots to be written.
+        if self.__thread is not None:
+            self.__queue.put(None)
+            self.__thread.join()
+
+        self.__writer_session.close()
+        self.__raise_writer_error()
+
+    def __save(self, session):
+        # Wait for a free slot, bounding the number of snapshots held in host memory.
+        self.__slots.acquire()
+
+        # Copy the variables into host memory.
+        values, global_step = session.run([self.__tensors, self.__global_step])
+        self.__timer.update_last_triggered_step(global_step)
+        self.__last_saved_step = global_step
+
+        if self.max_in_flight > 0:
+            self.__queue.put((global_step, values))
+        else:
+            self.__write(global_step, values)
+
+    def __worker(self):
+        while True:
+            item = self.__queue.get()
+            if item is None:
+                break
+
+            self.__write(*item)
+
+    def __write(self, global_step, values):
+        try:
+            path = '{}-{}'.format(self.__save_path, global_step)
+            tf.logging.info('Saving checkpoint for {} into {}.'.format(global_step, path))
+
+            feed_dict = dict(zip(self.__ph_tensors, values))
+            feed_dict[self.__ph_prefix] = path
+            self.__writer_session.run(self.__save_op, feed_dict=feed_dict)
+
+            self.__steps.append(global_step)
+            self.__apply_retention()
+        except Exception as error:
+            # Errors are raised in the training thread by the next `after_run` call.
+            self.__error = error
+        finally:
+            self.__slots.release()
+
+    def __apply_retention(self):
+        retained = retained_checkpoints(self.__steps, self.keep_last, self.keep_every_steps)
+
+        # Remove the index and data files of all checkpoints that are not retained.
+        for step in set(self.__steps) - set(retained):
+            for path in glob.glob('{}-{}.*'.format(self.__save_path, step)):
+                os.remove(path)
+
+        self.__steps = retained
+
+        # Point the checkpoint state file to the retained checkpoints using relative paths.
+        basename = os.path.basename(self.__save_path)
+        paths = ['{}-{}'.format(basename, step) for step in retained]
+        tf.train.update_checkpoint_state(self.checkpoint_dir,
+                                         model_checkpoint_path=paths[-1],
+                                         all_model_checkpoint_paths=paths)
+
+    def __raise_writer_error(self):
+        if self.__error is not None:
+            error, self.__error = self.__error, None
+            raise RuntimeError('Writing a checkpoint failed: {}'.format(error))
+
+
+class LatencyRecorder:
+    """
+    Thread-safe recorder for the latencies of function calls (e.g. `tf.py_func` loaders).
+
+    Arguments:
+        max_samples (:obj:`int`, optional):
+            Maximal number of latencies kept between two calls to `collect`. Older latencies are
+            discarded. Defaults to 10000.
+    """
+
+    def __init__(self, max_samples=10000):
+        self.__latencies = collections.deque(maxlen=max_samples)
+        self.__lock = threading.Lock()
+
+    def wrap(self, fn):
+        """
+        Wrap a function so that the latency of each call is recorded.
+
+        Arguments:
+            fn (function):
+                Function to be wrapped.
+
+        Returns:
+            function:
+                Function with the same signature as `fn`.
+        """
+        def __timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.record(time.perf_counter() - start)
+
+        return __timed
+
+    def record(self, seconds):
+        """
+        Record a single latency.
+
+        Arguments:
+            seconds (float):
+                Latency in seconds.
+        """
+        with self.__lock:
+            self.__latencies.append(seconds)
+
+    def collect(self, percentiles=(50, 90, 99)):
+        """
+        Calculate percentiles of the latencies recorded since the last call and clear them.
+
+        Arguments:
+            percentiles (:obj:`tuple` of float, optional):
+                Percentiles to calculate. Defaults to (50, 90, 99).
+
+        Returns:
+            (:obj:`list` of float):
+                Latencies in seconds for each percentile, or None if nothing was recorded.
+        """
+        with self.__lock:
+            latencies = list(self.__latencies)
+            self.__latencies.clear()
+
+        if len(latencies) == 0:
+            return None
+
+        return np.percentile(latencies, percentiles).tolist()
+
+
+class StepProfilerHook(tf.train.SessionRunHook):
+    """
+    Profiles the training steps to tell input-bound from model-bound training.
+
+    For every step the hook measures the time spent waiting for the input batch and the time
+    spent computing afterwards. The input wait ends when the batch is dequeued, which is
+    detected by a marker added to the inputs using `watch_inputs`. Every `every_n_steps` steps
+    the following averages are written as summaries and logged:
+
+        - profiler/step_time, profiler/input_wait, profiler/compute and
+          profiler/input_wait_fraction.
+        - profiler/queue_fill/<queue>: Fill level of each input queue (e.g. the bucketing
+          queues) as a fraction of its capacity.
+        - profiler/loader_latency_p50, _p90 and _p99: Latency percentiles of the functions
+          wrapped by `load_latency` (e.g. the `tf.py_func` feature loader).
+
+    Optionally, a full `tf.RunMetadata` trace of every `trace_steps`'th step is written as a
+    Chrome trace file (open with chrome://tracing) into the output folder.
+    """
+
+    def __init__(self, output_dir, every_n_steps, trace_steps=None):
+        """
+        Creates a StepProfilerHook instance.
+
+        Arguments:
+            output_dir (str):
+                Folder to write the summaries and traces to.
+
+            every_n_steps (int):
+                Number of steps after which to report the profiling results.
+
+            trace_steps (:obj:`int`, optional):
+                Number of steps after which to write a Chrome trace. If None, no traces are
+                written. Defaults to None.
+        """
+        self.output_dir = output_dir
+        self.every_n_steps = every_n_steps
+        self.trace_steps = trace_steps
+
+        # Recorder for the input loading function latencies.
+        self.load_latency = LatencyRecorder()
+
+        self.__step = 0
+        self.__start = None
+        self.__inputs_ready = None
+        self.__tracing = False
+
+        # Accumulated step, input wait and compute times since the last report.
+        self.__times = np.zeros(3)
+        self.__n_timed = 0
+
+        self.__global_step = None
+        self.__queue_fill = None
+        self.__writer = None
+
+    def watch_inputs(self, inputs):
+        """
+        Mark the time at which the inputs of a step become available.
+
+        Arguments:
+            inputs (dict):
+                Input placeholder dictionary (see `tacotron.train.batched_placeholders`).
+
+        Returns:
+            dict:
+                Placeholder dictionary to be used instead of `inputs`. The placeholders are only
+                available after the time was marked.
+        """
+        def __mark(*_):
+            self.__inputs_ready = time.time()
+            return np.int64(0)
+
+        with tf.name_scope('profiler'):
+            # All inputs are produced by the same dequeue operation, so the marker runs as
+            # soon as the batch is available.
+            with tf.device('/cpu:0'):
+                shapes = [tf.shape(value) for value in inputs.values()]
+                marker = tf.py_func(__mark, shapes, tf.int64, stateful=True)
+
+            watched = dict()
+            for key, value in inputs.items():
+                with tf.colocate_with(value), tf.control_dependencies([marker]):
+                    watched[key] = tf.identity(value)
+
+        return watched
+
+    def begin(self):
+        self.__global_step = tf.train.get_global_step()
+        if self.__global_step is None:
+            raise RuntimeError('Global step should be created to use StepProfilerHook.')
+
+        # Monitor the fill level of all input queues.
+        self.__queue_fill = dict()
+        with tf.name_scope('profiler'):
+            for op in tf.get_default_graph().get_operations():
+                if op.type not in QUEUE_OPS:
+                    continue
+
+                with tf.device(op.device):
+                    size = tf.cast(gen_data_flow_ops.queue_size_v2(op.outputs[0]), tf.float32)
+
+                # Unbounded queues report their absolute size.
+                capacity = op.get_attr('capacity')
+                self.__queue_fill[op.name] = size / capacity if capacity > 0 else size
+
+        self.__writer = tf.summary.FileWriterCache.get(self.output_dir)
+
+    def before_run(self, run_context):
+        self.__step += 1
+
+        fetches = {'global_step': self.__global_step}
+        if self.__step % self.every_n_steps == 0:
+            fetches['queue_fill'] = self.__queue_fill
+
+        options = None
+        self.__tracing = self.trace_steps is not None and self.__step % self.trace_steps == 0
+        if self.__tracing:
+            options = tf.RunOptions(trace_level=tf.RunOptions.FULL_TRACE)
+
+        self.__inputs_ready = None
+        self.__start = time.time()
+
+        return tf.train.SessionRunArgs(fetches, options=options)
+
+    def after_run(self, run_context, run_values):
+        end = time.time()
+
+        # Only steps that consumed a batch are timed.
+        if self.__inputs_ready is not None:
+            input_wait = max(self.__inputs_ready - self.__start, 0.0)
+            self.__times += [end - self.__start, input_wait, end - self.__start - input_wait]
+            self.__n_timed += 1
+
+        global_step = run_values.results['global_step']
+
+        if self.__tracing:
+            self.__write_trace(run_values.run_metadata, global_step)
+
+        if 'queue_fill' in run_values.results:
+            self.__report(global_step, run_values.results['queue_fill'])
+
+    def end(self, session):
+        self.__writer.flush()
+
+    def __write_trace(self, run_metadata, global_step):
+        trace = timeline.Timeline(run_metadata.step_stats)
+
+        path = os.path.join(self.output_dir, 'timeline-{}.json'.format(global_step))
+        with open(path, 'w') as trace_file:
+            trace_file.write(trace.generate_chrome_trace_format())
+
+        tf.logging.info('Wrote Chrome trace of step {} to {}.'.format(global_step, path))
+
+    def __report(self, global_step, queue_fill):
+        summary = tf.Summary()
+
+        if self.__n_timed > 0:
+            step_time, input_wait, compute = self.__times / self.__n_timed
+            summary.value.add(tag='profiler/step_time', simple_value=step_time)
+            summary.value.add(tag='profiler/input_wait', simple_value=input_wait)
+            summary.value.add(tag='profiler/compute', simple_value=compute)
+            summary.value.add(tag='profiler/input_wait_fraction',
+                              simple_value=input_wait / step_time)
+
+            tf.logging.info('Step time: {:.3f} s, input wait: {:.3f} s, compute: {:.3f} s ({})'
+                            .format(step_time, input_wait, compute,
+                                    'input-bound' if input_wait > compute else 'model-bound'))
+
+        for name, fill in sorted(queue_fill.items()):
+            summary.value.add(tag='profiler/queue_fill/{}'.format(name), simple_value=fill)
+
+        latencies = self.load_latency.collect()
+        if latencies is not None:
+            for percentile, latency in zip((50, 90, 99), latencies):
+                summary.value.add(tag='profiler/loader_latency_p{}'.format(percentile),
+                                  simple_value=latency)
+
+        self.__writer.add_summary(summary, global_step)
+
+        self.__times = np.zeros(3)
+        self.__n_timed = 0
@@ -2,11 +2,12 @@ import os
 
 import numpy as np
 import tensorflow as tf
-from multiprocessing import Pool as ThreadPool
 
-from audio.conversion import inv_normalize_decibel, decibel_to_magnitude, ms_to_samples
+from audio.conversion import inv_normalize_decibel, decibel_to_magnitude
 from audio.io import save_wav
-from audio.synthesis import spectrogram_to_wav
+from audio.executors import create_executor
+from audio.vocoders import vocoder_from_params
+from tacotron.artifacts import ArtifactWriter
 from tacotron.model import Tacotron, Mode
 from tacotron.params.dataset import dataset_params
 from tacotron.params.inference import inference_params
@@ -27,87 +28,246 @@ def pad_sentence(_sentence, _max_len):
     return _sentence
 
 
-def inference(model, sentences):
+class InferenceEngine(object):
     """
-    Arguments:
-        model (Tacotron):
-            The Tacotron model instance to use for inference.
+    Long-lived inference session for the Tacotron model.
 
-        sentences (:obj:`list` of :obj:`np.ndarray`):
-            The padded sentences in id representation to feed to the network.
+    The graph is built and the checkpoint is restored only once. Afterwards `synthesize` can be
+    called repeatedly, each call only costs a single `session.run` plus the spectrogram
+    inversion on a persistent pool of workers.
 
-    Returns:
-        spectrograms (:obj:`list` of :obj:`np.ndarray`):
-            The generated linear scale magnitude spectrograms.
+    If `inference_params.dump_alignments` or `inference_params.dump_linear_spectrogram` is
+    enabled, the requested tensors are fetched along with the outputs and are written into
+    `inference_params.synthesis_dir` by an `ArtifactWriter` on a background thread.
     """
-    # Checkpoint folder to load the inference checkpoint from.
-    checkpoint_load_dir = os.path.join(
-        inference_params.checkpoint_dir,
-        inference_params.checkpoint_load_run
-    )
 
-    if inference_params.checkpoint_file is None:
-        # Get the path to the latest checkpoint file.
-        checkpoint_file = tf.train.latest_checkpoint(checkpoint_load_dir)
-    else:
-        checkpoint_file = inference_params.checkpoint_file
+    def __init__(self, checkpoint_file=None, write_summaries=None):
+        """
+        Builds the inference graph and restores the model.
+
+        Arguments:
+            checkpoint_file (:obj:`str`, optional):
+                Path to the checkpoint to restore. Defaults to None.
+                If None, `inference_params.checkpoint_file` or the latest checkpoint in the
+                checkpoint load run folder is restored.
+
+            write_summaries (:obj:`boolean`, optional):
+                Flag controlling if summaries (and the dumps configured in `inference_params`)
+                are written for each run. Defaults to None.
+                If None, `inference_params.write_summaries` is used.
+        """
+        if checkpoint_file is None:
+            checkpoint_file = inference_params.checkpoint_file
+
+        if checkpoint_file is None:
+            # Get the path to the latest checkpoint file.
+            checkpoint_file = tf.train.latest_checkpoint(os.path.join(
+                inference_params.checkpoint_dir,
+                inference_params.checkpoint_load_run
+            ))
+
+        if write_summaries is None:
+            write_summaries = inference_params.write_summaries
+
+        self.graph = tf.Graph()
+        with self.graph.as_default():
+            # Create batched placeholders for inference.
+            placeholders = Tacotron.model_placeholders()
+
+            # Create the Tacotron model.
+            self.model = Tacotron(inputs=placeholders, mode=Mode.PREDICT)
+
+            # Tensors fetched in each run.
+            self.__fetches = {
+                'spectrograms': self.model.output_linear_spec,
+                'lengths': self.model.output_lengths
+            }
+
+            # Fetch the waveforms reconstructed inside the graph within the same run.
+            if self.model.output_wav is not None:
+                self.__fetches['wavs'] = self.model.output_wav
+                self.__fetches['wav_lengths'] = self.model.output_wav_lengths
+
+            self.__summary_writer = None
+            if write_summaries:
+                # Checkpoint folder to save the inference summaries into.
+                checkpoint_save_dir = os.path.join(
+                    inference_params.checkpoint_dir,
+                    inference_params.checkpoint_save_run
+                )
+
+                # Summaries are only calculated if they are requested.
+                self.__fetches['summary'] = self.model.summary()
+                self.__summary_writer = tf.summary.FileWriter(checkpoint_save_dir, self.graph)
+
+            # Diagnostic tensors are only fetched if they are requested.
+            # The linear spectrograms are fetched in each run anyway.
+            if inference_params.dump_alignments:
+                self.__fetches['alignments'] = self.model.alignment_history
+
+            saver = tf.train.Saver()
+
+            # Create the inference session.
+            self.session = start_session(graph=self.graph)
+
+            print('Restoring model...')
+            saver.restore(self.session, checkpoint_file)
+            print('Restoring finished')
+
+        # Nothing is added to the graph after the model was restored.
+        self.graph.finalize()
+
+        self.__artifact_writer = None
+        if inference_params.dump_alignments or inference_params.dump_linear_spectrogram:
+            self.__artifact_writer = ArtifactWriter(inference_params.synthesis_dir)
+
+        # Number of processed requests, used to name the artifacts of unnamed requests.
+        self.__n_requests = 0
+
+        self.__executor = None
+        if self.model.output_wav is None:
+            # Start a persistent pool of workers for spectrogram inversion.
+            self.__executor = create_executor(inference_params.synthesis_backend,
+                                              vocoder_from_params(model_params),
+                                              inference_params.n_synthesis_workers,
+                                              batch_size=inference_params.synthesis_batch_size)
+
+    def predict(self, sentences, request_id=None):
+        """
+        Generate spectrograms for a batch of sentences.
+
+        Arguments:
+            sentences (:obj:`list` of :obj:`np.ndarray`):
+                The sentences in id representation including the <EOS> token.
+                The sentences are padded to the same length internally.
+
+            request_id (:obj:`str`, optional):
+                Name prefix of the artifacts written for this request. Defaults to None.
+                If None, the number of the request is used.
+
+        Returns:
+            (spectrograms, wavs):
+                spectrograms (:obj:`list` of :obj:`np.ndarray`):
+                    The generated linear scale magnitude spectrograms of shape=(F, T), trimmed
+                    to the number of frames generated for each sentence.
+                wavs (:obj:`list` of :obj:`np.ndarray`):
+                    The waveforms reconstructed inside the graph if `reconstruction_in_graph` is
+                    enabled, None otherwise. Trimmed to the number of valid samples.
+        """
+        if request_id is None:
+            request_id = '{:06d}'.format(self.__n_requests)
+
+        self.__n_requests += 1
+
+        sentence_lengths = [len(sentence) for sentence in sentences]
+
+        # Pad the sentences to the same length in order to batch them in a single tensor.
+        max_length = max(sentence_lengths)
+        sentences = [pad_sentence(sentence, max_length) for sentence in sentences]
+
+        results = self.session.run(self.__fetches, feed_dict={
+            self.model.inp_sentences: sentences
+        })
+
+        if self.__artifact_writer is not None:
+            self.__write_artifacts(request_id, results, sentence_lengths)
 
-    saver = tf.train.Saver()
+        if self.__summary_writer is not None:
+            # Write the summary statistics.
+            self.__summary_writer.add_summary(results['summary'])
 
-    # Checkpoint folder to save the evaluation summaries into.
-    checkpoint_save_dir = os.path.join(
-        inference_params.checkpoint_dir,
-        inference_params.checkpoint_save_run
-    )
+        wavs = None
+        if 'wavs' in results:
+            # Only keep the valid samples of each waveform.
+            wavs = [wav[:length] for wav, length in zip(results['wavs'], results['wav_lengths'])]
 
-    # Prepare the summary writer.
-    summary_writer = tf.summary.FileWriter(checkpoint_save_dir, tf.get_default_graph())
-    summary_op = tacotron_model.summary()
-
-    # Create the inference session.
-    session = start_session()
-
-    print('Restoring model...')
-    saver.restore(session, checkpoint_file)
-    print('Restoring finished')
-
-    # Infer data.
-    summary, spectrograms = session.run(
-        # TODO: implement automatic stopping after a certain amount of silence was generated.
-        # Then we could set max_iterations much higher and only use it as a worst case fallback
-        # when the network does not stop by itself.
-        [
-            summary_op,
-            model.output_linear_spec
-        ],
-        feed_dict={
-            model.inp_sentences: sentences
-        })
+        # Reverse the normalization of the valid frames of each spectrogram.
+        spectrograms = list()
+        for spectrogram, length in zip(results['spectrograms'], results['lengths']):
+            linear_mag_db = inv_normalize_decibel(spectrogram[:length].T,
+                                                  dataset_params.dataset_loader.mel_mag_ref_db,
+                                                  dataset_params.dataset_loader.mel_mag_max_db)
+
+            spectrograms.append(decibel_to_magnitude(linear_mag_db))
+
+        return spectrograms, wavs
+
+    def synthesize(self, sentences, request_id=None):
+        """
+        Synthesize the waveforms for a batch of sentences.
+
+        Arguments:
+            sentences (:obj:`list` of :obj:`np.ndarray`):
+                The sentences in id representation including the <EOS> token.
+
+            request_id (:obj:`str`, optional):
+                Name prefix of the artifacts written for this request (see `predict`).
+
+        Returns:
+            (:obj:`list` of :obj:`np.ndarray`):
+                The synthesized waveforms.
+        """
+        specs, wavs = self.predict(sentences, request_id)
+
+        if wavs is None:
+            # Raise the magnitudes to a power before reconstruction.
+            specs = [np.power(linear_mag, model_params.magnitude_power) for linear_mag in specs]
+
+            # Synthesize waveforms from the spectrograms using batched spectrogram inversion.
+            wavs = self.__executor.synthesize(specs)
+
+        return wavs
 
-    # Write the summary statistics.
-    inference_summary = tf.Summary()
-    inference_summary.ParseFromString(summary)
-    summary_writer.add_summary(inference_summary)
+    def __write_artifacts(self, request_id, results, sentence_lengths):
+        # Each sentence of the request gets its own files.
+        for i, (length, sentence_length) in enumerate(zip(results['lengths'], sentence_lengths)):
+            name = '{}-{}'.format(request_id, i)
 
-    # Apply Griffin-Lim to all spectrogram's to get the waveforms.
-    normalized = list()
-    for spectrogram in spectrograms:
-        print('Reverse spectrogram normalization ...', spectrogram.shape)
-        linear_mag_db = inv_normalize_decibel(spectrogram.T,
-                                              dataset_params.dataset_loader.mel_mag_ref_db,
-                                              dataset_params.dataset_loader.mel_mag_max_db)
+            if 'alignments' in results:
+                # Only keep the alignments of the decoder steps generated for the sentence.
+                # => shape=(T_sent, T_spec // r)
+                n_steps = length // self.model.hparams.reduction
+                alignments = results['alignments'][:n_steps, i, :sentence_length].T
+                self.__artifact_writer.write('{}-alignments'.format(name), alignments=alignments)
 
-        linear_mag = decibel_to_magnitude(linear_mag_db)
-        normalized.append(linear_mag)
+            if inference_params.dump_linear_spectrogram:
+                # => shape=(T_spec, 1 + n_fft // 2)
+                linear_spec = results['spectrograms'][i][:length]
+                self.__artifact_writer.write('{}-linear-spectrogram'.format(name),
+                                             linear_spec=linear_spec)
 
-    session.close()
+    def close(self):
+        """
+        Close the session, the summary writer, the artifact writer and the spectrogram inversion
+        workers.
+        """
+        if self.__executor is not None:
+            self.__executor.close()
 
-    return normalized
+        if self.__artifact_writer is not None:
+            # Wait for the pending artifacts to be written.
+            self.__artifact_writer.close()
 
+        if self.__summary_writer is not None:
+            self.__summary_writer.close()
 
-def start_session():
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def start_session(graph=None):
     """
-    Creates a session that can be used for training.
+    Creates a session that can be used for inference.
+
+    Arguments:
+        graph (tf.Graph):
+            Default graph to set when creating the session.
+            Default is None.
 
     Returns:
         tf.Session
@@ -119,9 +279,14 @@ def start_session():
         )
     )
 
-    session = tf.Session(config=session_config)
+    session = tf.Session(
+        config=session_config,
+        graph=graph
+    )
+
+    with session.graph.as_default():
+        init_op = tf.group(tf.global_variables_initializer(), tf.local_variables_initializer())
 
-    init_op = tf.group(tf.global_variables_initializer(), tf.local_variables_initializer())
     session.run(init_op)
 
     return session
@@ -151,41 +316,9 @@ if __name__ == '__main__':
     # Get the first sentence.
     sentences = [np.fromstring(id_sequence, dtype=np.int32) for id_sequence in id_sequences]
 
-    # Pad sentence to the same length in order to be able to batch them in a single tensor.
-    max_length = max(sequence_lengths)
-    sentences = [pad_sentence(sentence, max_length) for sentence in sentences]
-
-    # Create a batch with only one entry.
-    # sentence = np.array([sentences[0]], dtype=np.int32)
-
-    # Create batched placeholders for inference.
-    placeholders = Tacotron.model_placeholders()
-
-    # Create the Tacotron model.
-    tacotron_model = Tacotron(inputs=placeholders, mode=Mode.PREDICT)
-
-    # generate linear scale magnitude spectrograms.
-    specs = inference(tacotron_model, sentences)
-
-    win_len = ms_to_samples(model_params.win_len, model_params.sampling_rate)
-    win_hop = ms_to_samples(model_params.win_hop, model_params.sampling_rate)
-    n_fft = model_params.n_fft
-
-    def synthesize(linear_mag):
-        linear_mag = np.power(linear_mag, model_params.magnitude_power)
-
-        print('Spectrogram inversion ...')
-        return spectrogram_to_wav(linear_mag,
-                                  win_len,
-                                  win_hop,
-                                  n_fft,
-                                  model_params.reconstruction_iterations)
-
-    # Synthesize waveforms from the spectrograms.
-    pool = ThreadPool(inference_params.n_synthesis_threads)
-    wavs = pool.map(synthesize, specs)
-    pool.close()
-    pool.join()
+    # Load the model once and synthesize all sentences in a single batch.
+    with InferenceEngine() as engine:
+        wavs = engine.synthesize(sentences)
 
     # Write all generated waveforms to disk.
     for i, (sentence, wav) in enumerate(zip(raw_sentences, wavs)):
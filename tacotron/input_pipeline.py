@@ -0,0 +1,422 @@
+import os
+
+import numpy as np
+import tensorflow as tf
+
+from datasets.feature_store import feature_key, npz_frame_count
+from tacotron.params.model import model_params
+
+
+def calculate_bucket_boundaries(sentence_lengths, n_buckets):
+    """
+    Calculate bucket boundaries slicing the sorted sentence lengths into equidistant sections.
+
+    Arguments:
+        sentence_lengths (:obj:`list` of int):
+            Sequence lengths of all sentences in the dataset.
+
+        n_buckets (int):
+            The number of buckets to create. If less buckets are needed for proper sorting of
+            the data, less buckets are used.
+
+    Returns:
+        (:obj:`list` of int):
+            Sorted list of unique bucket boundaries. The bucketing algorithms automatically add
+            two surrounding buckets.
+    """
+    n_samples = len(sentence_lengths)
+
+    # Sort sequence lengths in order to slice them into buckets that contain sequences of roughly
+    # equal length.
+    sorted_sentence_lengths = np.sort(sentence_lengths)
+
+    if n_samples < n_buckets:
+        raise AssertionError('The number of entries loaded is smaller than the number of '
+                             'buckets to be created. Automatic calculation of the bucket '
+                             'boundaries is not possible.')
+
+    # Slice the sorted lengths into equidistant sections and use the first element of a slice as
+    # the bucket boundary.
+    bucket_step = n_samples // n_buckets
+    bucket_boundaries = sorted_sentence_lengths[::bucket_step]
+
+    # Throw away the first and last bucket boundaries since the bucketing algorithm automatically
+    # adds two surrounding ones.
+    bucket_boundaries = bucket_boundaries[1:-1].tolist()
+
+    # Remove duplicate boundaries from the list.
+    return sorted(list(set(bucket_boundaries)))
+
+
+def frame_budget_buckets(frame_counts, n_buckets, max_frames_per_batch):
+    """
+    Calculate frame count bucket boundaries and a batch size for each bucket, such that no batch
+    exceeds a budget of padded spectrogram frames.
+
+    Arguments:
+        frame_counts (:obj:`list` of int):
+            Number of spectrogram frames of all samples in the dataset.
+
+        n_buckets (int):
+            The number of buckets to create (see `calculate_bucket_boundaries`).
+
+        max_frames_per_batch (int):
+            Maximal number of padded spectrogram frames (batch size times the number of frames
+            of the longest sample) per batch.
+
+    Returns:
+        (bucket_boundaries, bucket_batch_sizes):
+            bucket_boundaries (:obj:`list` of int):
+                Sorted frame count boundaries of the buckets.
+            bucket_batch_sizes (:obj:`list` of int):
+                Batch size for each of the `len(bucket_boundaries) + 1` buckets.
+    """
+    bucket_boundaries = calculate_bucket_boundaries(frame_counts, n_buckets)
+
+    # Largest frame count that can occur in each bucket.
+    bucket_max_frames = [boundary - 1 for boundary in bucket_boundaries] + [int(max(frame_counts))]
+
+    # Samples exceeding the budget on their own are still batched, one at a time.
+    bucket_batch_sizes = [max(1, max_frames_per_batch // n_frames)
+                          for n_frames in bucket_max_frames]
+
+    return bucket_boundaries, bucket_batch_sizes
+
+
+def simulate_bucketing(bucket_lengths, sentence_lengths, frame_counts, bucket_boundaries,
+                       bucket_batch_sizes, seed=42):
+    """
+    Simulate the bucketing of a single, shuffled epoch and count the real and padded tokens and
+    frames of all batches.
+
+    Every batch is padded to the longest sentence and the longest spectrogram it contains.
+    Incomplete batches are kept.
+
+    Arguments:
+        bucket_lengths (:obj:`list` of int):
+            Lengths used to assign the samples to buckets (sentence lengths or frame counts).
+
+        sentence_lengths (:obj:`list` of int):
+            Sequence lengths of all sentences including the <EOS> token.
+
+        frame_counts (:obj:`list` of int):
+            Number of spectrogram frames of all samples.
+
+        bucket_boundaries (:obj:`list` of int):
+            Sorted boundaries of the buckets.
+
+        bucket_batch_sizes (:obj:`list` of int):
+            Batch size for each of the `len(bucket_boundaries) + 1` buckets.
+
+        seed (:obj:`int`, optional):
+            Seed used to shuffle the samples. Defaults to 42.
+
+    Returns:
+        dict:
+            Dictionary containing the number of 'real_tokens', 'padded_tokens', 'real_frames',
+            'padded_frames' and 'n_batches'. Padded counts include the real ones.
+    """
+    order = np.random.RandomState(seed).permutation(len(bucket_lengths))
+    bucket_lengths = np.asarray(bucket_lengths)[order]
+    sentence_lengths = np.asarray(sentence_lengths)[order]
+    frame_counts = np.asarray(frame_counts)[order]
+
+    # Buckets are the intervals [-inf, b_0), [b_0, b_1), ..., [b_n, inf).
+    bucket_ids = np.searchsorted(bucket_boundaries, bucket_lengths, side='right')
+
+    counts = {'real_tokens': 0, 'padded_tokens': 0, 'real_frames': 0, 'padded_frames': 0,
+              'n_batches': 0}
+
+    for bucket_id, batch_size in enumerate(bucket_batch_sizes):
+        in_bucket = bucket_ids == bucket_id
+        bucket_sentences = sentence_lengths[in_bucket]
+        bucket_frames = frame_counts[in_bucket]
+
+        for start in range(0, len(bucket_sentences), batch_size):
+            batch_sentences = bucket_sentences[start:start + batch_size]
+            batch_frames = bucket_frames[start:start + batch_size]
+
+            counts['real_tokens'] += int(np.sum(batch_sentences))
+            counts['padded_tokens'] += len(batch_sentences) * int(np.max(batch_sentences))
+            counts['real_frames'] += int(np.sum(batch_frames))
+            counts['padded_frames'] += len(batch_frames) * int(np.max(batch_frames))
+            counts['n_batches'] += 1
+
+    return counts
+
+
+def estimate_padding_efficiency(frame_counts, bucket_boundaries, bucket_batch_sizes, seed=42):
+    """
+    Estimate the fraction of real (non padding) frames in the batches created by bucketing
+    samples by their number of frames (see `simulate_bucketing`).
+
+    Arguments:
+        frame_counts (:obj:`list` of int):
+            Number of spectrogram frames of all samples in the dataset.
+
+        bucket_boundaries (:obj:`list` of int):
+            Sorted frame count boundaries of the buckets.
+
+        bucket_batch_sizes (:obj:`list` of int):
+            Batch size for each of the `len(bucket_boundaries) + 1` buckets.
+
+        seed (:obj:`int`, optional):
+            Seed used to shuffle the samples. Defaults to 42.
+
+    Returns:
+        float:
+            Ratio of real frames to padded frames in the range (0.0, 1.0].
+    """
+    counts = simulate_bucketing(frame_counts, frame_counts, frame_counts, bucket_boundaries,
+                                bucket_batch_sizes, seed=seed)
+
+    return counts['real_frames'] / max(counts['padded_frames'], 1)
+
+
+def load_frame_counts(wav_paths, dataset_folder, feature_store=None):
+    """
+    Get the number of spectrogram frames of the pre-processed features of each audio file.
+
+    The frame counts are read from the feature store index or the .npz file headers, without
+    loading the features.
+
+    Arguments:
+        wav_paths (:obj:`list` of str):
+            Paths to the audio files.
+
+        dataset_folder (str):
+            Path to the dataset folder.
+
+        feature_store (:obj:`datasets.feature_store.FeatureStore`, optional):
+            Feature store containing the features. If None, the .npz files next to the audio
+            files are used. Defaults to None.
+
+    Returns:
+        (:obj:`list` of int):
+            Number of frames for each audio file.
+    """
+    if feature_store is not None:
+        return [feature_store.n_frames(feature_key(wav_path, dataset_folder))
+                for wav_path in wav_paths]
+
+    return [npz_frame_count('{}.npz'.format(os.path.splitext(wav_path)[0]))
+            for wav_path in wav_paths]
+
+
+def add_padding_summaries(placeholders, bucket_boundaries=None, bucket_by_frames=False):
+    """
+    Add summaries reporting the real and padded number of tokens and frames in each batch.
+
+    Arguments:
+        placeholders (dict):
+            Placeholder dictionary (see `tacotron.train.batched_placeholders`).
+
+        bucket_boundaries (:obj:`list` of int, optional):
+            Sorted boundaries of the buckets. If not None, the id of the bucket each batch was
+            taken from is reported as well. Defaults to None.
+
+        bucket_by_frames (:obj:`bool`, optional):
+            Flag controlling if the samples are bucketed by their number of spectrogram frames
+            instead of their sentence lengths. Defaults to False.
+    """
+    with tf.name_scope('input_pipeline'):
+        sentence_lengths = placeholders['ph_sentence_length']
+        time_frames = placeholders['ph_time_frames']
+        batch_size = tf.size(time_frames)
+
+        def __counts(_lengths):
+            # Every sample of a batch is padded to the longest one.
+            _real = tf.cast(tf.reduce_sum(_lengths), tf.float32)
+            _padded = tf.cast(batch_size * tf.reduce_max(_lengths), tf.float32)
+            return _real, _padded
+
+        real_tokens, padded_tokens = __counts(sentence_lengths)
+        tf.summary.scalar('real_tokens', real_tokens)
+        tf.summary.scalar('padded_tokens', padded_tokens)
+        tf.summary.scalar('token_efficiency', real_tokens / tf.maximum(padded_tokens, 1.0))
+
+        real_frames, padded_frames = __counts(time_frames)
+        tf.summary.scalar('real_frames', real_frames)
+        tf.summary.scalar('padded_frames', padded_frames)
+        tf.summary.scalar('padding_efficiency', real_frames / tf.maximum(padded_frames, 1.0))
+
+        tf.summary.scalar('batch_size', batch_size)
+
+        if bucket_boundaries is not None:
+            # All samples of a batch are from the same bucket.
+            length = time_frames[0] if bucket_by_frames else sentence_lengths[0]
+            boundaries = tf.constant(bucket_boundaries, dtype=length.dtype)
+            tf.summary.scalar('bucket_id', tf.reduce_sum(tf.cast(length >= boundaries, tf.int32)))
+
+
+def batched_dataset_inputs(sentences, sentence_lengths, wav_paths, load_fn, batch_size,
+                           bucket_boundaries, n_epochs=None, shuffle=False, seed=None,
+                           n_threads=4, n_prefetch_batches=8, allow_smaller_batches=False,
+                           prefetch_device=None, bucket_by_frames=False,
+                           bucket_batch_sizes=None):
+    """
+    Create batches from a dataset that are bucketed by the input sentences sequence lengths using
+    a `tf.data` input pipeline.
+
+    The audio features are loaded by `n_threads` parallel calls of `load_fn`. Sentences are
+    grouped into buckets (as with `tf.contrib.training.bucket_by_sequence_length`) and each
+    bucket is padded and batched separately. Alternatively, samples are bucketed by their
+    number of spectrogram frames with a separate batch size for each bucket
+    (see `frame_budget_buckets`). Finished batches are prefetched, optionally onto
+    the device the model is placed on, so input processing overlaps with the training step.
+
+    Arguments:
+        sentences (:obj:`list` of bytes):
+            Integer id sequences of all sentences (see `DatasetHelper.process_sentences`).
+
+        sentence_lengths (:obj:`list` of int):
+            Sequence lengths of all sentences including the <EOS> token.
+
+        wav_paths (:obj:`list` of str):
+            Paths to the audio recordings of each sentence.
+
+        load_fn (function):
+            Function loading the audio features of a single recording. It is called with the
+            audio file path (bytes) and is expected to return the tuple (mel_mag_db,
+            linear_mag_db) of np.float32 arrays (see `DatasetHelper.load_audio`).
+
+        batch_size (int):
+            Target size of the batches to create.
+
+        bucket_boundaries (:obj:`list` of int):
+            Sorted sentence length (or frame count if `bucket_by_frames` is True) boundaries of
+            the buckets.
+
+        n_epochs (:obj:`int`, optional):
+            Number of epochs to iterate the dataset. If None, the dataset is repeated
+            indefinitely. Defaults to None.
+
+        shuffle (:obj:`bool`, optional):
+            Flag that enables/disables sample shuffle at the beginning of each epoch.
+            Defaults to False.
+
+        seed (:obj:`int`, optional):
+            Seed for the shuffle operation. If not None, the order of all batches is
+            deterministic. Defaults to None.
+
+        n_threads (:obj:`int`, optional):
+            Number of parallel calls to `load_fn`. Defaults to 4.
+
+        n_prefetch_batches (:obj:`int`, optional):
+            Number of batches to pre-calculate. Defaults to 8.
+
+        allow_smaller_batches (:obj:`bool`, optional):
+            Flag enabling batches of smaller size than `batch_size` if not enough samples are
+            available in a bucket. Defaults to False.
+
+        prefetch_device (:obj:`str`, optional):
+            Device to prefetch the batches to (e.g. '/gpu:0').
+            If None, the batches are prefetched in host memory. Defaults to None.
+
+        bucket_by_frames (:obj:`bool`, optional):
+            Flag controlling if the samples are bucketed by their number of spectrogram frames
+            instead of their sentence lengths. Defaults to False.
+
+        bucket_batch_sizes (:obj:`list` of int, optional):
+            Batch size for each of the `len(bucket_boundaries) + 1` buckets.
+            If None, `batch_size` is used for all buckets. Defaults to None.
+
+    Returns:
+        dict:
+            Placeholder dictionary with the keys 'ph_sentences', 'ph_sentence_length',
+            'ph_mel_specs', 'ph_lin_specs' and 'ph_time_frames' (see
+            `tacotron.train.batched_placeholders`).
+    """
+    n_mels = model_params.n_mels * model_params.reduction
+    n_linear = (1 + model_params.n_fft // 2) * model_params.reduction
+
+    dataset = tf.data.Dataset.from_tensor_slices((sentences, sentence_lengths, wav_paths))
+
+    if shuffle:
+        # Reshuffle the entire dataset at the beginning of each epoch.
+        dataset = dataset.shuffle(buffer_size=len(sentences),
+                                  seed=seed,
+                                  reshuffle_each_iteration=True)
+
+    dataset = dataset.repeat(n_epochs)
+
+    def __load(_sentence, _sentence_length, _wav_path):
+        # The sentence is a integer sequence (char2idx), we need to interpret it as such since it
+        # is stored as raw bytes in order to manage sequences of different lengths.
+        _sentence = tf.decode_raw(_sentence, tf.int32)
+
+        _mel_spec, _lin_spec = tf.py_func(load_fn, [_wav_path], [tf.float32, tf.float32])
+
+        # The shape of the returned values from py_func is lost.
+        _mel_spec.set_shape((None, n_mels))
+        _lin_spec.set_shape((None, n_linear))
+
+        # Get the number spectrogram time-steps (used as the number of time frames when
+        # generating).
+        _n_time_frames = tf.shape(_mel_spec)[0]
+
+        return _sentence, _sentence_length, _mel_spec, _lin_spec, _n_time_frames
+
+    # Load the features in parallel. The element order is preserved.
+    dataset = dataset.map(__load, num_parallel_calls=n_threads)
+
+    boundaries = tf.constant(bucket_boundaries, dtype=tf.int32)
+
+    if bucket_batch_sizes is None:
+        bucket_batch_sizes = [batch_size] * (len(bucket_boundaries) + 1)
+    batch_sizes = tf.constant(bucket_batch_sizes, dtype=tf.int64)
+
+    def __bucket_id(_sentence_length, _n_time_frames):
+        _length = _n_time_frames if bucket_by_frames else _sentence_length
+
+        # Buckets are the intervals [-inf, b_0), [b_0, b_1), ..., [b_n, inf).
+        return tf.reduce_sum(tf.cast(_length >= boundaries, tf.int64))
+
+    padded_shapes = ([None], [], [None, n_mels], [None, n_linear], [])
+
+    def __batch(_bucket_id, _bucket):
+        return _bucket.padded_batch(batch_sizes[_bucket_id], padded_shapes=padded_shapes)
+
+    def __key(_sentence, _sentence_length, _mel_spec, _lin_spec, _n_time_frames):
+        return __bucket_id(_sentence_length, _n_time_frames)
+
+    # Pad and batch the samples of each bucket separately.
+    dataset = dataset.apply(tf.contrib.data.group_by_window(
+        key_func=__key,
+        reduce_func=__batch,
+        window_size_func=lambda _bucket_id: batch_sizes[_bucket_id]))
+
+    if not allow_smaller_batches:
+        def __is_complete(_sentences, _sentence_lengths, _, __, _time_frames):
+            # All samples of a batch are from the same bucket.
+            _bucket_id = __bucket_id(_sentence_lengths[0], _time_frames[0])
+            return tf.equal(tf.cast(tf.shape(_sentences)[0], tf.int64), batch_sizes[_bucket_id])
+
+        # Discard the incomplete batches emitted when the input is exhausted.
+        dataset = dataset.filter(__is_complete)
+
+    if prefetch_device is not None:
+        # Copy the batches onto the device in the background.
+        dataset = dataset.apply(tf.contrib.data.prefetch_to_device(prefetch_device,
+                                                                   n_prefetch_batches))
+    else:
+        dataset = dataset.prefetch(n_prefetch_batches)
+
+    # NOTE: `prefetch_to_device` is only compatible with one shot iterators.
+    iterator = dataset.make_one_shot_iterator()
+    ph_sentences, ph_sentence_length, ph_mel_specs, ph_lin_specs, ph_time_frames = \
+        iterator.get_next()
+
+    if not allow_smaller_batches and len(set(bucket_batch_sizes)) == 1:
+        # Restore the static batch size known from the queue based pipeline.
+        for tensor in [ph_sentences, ph_sentence_length, ph_mel_specs, ph_lin_specs,
+                       ph_time_frames]:
+            tensor.set_shape([bucket_batch_sizes[0]] + tensor.shape.as_list()[1:])
+
+    return {
+        'ph_sentences': ph_sentences,
+        'ph_sentence_length': ph_sentence_length,
+        'ph_mel_specs': ph_mel_specs,
+        'ph_lin_specs': ph_lin_specs,
+        'ph_time_frames': ph_time_frames
+    }
@@ -131,7 +131,7 @@ def prelu(inputs, layer_wise=False):
         tf.Tensor:
             Activation of the input tensor.
     """
-    zeros = tf.constant(value=0.0, shape=[inputs.shape[-1]])
+    zeros = tf.constant(value=0.0, shape=[inputs.shape[-1]], dtype=inputs.dtype)
 
     if layer_wise:
         alpha_shape = 1
@@ -140,6 +140,7 @@ def prelu(inputs, layer_wise=False):
 
     alpha = tf.get_variable('alpha',
                             shape=alpha_shape,
+                            dtype=inputs.dtype,
                             initializer=tf.constant_initializer(0.01))
 
     tf.summary.histogram('alpha', alpha)
@@ -147,6 +148,38 @@ def prelu(inputs, layer_wise=False):
     return tf.maximum(zeros, inputs) + alpha * tf.minimum(zeros, inputs)
 
 
+def float32_batch_normalization(inputs, training, scale):
+    """
+    Batch normalization that is always calculated in float32.
+
+    Lower precision inputs (mixed precision training) are cast to float32 before normalization
+    and the result is cast back, so that the batch statistics and the moving averages are
+    accumulated in full precision.
+
+    Arguments:
+        inputs (tf.Tensor):
+            The shape is expected to be shape=(B, T, F) with B being the batch size, T being the
+            number of time frames and F being the size of the features.
+
+        training (boolean):
+            Boolean defining whether to normalize using the batch statistics (and update the
+            moving averages) or using the moving averages.
+
+        scale (boolean):
+            Boolean defining whether to multiply by a trainable scale (gamma) or not.
+
+    Returns:
+        tf.Tensor:
+            Normalized tensor of the same shape and data type as `inputs`.
+    """
+    network = tf.layers.batch_normalization(inputs=tf.cast(inputs, tf.float32),
+                                            training=training,
+                                            fused=True,
+                                            scale=scale)
+
+    return tf.cast(network, inputs.dtype)
+
+
 def highway_network(inputs, units, layers, scope, activation=tf.nn.relu):
     """
     Implementation of a multi layer Highway Network.
@@ -377,10 +410,9 @@ def conv_1d_filter_banks(inputs, n_banks, n_filters, scope, activation=tf.nn.rel
             # convolutional layers.", I have decided to implement case 1.
 
             # Improvement: What would be the effect of setting renorm=True?
-            filter_bank = tf.layers.batch_normalization(inputs=filter_bank,
-                                                        training=training,
-                                                        fused=True,
-                                                        scale=False)
+            filter_bank = float32_batch_normalization(inputs=filter_bank,
+                                                      training=training,
+                                                      scale=False)
 
             # filter_bank.shape => (B, T, n_filters)
             filter_banks.append(filter_bank)
@@ -437,16 +469,15 @@ def conv_1d_projection(inputs, n_filters, kernel_size, activation, scope, traini
                                    padding='SAME')
 
         # Improvement: What would be the effect of setting renorm=True?
-        network = tf.layers.batch_normalization(inputs=network,
-                                                training=training,
-                                                fused=True,
-                                                scale=True)
+        network = float32_batch_normalization(inputs=network,
+                                              training=training,
+                                              scale=True)
 
     return network
 
 
 def cbhg(inputs, n_banks, n_filters, n_highway_layers, n_highway_units, projections,
-         n_gru_units, training=True, force_cudnn=False):
+         n_gru_units, training=True, force_cudnn=False, sequence_length=None):
     """
     Implementation of a CBHG (1-D convolution bank + highway network + bidirectional GRU)
     described in "Tacotron: Towards End-to-End Speech Synthesis".
@@ -493,6 +524,11 @@ def cbhg(inputs, n_banks, n_filters, n_highway_layers, n_highway_units, projecti
         force_cudnn (boolean):
             Boolean defining whether the CBHG will use an CUDNN accelerated RNN.
 
+        sequence_length (:obj:`tf.Tensor`, optional):
+            Number of valid time frames of each sequence, shape=(B). Defaults to None.
+            If given, the GRU does not process the padding frames and the backward direction
+            starts at the last valid frame of each sequence. Ignored for CUDNN RNNs.
+
     Returns:
         (outputs, output_states):
             outputs (tf.Tensor): The output states (output_fw, output_bw) of the RNN concatenated
@@ -568,13 +604,15 @@ def cbhg(inputs, n_banks, n_filters, n_highway_layers, n_highway_units, projecti
         )
 
         # Transform the data into time major format. (CUDNN RNNs only support time major inputs)
-        network = tf.transpose(network, (1, 0, 2))
+        # The opaque CUDNN parameters are saved as variables of the RNNs own data type. Hence,
+        # the CUDNN RNN always runs in float32, even when training with mixed precision.
+        outputs = tf.transpose(tf.cast(network, tf.float32), (1, 0, 2))
 
         # Let the RNN process the data.
-        outputs, output_states = gru(network)
+        outputs, output_states = gru(outputs)
 
         # Transform the RNN outputs back into batch major format.
-        outputs = tf.transpose(outputs, (1, 0, 2))
+        outputs = tf.cast(tf.transpose(outputs, (1, 0, 2)), network.dtype)
     else:
         cell_forward = tf.nn.rnn_cell.GRUCell(num_units=n_gru_units, name='gru_cell_fw')
         cell_backward = tf.nn.rnn_cell.GRUCell(num_units=n_gru_units, name='gru_cell_bw')
@@ -584,7 +622,8 @@ def cbhg(inputs, n_banks, n_filters, n_highway_layers, n_highway_units, projecti
             cell_fw=cell_forward,
             cell_bw=cell_backward,
             inputs=network,
-            dtype=tf.float32,
+            sequence_length=sequence_length,
+            dtype=network.dtype,
             scope='gru'
         )
 
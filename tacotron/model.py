@@ -1,20 +1,18 @@
-import os
-import numpy as np
-
 import tensorflow as tf
 import tensorflow.contrib as tfc
 from tensorflow.contrib import seq2seq
 import tensorflow.contrib.cudnn_rnn as tfcrnn
 
 from audio.conversion import inv_normalize_decibel, decibel_to_magnitude, ms_to_samples
-from audio.synthesis import spectrogram_to_wav
+from audio.vocoders import vocoder_from_params
 from tacotron.attention import LocalLuongAttention, AdvancedAttentionWrapper
 from tacotron.helpers import TacotronInferenceHelper, TacotronTrainingHelper
 from tacotron.layers import cbhg, pre_net, wrapped_dense
 from tacotron.params.dataset import dataset_params
 from tacotron.params.model import model_params
-from tacotron.params.inference import inference_params
-from tacotron.wrappers import PrenetWrapper
+from tacotron.precision import float32_softmax, mixed_precision_scope
+from tacotron.reconstruction import spectrogram_to_wav
+from tacotron.wrappers import AlignmentCounterWrapper, PrenetWrapper, SilenceCounterWrapper
 
 
 class Mode:
@@ -76,6 +74,10 @@ class Tacotron:
         """
         self.hparams = model_params
 
+        # Data type of the activations (float16 when training with mixed precision).
+        # The variables are always stored in float32 (see `tacotron.precision`).
+        self.dtype = tf.float16 if self.hparams.mixed_precision else tf.float32
+
         # Get the placeholders for the input data.
         self.inp_sentences = inputs['ph_sentences']
         self.seq_lengths = inputs['ph_sentence_length']
@@ -99,9 +101,21 @@ class Tacotron:
         # Decoded linear spectrogram, shape => (B, T_spec, (1 + n_fft // 2)).
         self.output_linear_spec = None
 
+        # Reconstructed waveforms, shape => (B, n_samples).
+        # Only available in `PREDICT` mode if `reconstruction_in_graph` is enabled.
+        self.output_wav = None
+
+        # Number of valid samples of each reconstructed waveform, shape => (B).
+        # Only available in `PREDICT` mode if `reconstruction_in_graph` is enabled.
+        self.output_wav_lengths = None
+
         # Stacked attention alignment history.
         self.alignment_history = None
 
+        # Number of generated frames for each sequence in the batch, shape => (B).
+        # In `PREDICT` mode decoding of a sequence can be stopped early (see `decoder`).
+        self.output_lengths = None
+
         self._mode = mode
         self._training_summary = training_summary
 
@@ -152,6 +166,7 @@ class Tacotron:
 
             # shape => (B, T_sent, 256)
             embedded_char_ids = tf.nn.embedding_lookup(char_embeddings, inputs)
+            embedded_char_ids = tf.cast(embedded_char_ids, self.dtype)
 
             # shape => (B, T_sent, 128)
             network = pre_net(inputs=embedded_char_ids,
@@ -187,6 +202,8 @@ class Tacotron:
                 Generated reduced Mel. spectrogram. The shape is
                 shape=(B, T_spec // r, n_mels * r), with B being the batch size, T_spec being
                 the number of frames in the spectrogram and r being the reduction factor.
+                In `PREDICT` mode the frames following the end of a sequence that was stopped
+                early are zero (see `self.output_lengths`).
         """
         with tf.variable_scope('decoder2'):
             # Query the current batch size.
@@ -202,9 +219,12 @@ class Tacotron:
             n_attention_units = self.hparams.decoder.n_attention_units
 
             # General attention mechanism parameters that are the same for all mechanisms.
+            # The attention scores are always normalized in float32.
             mechanism_params = {
                 'num_units': n_attention_units,
                 'memory': memory,
+                'probability_fn': float32_softmax,
+                'dtype': self.dtype
             }
 
             if model_params.attention.mechanism == LocalLuongAttention:
@@ -213,8 +233,7 @@ class Tacotron:
                     'attention_mode': model_params.attention.luong_local_mode,
                     'score_mode': model_params.attention.luong_local_score,
                     'd': model_params.attention.luong_local_window_D,
-                    'force_gaussian': model_params.attention.luong_force_gaussian,
-                    'const_batch_size': 16
+                    'force_gaussian': model_params.attention.luong_force_gaussian
                 })
 
             # Create the attention mechanism.
@@ -276,9 +295,49 @@ class Tacotron:
                 # activation=tf.nn.sigmoid
             )
 
+            # Count the steps the attention stays on the <EOS> token and the generated silence to
+            # stop decoding early during inference.
+            count_alignment = self._mode == Mode.PREDICT and \
+                self.hparams.decoder.stop_alignment_steps is not None
+            count_silence = self._mode == Mode.PREDICT and \
+                self.hparams.decoder.stop_silence_frames is not None
+
+            if count_alignment:
+                # The sentence lengths are not fed during inference, count the non-padding tokens.
+                pad_token = dataset_params.vocabulary_dict['pad']
+                sentence_lengths = tf.reduce_sum(
+                    tf.cast(tf.not_equal(self.inp_sentences, pad_token), tf.int32), axis=1)
+
+                # The attention wrapper state is the first state of the decoder cell stack.
+                output_cell = AlignmentCounterWrapper(
+                    cell=output_cell,
+                    sentence_lengths=sentence_lengths,
+                    alignments_fn=lambda _state: _state[0].alignments)
+
+            if count_silence:
+                output_cell = SilenceCounterWrapper(
+                    cell=output_cell,
+                    frame_size=self.hparams.decoder.target_size,
+                    reduction_factor=self.hparams.reduction,
+                    threshold=self.hparams.decoder.stop_silence_threshold)
+
+            def __split_state(state):
+                # Split the counters carried along with the state of the decoder cell stack.
+                eos_steps, silent_frames = None, None
+                if count_silence:
+                    state, silent_frames = state
+                if count_alignment:
+                    state, eos_steps = state
+
+                return state, eos_steps, silent_frames
+
+            def __attention_state(state):
+                # The attention wrapper state is the first state of the decoder cell stack.
+                return __split_state(state)[0][0]
+
             decoder_initial_state = output_cell.zero_state(
                 batch_size=batch_size,
-                dtype=tf.float32
+                dtype=self.dtype
             )
 
             if self.is_training():
@@ -292,7 +351,7 @@ class Tacotron:
                 # Create a custom training helper for feeding ground truth frames during training.
                 helper = TacotronTrainingHelper(
                     batch_size=batch_size,
-                    outputs=mel_targets,
+                    outputs=tf.cast(mel_targets, self.dtype),
                     input_size=self.hparams.decoder.target_size,
                     reduction_factor=self.hparams.reduction,
                 )
@@ -303,24 +362,49 @@ class Tacotron:
 
                 # Create a custom inference helper that handles proper evaluation data feeding.
                 helper = TacotronInferenceHelper(batch_size=batch_size,
-                                                 input_size=self.hparams.decoder.target_size)
+                                                 input_size=self.hparams.decoder.target_size,
+                                                 dtype=self.dtype)
             else:
                 # During inference we stop decoding after `maximum_iterations` frames.
                 maximum_iterations = self.hparams.decoder.maximum_iterations // self.hparams.reduction
 
+                def __stop_fn(outputs, state):
+                    stop = tf.tile([False], [batch_size])
+                    _, eos_steps, silent_frames = __split_state(state)
+
+                    if count_alignment:
+                        # Stop once the attention stayed on the <EOS> token of a sentence for
+                        # enough consecutive steps, so that the final sound is not truncated.
+                        eos_steps = tf.cast(eos_steps[:, 0], tf.int32)
+                        stop = tf.logical_or(
+                            stop, eos_steps >= self.hparams.decoder.stop_alignment_steps)
+
+                    if count_silence:
+                        # Stop once enough consecutive near-silent frames were generated.
+                        silent_frames = tf.cast(silent_frames[:, 0], tf.int32)
+                        stop = tf.logical_or(
+                            stop, silent_frames >= self.hparams.decoder.stop_silence_frames)
+
+                    return stop
+
                 # Create a custom inference helper that handles proper inference data feeding.
+                # Each sequence is stopped as soon as it fulfills a stopping criterion.
                 helper = TacotronInferenceHelper(batch_size=batch_size,
-                                                 input_size=self.hparams.decoder.target_size)
+                                                 input_size=self.hparams.decoder.target_size,
+                                                 dtype=self.dtype,
+                                                 stop_fn=__stop_fn)
 
             decoder = seq2seq.BasicDecoder(cell=output_cell,
                                            helper=helper,
                                            initial_state=decoder_initial_state)
 
             # Start decoding.
+            # During inference the outputs of finished sequences are zeroed and their states are
+            # no longer updated.
             decoder_outputs, final_state, final_sequence_lengths = seq2seq.dynamic_decode(
                 decoder=decoder,
                 output_time_major=False,
-                impute_finished=False,
+                impute_finished=self._mode == Mode.PREDICT,
                 maximum_iterations=maximum_iterations)
 
             # decoder_outputs => type=BasicDecoderOutput, (rnn_output, _)
@@ -328,12 +412,16 @@ class Tacotron:
             # final_sequence_lengths.shape = (B)
 
             # Create an attention alignment summary image.
-            self.alignment_history = final_state[0].alignment_history.stack()
+            self.alignment_history = tf.cast(
+                __attention_state(final_state).alignment_history.stack(), tf.float32)
+
+            # Number of generated frames for each sequence, shape => (B).
+            self.output_lengths = final_sequence_lengths * self.hparams.reduction
 
         # shape => (B, T_spec // r, n_mels * r)
-        return decoder_outputs.rnn_output
+        return tf.cast(decoder_outputs.rnn_output, tf.float32)
 
-    def post_process(self, inputs):
+    def post_process(self, inputs, sequence_length=None):
         """
         Apply the CBHG based post-processing network to the spectrogram.
 
@@ -342,15 +430,19 @@ class Tacotron:
                 The shape is expected to be shape=(B, T, n_mels) with B being the
                 batch size and T being the number of time frames.
 
+            sequence_length (:obj:`tf.Tensor`, optional):
+                Number of valid frames of each spectrogram, shape=(B). Defaults to None.
+                If None, all T frames are considered to be valid.
+
         Returns:
             tf.Tensor:
-                A tensor which shape is expected to be shape=(B, T_spec, 2 * n_gru_units) with B
-                being the batch size and T being the number of time frames.
+                A float32 tensor which shape is expected to be shape=(B, T_spec, 2 * n_gru_units)
+                with B being the batch size and T being the number of time frames.
         """
         with tf.variable_scope('post_process'):
             # network.shape => (B, T_spec, 2 * n_gru_units)
             # state.shape   => (2, n_gru_units)
-            network, state = cbhg(inputs=inputs,
+            network, state = cbhg(inputs=tf.cast(inputs, self.dtype),
                                   n_banks=self.hparams.post.n_banks,
                                   n_filters=self.hparams.post.n_filters,
                                   n_highway_layers=self.hparams.post.n_highway_layers,
@@ -358,14 +450,22 @@ class Tacotron:
                                   projections=self.hparams.post.projections,
                                   n_gru_units=self.hparams.post.n_gru_units,
                                   training=self.is_training(),
-                                  force_cudnn=model_params.force_cudnn)
+                                  force_cudnn=model_params.force_cudnn,
+                                  sequence_length=sequence_length)
 
-        return network
+        return tf.cast(network, tf.float32)
 
     def model(self):
         """
         Builds the Tacotron model.
+
+        The encoder, the decoder and the post-processing network are calculated in `self.dtype`.
+        Their outputs, the final projection and the losses are always calculated in float32.
         """
+        with mixed_precision_scope():
+            self.__model()
+
+    def __model(self):
         # inp_sentences.shape = (B, T_sent, ?)
         batch_size = tf.shape(self.inp_sentences)[0]
 
@@ -376,6 +476,12 @@ class Tacotron:
         # shape => (B, T_spec // r, n_mels * r)
         decoder_outputs = self.decoder(memory=encoder_outputs)
 
+        # shape => (B)
+        self.output_lengths = tf.identity(self.output_lengths, name='output_lengths')
+
+        # During inference only the frames up to the end of each sequence are valid.
+        valid_lengths = self.output_lengths if self._mode == Mode.PREDICT else None
+
         # Remember the reduced decoder output for the summaries.
         self.reduced_output_mel_spec = decoder_outputs
 
@@ -388,7 +494,7 @@ class Tacotron:
         outputs = decoder_outputs
         if self.hparams.apply_post_processing:
             # shape => (B, T_spec, 256)
-            outputs = self.post_process(outputs)
+            outputs = self.post_process(outputs, sequence_length=valid_lengths)
 
         # shape => (B, T_spec, (1 + n_fft // 2))
         outputs = wrapped_dense(inputs=outputs,
@@ -397,9 +503,32 @@ class Tacotron:
                                 kernel_initializer=tf.glorot_normal_initializer(),
                                 bias_initializer=tf.glorot_normal_initializer())
 
+        if valid_lengths is not None:
+            # Silence the frames following the end of each sequence.
+            # shape => (B, T_spec, 1)
+            mask = tf.expand_dims(tf.sequence_mask(valid_lengths, tf.shape(outputs)[1],
+                                                   dtype=outputs.dtype), -1)
+            outputs = tf.identity(outputs * mask, name='output_linear_spec')
+
         # shape => (B, T_spec, (1 + n_fft // 2))
         self.output_linear_spec = outputs
 
+        if self._mode == Mode.PREDICT and self.hparams.reconstruction_in_graph:
+            # shape => (B, n_samples)
+            self.output_wav = tf.identity(
+                spectrogram_to_wav(outputs,
+                                   self.hparams,
+                                   dataset_params.dataset_loader.mel_mag_ref_db,
+                                   dataset_params.dataset_loader.mel_mag_max_db),
+                name='output_wav')
+
+            # Number of valid samples of each waveform, shape => (B).
+            # The reconstructed waveforms are `hop * (T - 1) + win` samples long.
+            win_len = ms_to_samples(self.hparams.win_len, self.hparams.sampling_rate)
+            win_hop = ms_to_samples(self.hparams.win_hop, self.hparams.sampling_rate)
+            self.output_wav_lengths = tf.identity(win_hop * (valid_lengths - 1) + win_len,
+                                                  name='output_wav_lengths')
+
         inp_mel_spec = self.inp_mel_spec
         inp_linear_spec = self.inp_linear_spec
 
@@ -495,9 +624,7 @@ class Tacotron:
         # Evaluation only ==========================================================================
         if self._mode == Mode.EVAL and False:
             with tf.name_scope('inference_reconstruction'):
-                win_len = ms_to_samples(self.hparams.win_len, self.hparams.sampling_rate)
-                win_hop = ms_to_samples(self.hparams.win_hop, self.hparams.sampling_rate)
-                n_fft = self.hparams.n_fft
+                vocoder = vocoder_from_params(self.hparams)
 
                 def __synthesis(spec):
                     print('synthesis ...', spec.shape)
@@ -507,11 +634,7 @@ class Tacotron:
 
                     linear_mag = decibel_to_magnitude(linear_mag_db)
 
-                    _wav = spectrogram_to_wav(linear_mag,
-                                              win_len,
-                                              win_hop,
-                                              n_fft,
-                                              self.hparams.reconstruction_iterations)
+                    _wav = vocoder.synthesize([linear_mag])[0]
 
                     # save_wav('/tmp/reconstr.wav', _wav, model_params.sampling_rate, True)
                     return _wav
@@ -548,57 +671,9 @@ class Tacotron:
             tf.summary.image("reduced_decoder_outputs",
                              tf.expand_dims(self.reduced_output_mel_spec, -1))
 
-        # Attention alignment plot.
-        alignments = tf.transpose(self.alignment_history, [1, 2, 0])
-
-        # Inference only ===========================================================================
-        if self._mode == Mode.PREDICT:
-            def __dump_attention_alignments(align):
-                # Create the target file path.
-                out_path = os.path.join(inference_params.synthesis_dir, 'alignments.npz')
-                print('Dumping alignments: {} to "{}" ...'.format(align.shape, out_path))
-
-                # Save the alignment history file as a numpy .npz file.
-                np.savez(out_path, alignments=align)
-
-                return align
-
-            # Dump alignments to file.
-            if inference_params.dump_alignments:
-                alignments = tf.transpose(self.alignment_history, [1, 2, 0])
-                tmp = tf.py_func(__dump_attention_alignments, [alignments], [tf.float32])
-                # Force execution py printing the `tmp` object.
-                alignments = tf.Print(alignments, [tmp], 'Alignments: ')
-
-            def __dump_linear_spectrogram(spec):
-                # Create the target file path.
-                out_path = os.path.join(inference_params.synthesis_dir, 'linear-spectrogram.npz')
-                print('Dumping linear spectrogram: {} to "{}" ...'.format(spec.shape, out_path))
-
-                # Save the linear spectrogram as a numpy .npz file.
-                np.savez(out_path, linear_spec=spec)
-
-                return spec
-
-            # Dump the linear spectrogram to file.
-            if inference_params.dump_linear_spectrogram:
-                # Convert thew linear spectrogram into an image that can be displayed.
-                # => shape=(1, T_spec, (1 + n_fft // 2), 1)
-                linear_spec_image = tf.expand_dims(
-                    tf.reshape(self.output_linear_spec[0],
-                               (1, -1, (1 + self.hparams.n_fft // 2))), -1)
-
-                # => shape=(1, (1 + n_fft // 2), T_spec, 1)
-                linear_spec_image = tf.transpose(linear_spec_image, perm=[0, 2, 1, 3])
-                linear_spec_image = tf.reverse(linear_spec_image, axis=tf.convert_to_tensor([1]))
-
-                __spec = tf.reverse(linear_spec_image, axis=tf.convert_to_tensor([1]))
-                tmp = tf.py_func(__dump_linear_spectrogram, [__spec], [tf.float32])
-                # Force execution py printing the `tmp` object.
-                alignments = tf.Print(alignments, [tmp], 'Alignments: ')
-
         # Always ===================================================================================
         # Attention alignment plot.
+        alignments = tf.transpose(self.alignment_history, [1, 2, 0])
         tf.summary.image("stacked_alignments", tf.expand_dims(alignments, -1))
 
         return tf.summary.merge_all()
@@ -29,4 +29,20 @@ dataset_params = tf.contrib.training.HParams(
 
     # Number of unique characters in the vocabulary.
     vocabulary_size=39,
+
+    # Number of worker processes used to pre-compute features.
+    # If None, the number of available cores is used.
+    precalc_n_workers=None,
+
+    # Flag controlling if features should be pre-computed for all files, even if they are up to
+    # date according to the manifest of a previous run.
+    precalc_force=False,
+
+    # Folder of the packed feature store (see `datasets.feature_store`) the pre-computed features
+    # are written into and loaded from during training.
+    # If None, the per-utterance .npz files next to the audio files are used.
+    feature_store_folder=None,
+
+    # Data type the features are stored in inside the feature store ('float32' or 'float16').
+    feature_store_dtype='float32',
 )
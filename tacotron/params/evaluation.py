@@ -14,6 +14,18 @@ evaluation_params = tf.contrib.training.HParams(
     # Flag that enables/disables sample shuffle at the beginning of each epoch.
     shuffle_samples=False,
 
+    # Seed used to shuffle the samples. If not None, the order of the samples is deterministic.
+    shuffle_seed=None,
+
+    # Input pipeline implementation.
+    #   - 'queue': Queue runner based pipeline.
+    #   - 'dataset': tf.data based pipeline with parallel feature loading and prefetching.
+    input_pipeline='queue',
+
+    # Device the tf.data input pipeline prefetches batches to (e.g. '/gpu:0').
+    # If None, batches are prefetched in host memory.
+    prefetch_device=None,
+
     # Number of batches to pre-calculate for feeding to the GPU.
     n_pre_calc_batches=8,
 
@@ -15,6 +15,9 @@ inference_params = tf.contrib.training.HParams(
     # Run folder to save summaries in the checkpoint folder.
     checkpoint_save_run='inference',
 
+    # Flag controlling if summaries are written for each inference run.
+    write_summaries=False,
+
     # The path were to save the inference results.
     synthesis_dir='/thesis/inference/ljspeech',
 
@@ -23,13 +26,21 @@ inference_params = tf.contrib.training.HParams(
     synthesis_file='/tmp/inference/sentences.txt',
 
     # Flag controlling if the alignments should be dumped as .npz files.
-    # Dumps are written into `synthesis_dir`/alignments.npz.
-    dump_alignments=True,
+    # Dumps are written into `synthesis_dir`/<request>-<index>-alignments.npz.
+    dump_alignments=False,
 
     # Flag controlling if the linear-scale spectrogram should be dumped as .npz files.
-    # Dumps are written into `synthesis_dir`/linear-spectrogram.npz.
-    dump_linear_spectrogram=True,
+    # Dumps are written into `synthesis_dir`/<request>-<index>-linear-spectrogram.npz.
+    dump_linear_spectrogram=False,
+
+    # The maximal number of spectrograms to invert at once using batched Griffin-Lim
+    # reconstruction. If None, all spectrograms are inverted in a single batch.
+    synthesis_batch_size=8,
+
+    # Executor backend used to invert the spectrograms ('thread' or 'process').
+    # The 'process' backend passes the spectrograms to its workers through shared memory.
+    synthesis_backend='process',
 
-    # The number of process to threads to use for parallel Griffin-Lim reconstruction.
-    n_synthesis_threads=6
+    # Number of workers inverting spectrogram batches concurrently.
+    n_synthesis_workers=6
 )
@@ -44,12 +44,45 @@ model_params = tf.contrib.training.HParams(
     # Linear scale magnitudes are raise to the power of `magnitude_power` before reconstruction.
     magnitude_power=1.3,
 
+    # Vocoder used to reconstruct waveforms from linear scale magnitudes (see `audio.vocoders`).
+    # 'griffin_lim': Iterative (fast) Griffin-Lim reconstruction.
+    # 'phase_gradient': Non-iterative phase gradient integration (much lower latency).
+    vocoder='griffin_lim',
+
     # The number of Griffin-Lim reconstruction iterations.
     reconstruction_iterations=50,
 
+    # Momentum of the fast Griffin-Lim (FGLA) phase update (0.0 = original Griffin-Lim, a value
+    # of 0.99 converges in considerably fewer iterations).
+    reconstruction_momentum=0.0,
+
+    # Stop the Griffin-Lim iteration early once the spectral convergence improves by less than
+    # `reconstruction_tolerance` between two iterations (None = always run all iterations).
+    reconstruction_tolerance=None,
+
+    # Spectral peaks below `phase_gradient_tolerance` times the maximal magnitude are ignored by
+    # the phase gradient integration vocoder.
+    phase_gradient_tolerance=1e-5,
+
+    # Flag controlling if Griffin-Lim reconstruction (including the inverse decibel normalization)
+    # is appended to the model graph in `PREDICT` mode, so that a single `session.run` returns
+    # batched waveforms (see `tacotron.reconstruction`).
+    reconstruction_in_graph=False,
+
+    # Number of frames per block and number of frames shared by consecutive blocks when
+    # streaming the reconstruction.
+    reconstruction_block_length=64,
+    reconstruction_block_overlap=8,
+
     # Flag allowing to force the use accelerated RNN implementation from CUDNN.
     force_cudnn=True,
 
+    # Flag enabling mixed precision. The encoder, the decoder RNN stack and the post-processing
+    # network are calculated in float16, while the variables, batch normalization, the attention
+    # softmax and the losses stay in float32. Training uses dynamic loss scaling
+    # (see `tacotron.precision`).
+    mixed_precision=False,
+
     # Encoder network parameters.
     encoder=tf.contrib.training.HParams(
         # Embedding size for each sentence character.
@@ -106,6 +139,20 @@ model_params = tf.contrib.training.HParams(
         # Maximum number of decoder iterations after which to stop for evaluation and inference.
         # This is equal to the number of mel-scale spectrogram frames generated.
         maximum_iterations=1000,
+
+        # Stop decoding a sequence during inference once the attention alignment stayed on the
+        # last encoder position (the <EOS> token) for this number of consecutive decoder steps.
+        # Stopping on the first step the <EOS> token is reached truncates the final sound.
+        # If None, the alignment is not used to stop decoding.
+        stop_alignment_steps=4,
+
+        # Stop decoding a sequence during inference after this number of consecutive near-silent
+        # frames were generated. If None, silence is not used to stop decoding.
+        stop_silence_frames=40,
+
+        # A frame is considered near-silent if all its normalized Mel. features are below this
+        # value.
+        stop_silence_threshold=0.1,
     ),
 
     # Attention parameters.
@@ -8,4 +8,13 @@ serving_params = tf.contrib.training.HParams(
     # Version number of the exported model to be loaded.
     export_version=1,
 
+    # Host name and port the HTTP synthesis server listens on.
+    host='localhost',
+    port=8000,
+
+    # Maximal number of sentences synthesized in a single batch.
+    max_batch_size=16,
+
+    # Maximal time (in seconds) to wait for further requests before a batch is synthesized.
+    max_batch_wait=0.05,
 )
@@ -19,12 +19,34 @@ training_params = tf.contrib.training.HParams(
     # Flag that enables/disables sample shuffle at the beginning of each epoch.
     shuffle_samples=True,
 
+    # Seed used to shuffle the samples. If not None, the order of the samples is deterministic.
+    shuffle_seed=None,
+
+    # Input pipeline implementation.
+    #   - 'queue': Queue runner based pipeline.
+    #   - 'dataset': tf.data based pipeline with parallel feature loading and prefetching.
+    input_pipeline='queue',
+
+    # Device the tf.data input pipeline prefetches batches to (e.g. '/gpu:0').
+    # If None, batches are prefetched in host memory.
+    prefetch_device=None,
+
     # Flag telling the training code to load pre-processed features or calculate them on the fly.
     load_preprocessed=True,
 
-    # Cache preprocessed features in RAM entirely.
+    # Cache decoded preprocessed features in RAM using a least recently used (LRU) cache.
     cache_preprocessed=True,
 
+    # Memory budget of the preprocessed feature cache in bytes.
+    # Once the budget is exhausted the least recently used features are evicted.
+    cache_max_bytes=8 * 1024 ** 3,
+
+    # Maximal number of padded spectrogram frames (batch size times the number of frames of the
+    # longest sample) per batch. If not None, samples are bucketed by their number of frames and
+    # each bucket gets its own batch size, replacing `batch_size`.
+    # Requires the 'dataset' input pipeline and pre-processed features.
+    max_frames_per_batch=None,
+
     # Number of batches to pre-calculate for feeding to the GPU.
     n_pre_calc_batches=16,
 
@@ -39,6 +61,16 @@ training_params = tf.contrib.training.HParams(
     # `batch_size` if not enough samples are available.
     allow_smaller_batches=False,
 
+    # Devices to replicate the model on for data-parallel training (e.g. ['/gpu:0', '/gpu:1']).
+    # Each batch is split evenly between the devices and the gradients are averaged.
+    # Every batch has to hold at least one sample per device, therefore `allow_smaller_batches`
+    # is not supported and the batch size of each frame budget bucket has to be large enough.
+    # If None, a single model is trained on the default device.
+    tower_devices=None,
+
+    # Device holding the variables shared by all data-parallel model replicas.
+    variables_device='/cpu:0',
+
     # Checkpoint folder used for training.
     checkpoint_dir='/thesis/checkpoints/ljspeech',
 
@@ -58,15 +90,44 @@ training_params = tf.contrib.training.HParams(
     # The only exceptions to this are the attention alignment plots and the train losses.
     write_summary=True,
 
-    # Maximal number of checkpoints to keep.
-    checkpoints_to_keep=3000,
+    # Checkpoint retention policy: Keep the `checkpoints_keep_last` most recent checkpoints plus
+    # every checkpoint whose global step is a multiple of `checkpoints_keep_every_steps`.
+    # If `checkpoints_keep_every_steps` is None, only the most recent checkpoints are kept.
+    checkpoints_keep_last=5,
+    checkpoints_keep_every_steps=50000,
+
+    # Maximal number of variable snapshots held in host memory while checkpoints are written
+    # in the background. If 0, checkpoints are written synchronously.
+    checkpoint_max_in_flight=1,
 
     # Number of global steps after which to log the global steps per second.
     performance_log_steps=50,
 
+    # Number of steps after which to report the time spent waiting for inputs versus computing,
+    # the input queue fill levels and the feature loader latency percentiles
+    # (see `tacotron.hooks.StepProfilerHook`). If None, the training steps are not profiled.
+    profile_steps=None,
+
+    # Number of steps after which to write a Chrome trace of a training step into the checkpoint
+    # folder. Requires `profile_steps` to be set. If None, no traces are written.
+    profile_trace_steps=None,
+
     # The clipping ratio used for gradient clipping by global norm.
     gradient_clip_norm=1.0,
 
+    # Number of consecutive batches whose gradients are accumulated for each optimizer step.
+    # The effective batch size is `accumulation_steps` times the batch size. The mean of the
+    # accumulated gradients is clipped and applied.
+    accumulation_steps=1,
+
+    # Dynamic loss scaling used for mixed precision training (see `model_params.mixed_precision`).
+    # The loss scale starts at `loss_scale_initial`. It is divided by `loss_scale_factor` whenever
+    # the gradients overflow and multiplied by it after `loss_scale_increment_steps` consecutive
+    # steps without overflow.
+    loss_scale_initial=2.0 ** 15,
+    loss_scale_factor=2.0,
+    loss_scale_increment_steps=2000,
+
     # Initial learning rate.
     lr=0.001,
 
@@ -0,0 +1,235 @@
+import tensorflow as tf
+
+
+def float32_variable_getter(getter, name, shape=None, dtype=None, initializer=None,
+                            regularizer=None, trainable=True, *args, **kwargs):
+    """
+    Custom variable getter keeping float32 master copies of all trainable variables.
+
+    Trainable variables requested in a lower precision (e.g. by layers processing float16 inputs)
+    are created in float32 and are cast to the requested data type when they are read. Hence, the
+    optimizer updates the float32 variables, while the forward and backward passes are calculated
+    in the lower precision.
+
+    See: "Mixed Precision Training", https://arxiv.org/abs/1710.03740
+
+    Arguments:
+        getter (function):
+            The underlying variable getter.
+
+        name (str):
+            Name of the variable.
+
+        shape (:obj:`tf.TensorShape`, optional):
+            Shape of the variable.
+
+        dtype (:obj:`tf.DType`, optional):
+            Data type the variable is requested in.
+
+        initializer (optional):
+            Initializer for the variable.
+
+        regularizer (optional):
+            Regularizer for the variable.
+
+        trainable (:obj:`boolean`, optional):
+            Flag defining if the variable is trainable. Defaults to True.
+
+        *args:
+            Remaining positional arguments passed to `getter`.
+
+        **kwargs:
+            Remaining keyword arguments passed to `getter`.
+
+    Returns:
+        tf.Tensor:
+            The variable, cast to `dtype` if it is stored in float32 instead.
+    """
+    requested_dtype = None if dtype is None else tf.as_dtype(dtype).base_dtype
+    cast_to_requested = trainable and requested_dtype is not None and requested_dtype.is_floating
+
+    # Store trainable floating point variables in float32.
+    storage_dtype = tf.float32 if cast_to_requested else dtype
+
+    variable = getter(name, shape, dtype=storage_dtype, initializer=initializer,
+                      regularizer=regularizer, trainable=trainable, *args, **kwargs)
+
+    if cast_to_requested and requested_dtype != tf.float32:
+        variable = tf.cast(variable, requested_dtype)
+
+    return variable
+
+
+def mixed_precision_scope():
+    """
+    Re-enter the current variable scope with `float32_variable_getter` as custom getter.
+
+    Neither the variable names nor the name scope are affected. Therefore, checkpoints can be
+    restored independent of the precision a model was trained in.
+
+    Returns:
+        tf.variable_scope:
+            Variable scope context manager.
+    """
+    return tf.variable_scope(tf.get_variable_scope(),
+                             custom_getter=float32_variable_getter,
+                             auxiliary_name_scope=False)
+
+
+def float32_softmax(score):
+    """
+    Softmax calculated in float32 independent of the data type of the scores.
+
+    Arguments:
+        score (tf.Tensor):
+            Scores to be normalized along the last axis.
+
+    Returns:
+        tf.Tensor:
+            Normalized scores in the data type of `score`.
+    """
+    return tf.cast(tf.nn.softmax(tf.cast(score, tf.float32)), score.dtype)
+
+
+class DynamicLossScale:
+    """
+    Dynamic loss scaling for mixed precision training.
+
+    The loss is multiplied with a scale before the gradients are calculated, so that small
+    float16 gradients do not underflow. The gradients are divided by the same scale before they
+    are applied. If any of the gradients is not finite, the update is skipped and the scale is
+    reduced. After `increment_steps` consecutive steps with finite gradients the scale is
+    increased again.
+
+    See: "Mixed Precision Training", https://arxiv.org/abs/1710.03740
+    """
+
+    def __init__(self, initial_scale=2.0 ** 15, increment_steps=2000, factor=2.0, min_scale=1.0):
+        """
+        Creates the loss scale variables.
+
+        Arguments:
+            initial_scale (:obj:`float`, optional):
+                Initial loss scale. Defaults to 2^15.
+
+            increment_steps (:obj:`int`, optional):
+                Number of consecutive steps with finite gradients after which the scale is
+                increased. Defaults to 2000.
+
+            factor (:obj:`float`, optional):
+                Factor the scale is increased or decreased by. Defaults to 2.0.
+
+            min_scale (:obj:`float`, optional):
+                The scale is never decreased below this value. Defaults to 1.0.
+        """
+        self.increment_steps = increment_steps
+        self.factor = factor
+        self.min_scale = min_scale
+
+        with tf.variable_scope('loss_scale'):
+            # Current loss scale.
+            self.scale = tf.get_variable('scale',
+                                         initializer=tf.constant(float(initial_scale)),
+                                         trainable=False)
+
+            # Number of consecutive steps with finite gradients.
+            self.good_steps = tf.get_variable('good_steps',
+                                              initializer=tf.constant(0, dtype=tf.int64),
+                                              trainable=False)
+
+    def scale_loss(self, loss):
+        """
+        Multiply a loss with the current loss scale.
+
+        Arguments:
+            loss (tf.Tensor):
+                Unscaled float32 loss.
+
+        Returns:
+            tf.Tensor:
+                Scaled loss.
+        """
+        return loss * self.scale
+
+    def unscale_gradients(self, grads_and_vars):
+        """
+        Divide the gradients of a scaled loss by the current loss scale.
+
+        Arguments:
+            grads_and_vars (:obj:`list` of tuple):
+                List of (gradient, variable) pairs of the scaled loss.
+
+        Returns:
+            (:obj:`list` of tuple):
+                List of (gradient, variable) pairs of the unscaled loss.
+        """
+        unscaled = []
+        for gradient, variable in grads_and_vars:
+            if isinstance(gradient, tf.IndexedSlices):
+                gradient = tf.IndexedSlices(gradient.values / self.scale,
+                                            gradient.indices,
+                                            gradient.dense_shape)
+            elif gradient is not None:
+                gradient = gradient / self.scale
+
+            unscaled.append((gradient, variable))
+
+        return unscaled
+
+    @staticmethod
+    def all_finite(gradients):
+        """
+        Check if all gradients are finite.
+
+        Arguments:
+            gradients (:obj:`list` of tf.Tensor):
+                Gradients to check. None entries are ignored.
+
+        Returns:
+            tf.Tensor:
+                Scalar boolean tensor, True if no gradient contains an Inf or NaN value.
+        """
+        checks = []
+        for gradient in gradients:
+            if gradient is None:
+                continue
+
+            if isinstance(gradient, tf.IndexedSlices):
+                gradient = gradient.values
+
+            checks.append(tf.reduce_all(tf.is_finite(gradient)))
+
+        return tf.reduce_all(tf.stack(checks))
+
+    def update(self, finite):
+        """
+        Create an operation adjusting the loss scale after a training step.
+
+        Arguments:
+            finite (tf.Tensor):
+                Scalar boolean tensor indicating if the gradients of the step were finite
+                (see `all_finite`).
+
+        Returns:
+            tf.Operation:
+                Operation updating the loss scale.
+        """
+        def __increase():
+            good_steps = self.good_steps + 1
+            increase = good_steps >= self.increment_steps
+
+            # Increase the scale after enough consecutive steps with finite gradients.
+            scale = tf.where(increase, self.scale * self.factor, self.scale)
+            good_steps = tf.where(increase, tf.zeros_like(good_steps), good_steps)
+
+            return scale, good_steps
+
+        def __decrease():
+            # Decrease the scale and restart counting as soon as the gradients overflow.
+            scale = tf.maximum(self.scale / self.factor, self.min_scale)
+
+            return scale, tf.zeros_like(self.good_steps)
+
+        scale, good_steps = tf.cond(finite, __increase, __decrease)
+
+        return tf.group(tf.assign(self.scale, scale), tf.assign(self.good_steps, good_steps))
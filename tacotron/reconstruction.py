@@ -0,0 +1,165 @@
+import numpy as np
+import tensorflow as tf
+
+from audio.conversion import ms_to_samples
+
+
+def inv_normalize_decibel(norm_db, ref_db, max_db):
+    """
+    Convert normalized decibel (dB) values from the range [0.0, 1.0] back to decibel.
+
+    This is the tensorflow equivalent of `audio.conversion.inv_normalize_decibel`.
+
+    Arguments:
+        norm_db (tf.Tensor):
+            Normalized decibel values in the range [0.0, 1.0].
+
+        ref_db (float):
+            Signal reference in decibel (dB) used during normalization.
+
+        max_db (float):
+            Signal maximum in decibel (dB) used during normalization.
+
+    Returns:
+        tf.Tensor:
+            Input data converted to decibel representation.
+    """
+    return ((tf.clip_by_value(norm_db, 0.0, 1.0) - 1.0) * (abs(ref_db) + abs(max_db))) + ref_db
+
+
+def decibel_to_magnitude(mag_db):
+    """
+    Convert a magnitude spectrogram in decibel (dB) representation back to raw magnitude
+    representation.
+
+    This is the tensorflow equivalent of `audio.conversion.decibel_to_magnitude`.
+
+    Arguments:
+        mag_db (tf.Tensor):
+            Magnitude spectrum in decibel representation.
+
+    Returns:
+        tf.Tensor:
+            Magnitude spectrum.
+    """
+    return tf.pow(10.0, mag_db / 20.0)
+
+
+def griffin_lim(magnitudes, win_length, hop_length, n_fft, n_iter, momentum=0.0):
+    """
+    Batched (fast) Griffin-Lim reconstruction inside the tensorflow graph.
+
+    The STFT's are calculated using `tf.contrib.signal`, which does not center the frames.
+    Hence, the reconstructed waveforms are `win_length` samples longer than the ones produced
+    by `audio.synthesis.griffin_lim_batch`.
+
+    Arguments:
+        magnitudes (tf.Tensor):
+            Linear scale magnitude spectrogram's of shape=(B, T, 1 + n_fft // 2).
+
+        win_length (int):
+            Length of each frame in audio samples.
+            The window length is required to fulfill the condition `win_length` <= `n_fft`.
+
+        hop_length (int):
+            Number of audio samples to hop between frames.
+
+        n_fft (int):
+            FFT window size.
+
+        n_iter (int):
+            Number of reconstruction iterations.
+
+        momentum (:obj:`float`, optional):
+            Momentum of the fast Griffin-Lim phase update. A value of 0.0 results in the original
+            Griffin-Lim algorithm. Defaults to 0.0.
+
+    Returns:
+        tf.Tensor:
+            Waveforms of shape=(B, hop_length * (T - 1) + win_length).
+    """
+    with tf.name_scope('griffin_lim'):
+        magnitudes = tf.complex(magnitudes, tf.zeros_like(magnitudes))
+
+        inverse_window_fn = tf.contrib.signal.inverse_stft_window_fn(
+            hop_length, forward_window_fn=tf.contrib.signal.hann_window)
+
+        def __istft(_stfts):
+            return tf.contrib.signal.inverse_stft(_stfts,
+                                                  frame_length=win_length,
+                                                  frame_step=hop_length,
+                                                  fft_length=n_fft,
+                                                  window_fn=inverse_window_fn)
+
+        def __stft(_signals):
+            return tf.contrib.signal.stft(_signals,
+                                          frame_length=win_length,
+                                          frame_step=hop_length,
+                                          fft_length=n_fft)
+
+        # The FGLA update is written in terms of the previous re-analysed STFT (as in librosa).
+        momentum_factor = tf.complex(momentum / (1.0 + momentum), 0.0)
+
+        def __iteration(_i, _angles, _previous):
+            # Revert the estimated STFT back into time domain signals and re-analyse them.
+            estimate = __stft(__istft(magnitudes * _angles))
+
+            # Extract the unit phase components from the (accelerated) STFT estimate.
+            accelerated = estimate - momentum_factor * _previous
+            norm = tf.maximum(tf.abs(accelerated), 1e-8)
+            _angles = accelerated / tf.complex(norm, tf.zeros_like(norm))
+
+            return _i + 1, _angles, estimate
+
+        # Initialize the phase component.
+        phase = tf.random_uniform(tf.shape(magnitudes), maxval=2.0 * np.pi)
+        angles = tf.complex(tf.cos(phase), tf.sin(phase))
+
+        _, angles, _ = tf.while_loop(cond=lambda _i, _angles, _previous: _i < n_iter,
+                                     body=__iteration,
+                                     loop_vars=[tf.constant(0), angles, tf.zeros_like(angles)],
+                                     back_prop=False)
+
+        # Revert the final STFT estimate back into time domain signals.
+        return __istft(magnitudes * angles)
+
+
+def spectrogram_to_wav(spectrograms, hparams, ref_db, max_db):
+    """
+    Convert normalized linear scale decibel spectrogram's (as produced by the model) into
+    waveforms inside the tensorflow graph.
+
+    Arguments:
+        spectrograms (tf.Tensor):
+            Normalized linear scale decibel spectrogram's of shape=(B, T, 1 + n_fft // 2).
+
+        hparams (tf.contrib.training.HParams):
+            Model hyper-parameters (see `tacotron.params.model`).
+
+        ref_db (float):
+            Signal reference in decibel (dB) used during normalization.
+
+        max_db (float):
+            Signal maximum in decibel (dB) used during normalization.
+
+    Returns:
+        tf.Tensor:
+            Waveforms of shape=(B, hop_length * (T - 1) + win_length).
+    """
+    with tf.name_scope('reconstruction'):
+        win_len = ms_to_samples(hparams.win_len, hparams.sampling_rate)
+        win_hop = ms_to_samples(hparams.win_hop, hparams.sampling_rate)
+
+        # Reverse the spectrogram normalization.
+        linear_mag_db = inv_normalize_decibel(spectrograms, ref_db, max_db)
+        linear_mag = decibel_to_magnitude(linear_mag_db)
+
+        # Raise the magnitudes to a power before reconstruction.
+        linear_mag = tf.pow(linear_mag, hparams.magnitude_power)
+
+        return griffin_lim(linear_mag,
+                           win_length=win_len,
+                           hop_length=win_hop,
+                           n_fft=hparams.n_fft,
+                           n_iter=hparams.reconstruction_iterations,
+                           momentum=hparams.reconstruction_momentum)
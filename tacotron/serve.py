@@ -1,10 +1,15 @@
-from multiprocessing.pool import ThreadPool
+import os
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
 
 import numpy as np
 import tensorflow as tf
 
-from audio.conversion import inv_normalize_decibel, decibel_to_magnitude, ms_to_samples
-from audio.synthesis import spectrogram_to_wav
+from audio.conversion import inv_normalize_decibel, decibel_to_magnitude
+from audio.executors import create_executor
+from audio.io import wav_to_bytes
+from audio.vocoders import vocoder_from_params
+from tacotron.batching import DynamicBatcher
 from tacotron.params.dataset import dataset_params
 from tacotron.params.inference import inference_params
 from tacotron.params.model import model_params
@@ -19,28 +24,33 @@ def pad_sentence(_sentence, _max_len):
     return _sentence
 
 
-def pre_process_sentences(_sentences, dataset):
-    # Pre-process sentence and convert it into ids.
-    id_sequences, sequence_lengths = dataset.process_sentences(_sentences)
+def encode_sentence(_sentence, dataset):
+    # Pre-process the sentence and convert it into ids.
+    id_sequences, _ = dataset.process_sentences([_sentence])
 
-    # Get the first sentence.
-    sentences = [np.fromstring(id_sequence, dtype=np.int32) for id_sequence in id_sequences]
+    return np.fromstring(id_sequences[0], dtype=np.int32)
 
-    # Pad sentence to the same length in order to be able to batch them in a single tensor.
-    max_length = max(sequence_lengths)
-    sentences = np.array([pad_sentence(sentence, max_length) for sentence in sentences])
 
-    print('sentences', sentences)
-    print('sentences.shape', sentences.shape)
+def create_synthesis_executor():
+    """
+    Creates the executor used to invert the spectrograms of all requests.
 
-    return sentences
+    Returns:
+        audio.executors.SynthesisExecutor
+    """
+    return create_executor(inference_params.synthesis_backend,
+                           vocoder_from_params(model_params),
+                           inference_params.n_synthesis_workers,
+                           batch_size=inference_params.synthesis_batch_size)
 
 
-def post_process_spectrograms(_spectrograms):
+def post_process_spectrograms(_spectrograms, _lengths, _executor):
+    # Only the valid frames of each spectrogram are inverted.
+    _spectrograms = [spectrogram[:length] for spectrogram, length in zip(_spectrograms, _lengths)]
+
     # Apply Griffin-Lim to all spectrogram's to get the waveforms.
     normalized = list()
     for spectrogram in _spectrograms:
-        print('Reverse spectrogram normalization ...', spectrogram.shape)
         linear_mag_db = inv_normalize_decibel(spectrogram.T,
                                               dataset_params.dataset_loader.mel_mag_ref_db,
                                               dataset_params.dataset_loader.mel_mag_max_db)
@@ -50,43 +60,145 @@ def post_process_spectrograms(_spectrograms):
 
     specs = normalized
 
-    win_len = ms_to_samples(model_params.win_len, model_params.sampling_rate)
-    win_hop = ms_to_samples(model_params.win_hop, model_params.sampling_rate)
-    n_fft = model_params.n_fft
-
-    def synthesize(linear_mag):
-        linear_mag = np.squeeze(linear_mag, -1)
-        linear_mag = np.power(linear_mag, model_params.magnitude_power)
-
-        print('Spectrogram inversion ...')
-        return spectrogram_to_wav(linear_mag,
-                                  win_len,
-                                  win_hop,
-                                  n_fft,
-                                  model_params.reconstruction_iterations)
-
-    # Synthesize waveforms from the spectrograms.
-    pool = ThreadPool(inference_params.n_synthesis_threads)
-    wavs = pool.map(synthesize, specs)
-    pool.close()
-    pool.join()
-
-    # # Write all generated waveforms to disk.
-    # for i, (sentence, wav) in enumerate(zip(raw_sentences, wavs)):
-    #     # Append ".wav" to the sentence line number to get the filename.
-    #     file_name = '{}.wav'.format(i + 1)
-    #
-    #     # Generate the full path under which to save the wav.
-    #     save_path = os.path.join(inference_params.synthesis_dir, file_name)
-    #
-    #     # Write the wav to disk.
-    #     # save_wav(save_path, wav, model_params.sampling_rate, True)
-    #     print('Saved: "{}"'.format(save_path))
+    # Raise the magnitudes to a power before reconstruction.
+    specs = [np.power(linear_mag, model_params.magnitude_power) for linear_mag in specs]
+
+    # Synthesize waveforms from the spectrograms using batched spectrogram inversion.
+    wavs = _executor.synthesize(specs)
 
     return wavs
 
 
-def serve(sentence_generator):
+def create_batch_fn(session, executor):
+    """
+    Creates a function synthesizing a batch of sentences with the loaded model.
+
+    Arguments:
+        session (tf.Session):
+            Session the exported model was loaded into.
+
+        executor (audio.executors.SynthesisExecutor):
+            Executor used to invert the spectrograms. Unused if the waveforms are reconstructed
+            inside the exported graph.
+
+    Returns:
+        function:
+            Function `batch_fn(sentences)` returning the waveform for each sentence in id
+            representation.
+    """
+    graph = session.graph
+
+    # Get a handle to the tensor that is filled with the sentences.
+    ph_inp_sentences = graph.get_tensor_by_name('ph_inp_sentences:0')
+
+    if model_params.reconstruction_in_graph:
+        # The waveforms are reconstructed inside the exported graph.
+        fetches = [graph.get_tensor_by_name('output_wav:0'),
+                   graph.get_tensor_by_name('output_wav_lengths:0')]
+    else:
+        # The spectrograms are silenced after the number of frames generated for each sentence.
+        fetches = [graph.get_tensor_by_name('output_linear_spec:0'),
+                   graph.get_tensor_by_name('output_lengths:0')]
+
+    def __batch_fn(sentences):
+        # Pad the sentences to the same length in order to batch them in a single tensor.
+        max_length = max(len(sentence) for sentence in sentences)
+        batched_sentences = np.array([pad_sentence(sentence, max_length)
+                                      for sentence in sentences])
+
+        outputs, lengths = session.run(fetches, feed_dict={
+            ph_inp_sentences: batched_sentences
+        })
+
+        if model_params.reconstruction_in_graph:
+            # Cut off the samples following the end of each waveform.
+            return [wav[:length] for wav, length in zip(outputs, lengths)]
+
+        return post_process_spectrograms(outputs, lengths, executor)
+
+    return __batch_fn
+
+
+class SynthesisRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles HTTP synthesis requests.
+
+    A request is expected to POST the sentence to synthesize as UTF-8 encoded text to
+    `/synthesize`. The synthesized waveform is returned as WAV file.
+    """
+
+    def do_POST(self):
+        if self.path != '/synthesize':
+            self.send_error(404, 'Unknown endpoint, POST sentences to /synthesize.')
+            return
+
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+            sentence = self.rfile.read(content_length).decode('utf-8').strip()
+        except ValueError as error:
+            # Invalid `Content-Length` header or a body that is not UTF-8 encoded.
+            self.send_error(400, 'Invalid request: {}'.format(error))
+            return
+
+        if len(sentence) == 0:
+            self.send_error(400, 'The request does not contain a sentence.')
+            return
+
+        try:
+            sentence_ids = encode_sentence(sentence, self.server.dataset)
+        except KeyError as error:
+            # The vocabulary is fixed, unknown characters can not be synthesized.
+            self.send_error(400, 'Unsupported character in sentence: {}'.format(error))
+            return
+
+        # Wait until the batch containing the sentence was synthesized.
+        future = self.server.batcher.submit(sentence_ids)
+        try:
+            wav = future.result()
+        except Exception as error:
+            self.send_error(500, 'Synthesis failed: {}'.format(error))
+            return
+
+        content = wav_to_bytes(wav, model_params.sampling_rate, norm=True)
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'audio/wav')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        tf.logging.debug(format, *args)
+
+
+class SynthesisServer(ThreadingMixIn, HTTPServer):
+    """
+    HTTP server handling each synthesis request on its own thread.
+
+    The requests handled concurrently are synthesized together by a `DynamicBatcher`.
+    """
+    daemon_threads = True
+
+    def __init__(self, server_address, batcher, dataset):
+        """
+        Creates the server and binds it to `server_address`.
+
+        Arguments:
+            server_address (tuple):
+                Tuple (host, port) to listen on.
+
+            batcher (tacotron.batching.DynamicBatcher):
+                Batcher synthesizing the sentences of all requests.
+
+            dataset (datasets.dataset_helper.DatasetHelper):
+                Dataset helper used to convert the sentences into ids.
+        """
+        HTTPServer.__init__(self, server_address, SynthesisRequestHandler)
+        self.batcher = batcher
+        self.dataset = dataset
+
+
+def serve():
     # Create a dataset loader.
     dataset = dataset_params.dataset_loader(dataset_folder=dataset_params.dataset_folder,
                                             char_dict=dataset_params.vocabulary_dict,
@@ -98,32 +210,27 @@ def serve(sentence_generator):
         # Load the exported model into the current session for serving.
         tf.saved_model.loader.load(session,
                                    [tf.saved_model.tag_constants.SERVING],
-                                   serving_params.export_dir)
+                                   os.path.join(serving_params.export_dir,
+                                                str(serving_params.export_version)))
 
-        # Get a handle to the tensor that is filled with the sentences.
-        ph_inp_sentences = graph.get_tensor_by_name('ph_inp_sentences:0')
+        # Start a persistent pool of workers for spectrogram inversion.
+        with create_synthesis_executor() as executor:
+            # Synthesize the sentences of concurrent requests in batches.
+            batcher = DynamicBatcher(create_batch_fn(session, executor),
+                                     max_batch_size=serving_params.max_batch_size,
+                                     max_wait=serving_params.max_batch_wait)
 
-        # The linear spec tensor used as the models output is produced by a dense layer.
-        # As such it has no direct name in the exported model (or I am getting something wrong).
-        # Hence, the resulting tensor has to be addressed by the bias add operation of the dense
-        # layer.
-        output_linear_spec = graph.get_tensor_by_name('dense/BiasAdd:0')
+            server = SynthesisServer((serving_params.host, serving_params.port), batcher, dataset)
+            print('Serving on http://{}:{}/synthesize'.format(serving_params.host,
+                                                             serving_params.port))
 
-        while True:
-            # Wait until the sentence generator provides a new set of sentences.
-            for raw_sentences in sentence_generator:
-                batched_sentences = pre_process_sentences(raw_sentences, dataset)
-                spectrograms = session.run([
-                    output_linear_spec
-                ],
-                    feed_dict={
-                        ph_inp_sentences: batched_sentences
-                    })
-
-                print(spectrograms)
-
-                wavs = post_process_spectrograms(spectrograms)
-                print('generated {} wavefeforms in total'.format(len(wavs)))
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                server.server_close()
+                batcher.close()
 
 
 def start_session(graph=None):
@@ -157,13 +264,4 @@ def start_session(graph=None):
 
 
 if __name__ == '__main__':
-    def sentence_generator():
-        raw_sentences = [
-            'Tis a test!',
-            'Sentences could be entered using POST requests in the future.'
-        ]
-        while True:
-            yield raw_sentences
-
-
-    serve(sentence_generator())
+    serve()
@@ -0,0 +1,118 @@
+import threading
+import time
+import urllib.request
+
+import numpy as np
+
+from tacotron.params.serving import serving_params
+
+# Sentences sent to the server, cycled through by all clients.
+SENTENCES = [
+    'Tis a test!',
+    'Printing, in the only sense with which we are at present concerned.',
+    'The server groups concurrent requests of similar length into a single batch.',
+    'Short one.',
+    'It differs from most if not from all the arts and crafts represented in the exhibition.',
+    'Sentences are entered using POST requests.'
+]
+
+# Numbers of concurrent clients to benchmark.
+CONCURRENCY = [1, 4, 16]
+
+# Number of requests sent by each client.
+REQUESTS_PER_CLIENT = 8
+
+# Number of requests sent before timing to warm up the server.
+N_WARMUP = 2
+
+
+def synthesize(url, sentence):
+    """
+    Request the synthesis of a sentence from the server.
+
+    Arguments:
+        url (str):
+            URL of the synthesis endpoint.
+
+        sentence (str):
+            The sentence to synthesize.
+
+    Returns:
+        bytes:
+            The WAV file returned by the server.
+    """
+    request = urllib.request.Request(url,
+                                     data=sentence.encode('utf-8'),
+                                     headers={'Content-Type': 'text/plain; charset=utf-8'})
+
+    with urllib.request.urlopen(request) as response:
+        if response.headers.get('Content-Type') != 'audio/wav':
+            raise ValueError('Unexpected response type "{}".'
+                             .format(response.headers.get('Content-Type')))
+
+        return response.read()
+
+
+def run_clients(url, n_clients, requests_per_client):
+    """
+    Send requests to the server from several concurrent clients.
+
+    Arguments:
+        url (str):
+            URL of the synthesis endpoint.
+
+        n_clients (int):
+            Number of concurrent clients.
+
+        requests_per_client (int):
+            Number of requests sent by each client one after another.
+
+    Returns:
+        (latencies, duration):
+            latencies (:obj:`list` of float):
+                Latency of each request in seconds.
+            duration (float):
+                Wall clock time in seconds until all requests were answered.
+    """
+    latencies = []
+    lock = threading.Lock()
+
+    def __client(_client):
+        for i in range(requests_per_client):
+            sentence = SENTENCES[(_client + i) % len(SENTENCES)]
+
+            start = time.time()
+            synthesize(url, sentence)
+            latency = time.time() - start
+
+            with lock:
+                latencies.append(latency)
+
+    clients = [threading.Thread(target=__client, args=(client,)) for client in range(n_clients)]
+
+    start = time.time()
+    for client in clients:
+        client.start()
+
+    for client in clients:
+        client.join()
+
+    return latencies, time.time() - start
+
+
+if __name__ == '__main__':
+    url = 'http://{}:{}/synthesize'.format(serving_params.host, serving_params.port)
+    print('Benchmarking "{}" ...'.format(url))
+
+    # Warm up the server before timing.
+    for sentence in SENTENCES[:N_WARMUP]:
+        synthesize(url, sentence)
+
+    print('{:>8} {:>9} {:>9} {:>9} {:>9} {:>10}'.format('clients', 'requests', 'p50 [s]',
+                                                        'p95 [s]', 'p99 [s]', 'requests/s'))
+    for n_clients in CONCURRENCY:
+        latencies, duration = run_clients(url, n_clients, REQUESTS_PER_CLIENT)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+
+        print('{:>8} {:>9} {:>9.3f} {:>9.3f} {:>9.3f} {:>10.2f}'.format(
+            n_clients, len(latencies), p50, p95, p99, len(latencies) / duration))
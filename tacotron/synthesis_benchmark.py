@@ -0,0 +1,99 @@
+import multiprocessing
+import time
+
+import numpy as np
+
+from audio.conversion import ms_to_samples
+from audio.executors import EXECUTOR_BACKENDS, create_executor
+from audio.features import linear_scale_spectrogram
+from audio.vocoders import VOCODERS, vocoder_from_params
+from tacotron.params.inference import inference_params
+from tacotron.params.model import model_params
+
+# Number of spectrograms inverted in each benchmark run.
+N_SPECTROGRAMS = 64
+
+# Range of the durations (in seconds) of the benchmarked utterances.
+MIN_DURATION = 1.0
+MAX_DURATION = 10.0
+
+# Number of timed runs per configuration (the best run is reported).
+N_RUNS = 3
+
+
+def generate_spectrograms(n_spectrograms, win_len, win_hop, n_fft):
+    """
+    Generate linear scale magnitude spectrograms of linear chirps with random durations.
+
+    Arguments:
+        n_spectrograms (int):
+            Number of spectrograms to generate.
+
+        win_len (int):
+            Length of each frame in audio samples.
+
+        win_hop (int):
+            Number of audio samples to hop between frames.
+
+        n_fft (int):
+            FFT window size.
+
+    Returns:
+        (:obj:`list` of :obj:`np.ndarray`):
+            Linear scale magnitude spectrograms.
+    """
+    random = np.random.RandomState(42)
+    sampling_rate = model_params.sampling_rate
+
+    spectrograms = []
+    for duration in random.uniform(MIN_DURATION, MAX_DURATION, n_spectrograms):
+        t = np.arange(int(duration * sampling_rate)) / sampling_rate
+        wav = 0.5 * np.sin(2.0 * np.pi * (100.0 + random.uniform(50.0, 500.0) * t) * t)
+
+        spectrogram = linear_scale_spectrogram(wav, n_fft, win_hop, win_len)
+        spectrograms.append(np.abs(spectrogram).astype(np.float32))
+
+    return spectrograms
+
+
+if __name__ == '__main__':
+    win_len = ms_to_samples(model_params.win_len, model_params.sampling_rate)
+    win_hop = ms_to_samples(model_params.win_hop, model_params.sampling_rate)
+    n_fft = model_params.n_fft
+
+    specs = generate_spectrograms(N_SPECTROGRAMS, win_len, win_hop, n_fft)
+    audio_duration = sum(win_hop * (spec.shape[1] - 1) for spec in specs)
+    audio_duration /= model_params.sampling_rate
+
+    print('Benchmarking the inversion of {} spectrograms ({:.1f}s of audio) ...'
+          .format(len(specs), audio_duration))
+
+    # Benchmark worker counts in powers of two up to the number of available cores.
+    n_cores = multiprocessing.cpu_count()
+    worker_counts = [2 ** i for i in range(n_cores.bit_length()) if 2 ** i <= n_cores]
+
+    print('{:>16} {:>8} {:>8} {:>10} {:>14}'.format('vocoder', 'backend', 'workers', 'time [s]',
+                                                    'real-time x'))
+    for vocoder_name in sorted(VOCODERS):
+        model_params.set_hparam('vocoder', vocoder_name)
+        vocoder = vocoder_from_params(model_params)
+
+        for backend in sorted(EXECUTOR_BACKENDS):
+            for n_workers in worker_counts:
+                with create_executor(backend,
+                                     vocoder,
+                                     n_workers,
+                                     batch_size=inference_params.synthesis_batch_size) as executor:
+                    # Warm up the worker pool before timing.
+                    executor.synthesize(specs[:n_workers])
+
+                    durations = []
+                    for _ in range(N_RUNS):
+                        start = time.time()
+                        executor.synthesize(specs)
+                        durations.append(time.time() - start)
+
+                duration = min(durations)
+                print('{:>16} {:>8} {:>8} {:>10.2f} {:>14.1f}'.format(vocoder_name, backend,
+                                                                     n_workers, duration,
+                                                                     audio_duration / duration))
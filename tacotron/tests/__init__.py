@@ -0,0 +1,6 @@
+"""
+This module implements tests for the Tacotron model components.
+"""
+
+__author__ = 'Yves-Noel Weweler <y.weweler@fh-muenster.de>'
+__status__ = 'Development'
@@ -0,0 +1,44 @@
+import os
+
+import numpy as np
+import pytest
+
+from tacotron.artifacts import ArtifactWriter
+
+
+def test_artifact_writer(tmpdir):
+    """
+    Test if each queued artifact is written into its own .npz file, even if the number of
+    pending artifacts is limited.
+
+    Arguments:
+        tmpdir (py.path.local):
+            Temporary folder to write the artifacts into.
+    """
+    alignments = np.random.RandomState(42).uniform(size=(4, 7)).astype(np.float32)
+
+    with ArtifactWriter(str(tmpdir), max_pending=1) as writer:
+        for i in range(3):
+            writer.write('request-{}'.format(i), alignments=alignments * i)
+
+    # Every artifact is written into its own file, no temporary files are left behind.
+    assert sorted(os.listdir(str(tmpdir))) == ['request-0.npz', 'request-1.npz', 'request-2.npz']
+
+    with np.load(os.path.join(str(tmpdir), 'request-2.npz')) as artifact:
+        np.testing.assert_array_equal(artifact['alignments'], alignments * 2)
+
+
+def test_artifact_writer_error(tmpdir):
+    """
+    Test if an error raised while writing an artifact in the background is raised in the
+    callers thread.
+
+    Arguments:
+        tmpdir (py.path.local):
+            Temporary folder. The artifacts are written into a missing sub-folder of it.
+    """
+    writer = ArtifactWriter(os.path.join(str(tmpdir), 'missing'))
+    writer.write('request', alignments=np.zeros(3))
+
+    with pytest.raises(RuntimeError):
+        writer.close()
@@ -0,0 +1,74 @@
+import numpy as np
+import tensorflow as tf
+
+from tacotron.attention import _gather_windows, _scatter_windows
+
+BATCH_SIZE = 3
+MEMORY_LENGTH = 12
+DEPTH = 4
+WINDOW_SIZE = 5
+
+# Window start positions, including windows reaching over both ends of the memory.
+WINDOW_STARTS = [-2, 4, 10]
+
+
+def window_positions():
+    """
+    Creates the memory positions covered by the windows of all batch entries.
+
+    Returns:
+        np.ndarray
+    """
+    positions = np.array(WINDOW_STARTS)[:, np.newaxis] + np.arange(WINDOW_SIZE)[np.newaxis, :]
+
+    return positions.astype(np.int32)
+
+
+def test_gather_windows():
+    """
+    Test if the batched window extraction matches slicing each window out of the memory, with
+    positions outside of the memory being zero padded.
+    """
+    memory = np.random.RandomState(42).normal(size=(BATCH_SIZE, MEMORY_LENGTH, DEPTH))
+    memory = memory.astype(np.float32)
+
+    with tf.Graph().as_default():
+        windows = _gather_windows(tf.constant(memory), tf.constant(window_positions()))
+
+        with tf.Session() as session:
+            windows = session.run(windows)
+
+    # Reference: Slice the windows out of the memory and zero pad them to the window size.
+    for i, start in enumerate(WINDOW_STARTS):
+        stop = start + WINDOW_SIZE
+        window = memory[i, max(start, 0):min(stop, MEMORY_LENGTH)]
+        window = np.pad(window, [[max(-start, 0), max(stop - MEMORY_LENGTH, 0)], [0, 0]],
+                        'constant')
+
+        np.testing.assert_array_equal(windows[i], window)
+
+
+def test_scatter_windows():
+    """
+    Test if the batched scattering places each window value at its memory position and drops
+    the values of positions outside of the memory.
+    """
+    values = np.random.RandomState(42).uniform(size=(BATCH_SIZE, WINDOW_SIZE))
+    values = values.astype(np.float32)
+
+    with tf.Graph().as_default():
+        scattered = _scatter_windows(tf.constant(values),
+                                     tf.constant(window_positions()),
+                                     MEMORY_LENGTH)
+
+        with tf.Session() as session:
+            scattered = session.run(scattered)
+
+    # Reference: Place each window value at its memory position, dropping positions outside.
+    for i, positions in enumerate(window_positions()):
+        expected = np.zeros(MEMORY_LENGTH, dtype=np.float32)
+        for value, position in zip(values[i], positions):
+            if 0 <= position < MEMORY_LENGTH:
+                expected[position] = value
+
+        np.testing.assert_allclose(scattered[i], expected)
@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+from tacotron.batching import DynamicBatcher
+
+
+def test_dynamic_batcher_max_batch_size():
+    """
+    Test if a batching window is closed once `max_batch_size` requests are waiting, leaving
+    further requests for the following windows, and if each batch is sorted by length.
+    """
+    batches = []
+    ready = threading.Event()
+
+    def __process(items):
+        # Hold back the first batch until all requests were submitted.
+        ready.wait()
+        lengths = [len(item) for item in items]
+        batches.append(lengths)
+        return [length * 2 for length in lengths]
+
+    batcher = DynamicBatcher(__process, max_batch_size=2, max_wait=10.0)
+
+    requests = ['a' * length for length in [5, 1, 4, 2, 3]]
+    futures = [batcher.submit(request) for request in requests]
+    ready.set()
+
+    # Closing the batcher closes the last window without waiting for `max_wait`.
+    batcher.close()
+
+    # Each request receives its own result.
+    assert [future.result(timeout=5.0) for future in futures] == [10, 2, 8, 4, 6]
+
+    # The requests are batched in order of arrival, each batch is sorted by length.
+    assert batches == [[1, 5], [2, 4], [3]]
+
+
+def test_dynamic_batcher_max_wait():
+    """
+    Test if a single request is processed once the batching window was closed after
+    `max_wait` seconds.
+    """
+    batcher = DynamicBatcher(lambda items: items, max_batch_size=8, max_wait=0.01)
+
+    assert batcher.submit('a').result(timeout=5.0) == 'a'
+    batcher.close()
+
+
+def test_dynamic_batcher_error():
+    """
+    Test if an error raised while processing a batch is propagated to its requests.
+    """
+    def __process(items):
+        raise ValueError('failed')
+
+    batcher = DynamicBatcher(__process, max_batch_size=2, max_wait=0.01)
+    future = batcher.submit('a')
+
+    with pytest.raises(ValueError):
+        future.result(timeout=5.0)
+
+    batcher.close()
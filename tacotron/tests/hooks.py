@@ -0,0 +1,81 @@
+import os
+
+import tensorflow as tf
+
+from tacotron.hooks import AsyncCheckpointSaverHook, LatencyRecorder, retained_checkpoints
+
+
+def test_retained_checkpoints():
+    """
+    Test if the retention policy keeps the last checkpoints plus every checkpoint that is a
+    multiple of `keep_every_steps`.
+    """
+    steps = [1000, 2000, 3000, 4000, 5000, 6000]
+
+    assert retained_checkpoints(steps, keep_last=2) == [5000, 6000]
+    assert retained_checkpoints(steps, keep_last=2, keep_every_steps=2000) == \
+        [2000, 4000, 5000, 6000]
+
+
+def test_async_checkpoint_saver_hook(tmpdir):
+    """
+    Test if the asynchronous saver writes checkpoints at the configured steps and at the end
+    of training, applies the retention policy and writes checkpoints a regular saver can restore.
+
+    Arguments:
+        tmpdir (py.path.local):
+            Temporary folder to write the checkpoints into.
+    """
+    checkpoint_dir = str(tmpdir)
+
+    with tf.Graph().as_default():
+        global_step = tf.train.create_global_step()
+        weights = tf.get_variable('weights', initializer=tf.zeros(4))
+        train_op = tf.group(tf.assign_add(weights, tf.ones(4)), tf.assign_add(global_step, 1))
+
+        hook = AsyncCheckpointSaverHook(checkpoint_dir=checkpoint_dir,
+                                        save_steps=2,
+                                        keep_last=2,
+                                        keep_every_steps=4)
+
+        with tf.train.SingularMonitoredSession(hooks=[hook]) as session:
+            for _ in range(9):
+                session.run(train_op)
+
+    # Checkpoints are written at the steps 2, 4, 6, 8 and 9 (end of training).
+    state = tf.train.get_checkpoint_state(checkpoint_dir)
+    steps = [int(path.rsplit('-', 1)[1]) for path in state.all_model_checkpoint_paths]
+    assert steps == [4, 8, 9]
+    assert not os.path.exists(os.path.join(checkpoint_dir, 'model.ckpt-6.index'))
+
+    # The checkpoints can be restored by a regular saver.
+    with tf.Graph().as_default():
+        weights = tf.get_variable('weights', shape=(4,))
+        tf.train.create_global_step()
+
+        with tf.Session() as session:
+            tf.train.Saver().restore(session, state.model_checkpoint_path)
+            assert session.run(weights).tolist() == [9.0] * 4
+
+
+def test_latency_recorder():
+    """
+    Test if the recorder reports the percentiles of the recorded latencies and is reset by
+    collecting them.
+    """
+    recorder = LatencyRecorder()
+
+    for latency in range(1, 101):
+        recorder.record(latency / 1000.0)
+
+    p50, p90, p99 = recorder.collect()
+    assert abs(p50 - 0.0505) < 1e-6
+    assert abs(p90 - 0.0901) < 1e-6
+    assert abs(p99 - 0.09901) < 1e-6
+
+    # Collecting clears the recorded latencies.
+    assert recorder.collect() is None
+
+    # Wrapped functions record their latency.
+    assert recorder.wrap(lambda x: 2 * x)(21) == 42
+    assert recorder.collect() is not None
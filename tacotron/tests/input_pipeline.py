@@ -0,0 +1,64 @@
+import numpy as np
+
+from tacotron.input_pipeline import estimate_padding_efficiency, frame_budget_buckets, \
+    simulate_bucketing
+
+# Frame counts of a dataset including a single sample that exceeds the frame budget.
+FRAME_COUNTS = list(range(10, 130, 10)) + [500]
+
+# Budget of padded frames per batch.
+MAX_FRAMES_PER_BATCH = 300
+
+# Samples of a small dataset for the bucketing simulation.
+# With the boundary [5], the sentences of length 5 belong to the second bucket.
+SENTENCE_LENGTHS = [3, 4, 5, 5, 5]
+SAMPLE_FRAMES = [30, 40, 50, 50, 50]
+
+
+def test_frame_budget_buckets():
+    """
+    Test if the batches of each frame count bucket stay within the budget of padded frames and
+    if samples exceeding the budget on their own are still batched one at a time.
+    """
+    boundaries, batch_sizes = frame_budget_buckets(FRAME_COUNTS, 4, MAX_FRAMES_PER_BATCH)
+
+    assert boundaries == [40, 70, 100]
+    assert batch_sizes == [7, 4, 3, 1]
+
+    # Largest frame count of each bucket, the last bucket is bounded by the longest sample.
+    bucket_max_frames = [39, 69, 99, 500]
+    for batch_size, max_frames in zip(batch_sizes[:-1], bucket_max_frames[:-1]):
+        assert batch_size * max_frames <= MAX_FRAMES_PER_BATCH
+
+    # Each sample fits into the budget with the batch size of its bucket.
+    bucket_ids = np.searchsorted(boundaries, FRAME_COUNTS, side='right')
+    for n_frames, bucket_id in zip(FRAME_COUNTS, bucket_ids):
+        if n_frames <= MAX_FRAMES_PER_BATCH:
+            assert batch_sizes[bucket_id] * n_frames <= MAX_FRAMES_PER_BATCH
+        else:
+            assert batch_sizes[bucket_id] == 1
+
+
+def test_simulate_bucketing():
+    """
+    Test counting the real and padded tokens and frames of a simulated epoch on a small
+    hand-computed example.
+
+    The first bucket contains the sentences of length 3 and 4 in a single batch. The second
+    bucket starts at the boundary and contains the three sentences of length 5 in a complete
+    and an incomplete batch.
+    """
+    counts = simulate_bucketing(SENTENCE_LENGTHS, SENTENCE_LENGTHS, SAMPLE_FRAMES,
+                                bucket_boundaries=[5], bucket_batch_sizes=[4, 2])
+
+    assert counts == {
+        'real_tokens': 3 + 4 + 3 * 5,
+        'padded_tokens': 2 * 4 + 3 * 5,
+        'real_frames': 30 + 40 + 3 * 50,
+        'padded_frames': 2 * 40 + 3 * 50,
+        'n_batches': 3
+    }
+
+    # The padding efficiency is calculated from the same counts, using the frames as lengths.
+    efficiency = estimate_padding_efficiency(SAMPLE_FRAMES, [50], [4, 2])
+    np.testing.assert_almost_equal(efficiency, 220.0 / 230.0)
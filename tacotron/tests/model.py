@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+import tensorflow as tf
+
+from tacotron.model import Mode, Tacotron
+from tacotron.params.model import model_params
+
+# Number of Mel. bands and reduction factor of the tiny model.
+N_MELS = 4
+REDUCTION = 2
+
+# Hyper-parameters of a tiny model that can be build and run quickly on the CPU.
+TINY_PARAMS = {
+    model_params: {
+        'n_fft': 14,
+        'n_mels': N_MELS,
+        'reduction': REDUCTION,
+        'force_cudnn': False,
+        'reconstruction_in_graph': False
+    },
+    model_params.encoder: {
+        'embedding_size': 8,
+        'pre_net_layers': ((8, 0.5, tf.nn.relu), (8, 0.5, tf.nn.relu)),
+        'n_banks': 2,
+        'n_filters': 8,
+        'projections': ((8, 3, tf.nn.relu), (8, 3, None)),
+        'n_highway_layers': 1,
+        'n_highway_units': 8,
+        'n_gru_units': 8
+    },
+    model_params.decoder: {
+        'pre_net_layers': ((8, 0.5, tf.nn.relu), (8, 0.5, tf.nn.relu)),
+        'n_gru_layers': 1,
+        'n_decoder_gru_units': 8,
+        'n_attention_units': 8,
+        'target_size': N_MELS
+    },
+    model_params.post: {
+        'n_banks': 2,
+        'n_filters': 8,
+        'projections': ((8, 3, tf.nn.relu), (N_MELS, 3, None)),
+        'n_highway_layers': 1,
+        'n_highway_units': 8,
+        'n_gru_units': 8
+    }
+}
+
+
+@pytest.fixture
+def tiny_model(monkeypatch):
+    """
+    Replace the model hyper-parameters with the ones of a tiny model for the duration of a test.
+
+    Arguments:
+        monkeypatch (_pytest.monkeypatch.MonkeyPatch):
+            Restores the original hyper-parameters after the test.
+    """
+    for hparams, values in TINY_PARAMS.items():
+        for name, value in values.items():
+            monkeypatch.setattr(hparams, name, value)
+
+
+@pytest.mark.parametrize('mixed_precision', [False, True])
+def test_train_graph(tiny_model, monkeypatch, mixed_precision):
+    """
+    Test if the model graph can be build in `TRAIN` mode and if a forward pass over a padded
+    batch of ground truth frames results in a finite loss.
+
+    Arguments:
+        tiny_model:
+            Fixture replacing the model hyper-parameters with the ones of a tiny model.
+
+        monkeypatch (_pytest.monkeypatch.MonkeyPatch):
+            Used to enable mixed precision for the duration of the test.
+
+        mixed_precision (bool):
+            Flag enabling mixed precision.
+    """
+    monkeypatch.setattr(model_params, 'mixed_precision', mixed_precision)
+
+    random = np.random.RandomState(42)
+    n_frames = 3 * REDUCTION
+
+    with tf.Graph().as_default():
+        tf.set_random_seed(42)
+
+        placeholders = Tacotron.model_placeholders()
+        model = Tacotron(inputs=placeholders, mode=Mode.TRAIN, training_summary=False)
+
+        with tf.Session() as session:
+            session.run(tf.global_variables_initializer())
+            loss, mel_spec = session.run([model.get_loss_op(), model.output_mel_spec], feed_dict={
+                placeholders['ph_sentences']: [[5, 6, 7, 1], [8, 9, 1, 0]],
+                placeholders['ph_sentence_length']: [4, 3],
+                placeholders['ph_mel_specs']: random.uniform(size=(2, n_frames, N_MELS)),
+                placeholders['ph_lin_specs']: random.uniform(size=(2, n_frames, 8)),
+                placeholders['ph_time_frames']: [n_frames, n_frames]
+            })
+
+    # The decoder generates exactly as many frames as the ground truth contains.
+    assert mel_spec.shape == (2, n_frames, N_MELS)
+    assert np.isfinite(loss)
@@ -0,0 +1,109 @@
+import numpy as np
+import tensorflow as tf
+
+from tacotron.layers import cbhg
+from tacotron.precision import DynamicLossScale, float32_softmax, mixed_precision_scope
+
+
+def tiny_cbhg(inputs):
+    """
+    Creates a CBHG module with a tiny configuration on CPU compatible layers.
+
+    Returns:
+        tf.Tensor
+    """
+    outputs, _ = cbhg(inputs=inputs,
+                      n_banks=2,
+                      n_filters=8,
+                      n_highway_layers=2,
+                      n_highway_units=8,
+                      projections=((8, 3, tf.nn.relu), (8, 3, None)),
+                      n_gru_units=8,
+                      training=False,
+                      force_cudnn=False)
+
+    return outputs
+
+
+def test_float32_master_weights():
+    """
+    Test if variables requested in float16 inside the mixed precision scope are stored in
+    float32 and read in float16.
+    """
+    with tf.Graph().as_default():
+        with mixed_precision_scope():
+            weights = tf.get_variable('weights', shape=(4, 4), dtype=tf.float16)
+
+        # The variable is stored in float32 but read in float16.
+        assert weights.dtype == tf.float16
+        assert [v.dtype.base_dtype for v in tf.trainable_variables()] == [tf.float32]
+
+
+def test_cbhg_mixed_precision_parity():
+    """
+    Test if a CBHG module calculated in float16 produces nearly the same outputs as the same
+    module calculated in float32 using the same float32 variables.
+    """
+    inputs = np.random.RandomState(42).uniform(-1.0, 1.0, (2, 20, 8)).astype(np.float32)
+
+    with tf.Graph().as_default():
+        tf.set_random_seed(42)
+
+        with tf.variable_scope('cbhg'), mixed_precision_scope():
+            outputs_32 = tiny_cbhg(tf.constant(inputs))
+
+        # Reuse the same float32 variables for the float16 network.
+        with tf.variable_scope('cbhg', reuse=True), mixed_precision_scope():
+            outputs_16 = tiny_cbhg(tf.constant(inputs, dtype=tf.float16))
+
+        assert outputs_16.dtype == tf.float16
+
+        with tf.Session() as session:
+            session.run(tf.global_variables_initializer())
+            outputs_32, outputs_16 = session.run([outputs_32, outputs_16])
+
+    np.testing.assert_allclose(outputs_16.astype(np.float32), outputs_32, atol=1e-2)
+
+
+def test_float32_softmax():
+    """
+    Test if the softmax of large float16 scores is calculated without overflowing and is
+    returned in float16.
+    """
+    with tf.Graph().as_default():
+        scores = tf.constant([[1000.0, 1001.0, 999.0]], dtype=tf.float16)
+        probabilities = float32_softmax(scores)
+
+        assert probabilities.dtype == tf.float16
+
+        with tf.Session() as session:
+            probabilities = session.run(probabilities)
+
+    np.testing.assert_allclose(np.sum(probabilities), 1.0, atol=1e-3)
+
+
+def test_dynamic_loss_scale():
+    """
+    Test if the loss scale is decreased after non-finite gradients and increased again after
+    `increment_steps` steps with finite gradients.
+    """
+    with tf.Graph().as_default():
+        loss_scale = DynamicLossScale(initial_scale=8.0, increment_steps=2, factor=2.0)
+
+        gradients = tf.placeholder(dtype=tf.float32, shape=(3,))
+        finite = loss_scale.all_finite([gradients, None])
+        update = loss_scale.update(finite)
+
+        with tf.Session() as session:
+            session.run(tf.global_variables_initializer())
+
+            # Overflowing gradients decrease the scale immediately.
+            session.run(update, feed_dict={gradients: [1.0, np.inf, 0.0]})
+            assert session.run(loss_scale.scale) == 4.0
+
+            # The scale is increased after `increment_steps` steps with finite gradients.
+            session.run(update, feed_dict={gradients: [1.0, 2.0, 3.0]})
+            assert session.run(loss_scale.scale) == 4.0
+
+            session.run(update, feed_dict={gradients: [1.0, 2.0, 3.0]})
+            assert session.run(loss_scale.scale) == 8.0
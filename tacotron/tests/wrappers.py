@@ -0,0 +1,110 @@
+import numpy as np
+import tensorflow as tf
+from tensorflow.contrib import seq2seq
+
+from tacotron.helpers import TacotronInferenceHelper
+from tacotron.wrappers import AlignmentCounterWrapper, SilenceCounterWrapper
+
+FRAME_SIZE = 2
+REDUCTION = 3
+
+
+class EchoCell(tf.nn.rnn_cell.RNNCell):
+    """
+    RNN cell emitting its inputs as outputs.
+    """
+
+    @property
+    def state_size(self):
+        return 1
+
+    @property
+    def output_size(self):
+        return FRAME_SIZE * REDUCTION
+
+    def call(self, inputs, state):
+        return inputs, state
+
+
+class StepCounterCell(EchoCell):
+    """
+    RNN cell emitting its inputs as outputs and counting the decoder steps in its state.
+    """
+
+    def call(self, inputs, state):
+        return inputs, state + 1.0
+
+
+def test_silence_counter():
+    """
+    Test if the consecutive near-silent frames are counted across decoder steps and if the
+    count restarts after a loud frame.
+    """
+    loud, quiet = 0.8, 0.05
+
+    # Frames of three decoder steps for two sequences, shape => (steps, B, r, frame_size).
+    steps = np.array([
+        [[quiet, loud, quiet], [loud, loud, loud]],
+        [[quiet, quiet, quiet], [loud, quiet, quiet]],
+        [[quiet, quiet, quiet], [quiet, loud, quiet]],
+    ])
+    steps = np.repeat(steps[..., np.newaxis], FRAME_SIZE, axis=-1).astype(np.float32)
+
+    with tf.Graph().as_default():
+        cell = SilenceCounterWrapper(EchoCell(), FRAME_SIZE, REDUCTION, threshold=0.1)
+        state = cell.zero_state(2, tf.float32)
+
+        counts = []
+        for step in steps:
+            _, state = cell(tf.constant(step.reshape(2, -1)), state)
+            counts.append(state[1][:, 0])
+
+        with tf.Session() as session:
+            counts = session.run(counts)
+
+    # Silent frames are counted across steps and the count restarts after a loud frame.
+    np.testing.assert_array_equal(counts, [[1, 0], [4, 2], [7, 1]])
+
+
+def test_alignment_counter_stop_step():
+    """
+    Test if decoding a sequence is stopped only after the attention stayed on the <EOS> token
+    for the required number of consecutive decoder steps.
+    """
+    # Attention position of each decoder step for two sequences, shape => (steps, B).
+    positions = [[0, 1], [1, 2], [3, 2], [2, 0], [3, 0], [3, 0], [3, 0]]
+
+    # The <EOS> token is at position 3 for the first and at position 2 for the second sequence.
+    sentence_lengths = [4, 3]
+    stop_steps = 2
+
+    def __alignments(_state):
+        # The state of the wrapped cell is the number of decoder steps taken so far.
+        step = tf.cast(_state[0, 0], tf.int32) - 1
+        return tf.one_hot(tf.gather(positions, step), depth=4)
+
+    def __stop(_outputs, _state):
+        return tf.cast(_state[1][:, 0], tf.int32) >= stop_steps
+
+    with tf.Graph().as_default():
+        cell = AlignmentCounterWrapper(StepCounterCell(), tf.constant(sentence_lengths),
+                                       __alignments)
+
+        helper = TacotronInferenceHelper(batch_size=2,
+                                         input_size=FRAME_SIZE * REDUCTION,
+                                         stop_fn=__stop)
+
+        decoder = seq2seq.BasicDecoder(cell=cell,
+                                       helper=helper,
+                                       initial_state=cell.zero_state(2, tf.float32))
+
+        _, _, lengths = seq2seq.dynamic_decode(decoder=decoder,
+                                               impute_finished=True,
+                                               maximum_iterations=len(positions))
+
+        with tf.Session() as session:
+            lengths = session.run(lengths)
+
+    # The first sequence leaves the <EOS> token again after reaching it in step 3, the second
+    # sequence stays on the <EOS> token from step 2 on.
+    np.testing.assert_array_equal(lengths, [6, 3])
@@ -2,11 +2,17 @@ import os
 import tensorflow as tf
 import numpy as np
 
-from datasets.dataset_helper import DatasetHelper
+from datasets.feature_cache import FeatureCache
+from datasets.feature_store import FeatureStore, feature_key
+from tacotron.hooks import AsyncCheckpointSaverHook, StepProfilerHook
+from tacotron.input_pipeline import add_padding_summaries, batched_dataset_inputs, \
+    calculate_bucket_boundaries, estimate_padding_efficiency, frame_budget_buckets, \
+    load_frame_counts
 from tacotron.model import Tacotron, Mode
 from tacotron.params.dataset import dataset_params
 from tacotron.params.model import model_params
 from tacotron.params.training import training_params
+from tacotron.precision import DynamicLossScale
 
 # Hack to force tensorflow to run on the CPU.
 # os.environ["CUDA_DEVICE_ORDER"] = "PCI_BUS_ID"
@@ -14,12 +20,20 @@ from tacotron.params.training import training_params
 
 tf.logging.set_verbosity(tf.logging.INFO)
 
+# Name scope of the data-parallel model replicas.
+TOWER_SCOPE = 'tower_{}'
 
-def batched_placeholders(dataset, max_samples, n_epochs, batch_size):
+# Variable operation types placed on the shared variables device in data-parallel training.
+VARIABLE_OPS = ['Variable', 'VariableV2', 'VarHandleOp']
+
+
+def batched_placeholders(dataset, max_samples, n_epochs, batch_size, load_latency=None):
     """
     Created batches from an dataset that are bucketed by the input sentences sequence lengths.
     Creates placeholders that are filled by QueueRunners. Before executing the placeholder it is
     therefore required to start the corresponding threads using `tf.train.start_queue_runners`.
+    If `training_params.input_pipeline` is 'dataset', the placeholders are filled by a `tf.data`
+    input pipeline instead (see `tacotron.input_pipeline.batched_dataset_inputs`).
 
     Arguments:
         dataset (datasets.DatasetHelper):
@@ -35,6 +49,9 @@ def batched_placeholders(dataset, max_samples, n_epochs, batch_size):
         batch_size (int):
             target size of the batches to create.
 
+        load_latency (:obj:`tacotron.hooks.LatencyRecorder`, optional):
+            If not None, the latency of each call to the feature loading function is recorded.
+
     Returns:
         (placeholder_dictionary, n_samples):
             placeholder_dictionary:
@@ -71,40 +88,120 @@ def batched_placeholders(dataset, max_samples, n_epochs, batch_size):
     sentences, sentence_lengths, wav_paths = dataset.load(max_samples=max_samples)
     print('Loaded {} dataset sentences.'.format(len(sentences)))
 
-    # Pre-cache all audio features.
+    # Open the packed feature store, which replaces the per-utterance .npz files.
+    feature_store = None
+    if dataset_params.feature_store_folder is not None:
+        feature_store = FeatureStore(dataset_params.feature_store_folder)
+        print('Opened feature store with {} entries.'.format(len(feature_store)))
+
+    # Cache decoded audio features in RAM within a memory budget.
     feature_cache = None
     if training_params.cache_preprocessed:
-        feature_cache = DatasetHelper.cache_precalculated_features(wav_paths)
-        print('Cached {} waveforms.'.format(len(wav_paths)))
+        feature_cache = FeatureCache(training_params.cache_max_bytes)
+        add_feature_cache_summaries(feature_cache)
 
     # Get the total number of samples in the dataset.
     n_samples = len(sentence_lengths)
     print('Finished loading {} dataset entries.'.format(n_samples))
 
-    # Sort sequence lengths in order to slice them into buckets that contain sequences of roughly
-    # equal length.
-    sorted_sentence_lengths = np.sort(sentence_lengths)
+    if training_params.load_preprocessed:
+        # The training files are expected to be preprocessed to they can be used directly.
 
-    if n_samples < training_params.n_buckets:
-        raise AssertionError('The number of entries loaded is smaller than the number of '
-                             'buckets to be created. Automatic calculation of the bucket '
-                             'boundaries is not possible.')
+        def __load_features(_wav_path):
+            # Slice the features from the memory mapped feature store.
+            # Cached features are copied, so they do not just reference the mapped pages.
+            if feature_store is not None:
+                _copy = feature_cache is not None
+                _data = feature_store[feature_key(_wav_path, dataset_params.dataset_folder)]
+                return _data['mel_mag_db'].astype(np.float32, copy=_copy), \
+                       _data['linear_mag_db'].astype(np.float32, copy=_copy)
 
-    # Slice the sorted lengths into equidistant sections and use the first element of a slice as
-    # the bucket boundary.
-    bucket_step = n_samples // training_params.n_buckets
-    bucket_boundaries = sorted_sentence_lengths[::bucket_step]
+            # Load the features from the .npz file next to the audio file.
+            file_path = os.path.splitext(_wav_path)[0]
+            with np.load('{}.npz'.format(file_path)) as _data:
+                return _data['mel_mag_db'], _data['linear_mag_db']
 
-    # Throw away the first and last bucket boundaries since the bucketing algorithm automatically
-    # adds two surrounding ones.
-    bucket_boundaries = bucket_boundaries[1:-1].tolist()
+        def _load_processed(wav_path):
+            wav_path = wav_path.decode()
+
+            # Either load features from the cache or from disk.
+            if feature_cache is not None:
+                return feature_cache.get(wav_path, lambda: __load_features(wav_path))
 
-    # Remove duplicate boundaries from the list.
-    bucket_boundaries = sorted(list(set(bucket_boundaries)))
+            return __load_features(wav_path)
+
+        load_fn = _load_processed
+    else:
+        # Load and process audio file from disk.
+        load_fn = dataset.load_audio
+
+    if load_latency is not None:
+        load_fn = load_latency.wrap(load_fn)
+
+    # Batch by a budget of padded spectrogram frames instead of a fixed batch size.
+    bucket_by_frames = training_params.max_frames_per_batch is not None
+    bucket_batch_sizes = None
+
+    if bucket_by_frames:
+        if training_params.input_pipeline != 'dataset' or not training_params.load_preprocessed:
+            raise ValueError('Batching by a frame budget requires the "dataset" input pipeline '
+                             'and pre-processed features.')
+
+        frame_counts = load_frame_counts(wav_paths, dataset_params.dataset_folder, feature_store)
+        bucket_boundaries, bucket_batch_sizes = frame_budget_buckets(
+            frame_counts,
+            training_params.n_buckets,
+            training_params.max_frames_per_batch)
+
+        print('bucket_batch_sizes', bucket_batch_sizes)
+        efficiency = estimate_padding_efficiency(frame_counts,
+                                                 bucket_boundaries,
+                                                 bucket_batch_sizes)
+        print('Estimated padding efficiency: {:.1%}'.format(efficiency))
+    else:
+        bucket_boundaries = calculate_bucket_boundaries(sentence_lengths,
+                                                        training_params.n_buckets)
 
     print('bucket_boundaries', bucket_boundaries)
     print('n_buckets: {} + 2'.format(len(bucket_boundaries)))
 
+    # Each batch is split between the data-parallel towers (see `create_towers`). A tower
+    # receiving an empty slice would produce a NaN loss, so every batch has to provide at least
+    # one sample for each tower.
+    if training_params.tower_devices is not None and len(training_params.tower_devices) > 1:
+        n_towers = len(training_params.tower_devices)
+
+        if training_params.allow_smaller_batches:
+            raise ValueError('Data-parallel training on {} towers does not support smaller '
+                             'batches, the final batches can hold less samples than towers.'
+                             .format(n_towers))
+
+        min_batch_size = batch_size if bucket_batch_sizes is None else min(bucket_batch_sizes)
+        if min_batch_size < n_towers:
+            raise ValueError('The smallest batch size ({}) has to be at least the number of '
+                             'towers ({}).'.format(min_batch_size, n_towers))
+
+    # Create the batches using the tf.data based input pipeline if requested.
+    if training_params.input_pipeline == 'dataset':
+        placeholder_dict = batched_dataset_inputs(
+            sentences, sentence_lengths, wav_paths,
+            load_fn=load_fn,
+            batch_size=batch_size,
+            bucket_boundaries=bucket_boundaries,
+            n_epochs=n_epochs,
+            shuffle=training_params.shuffle_samples,
+            seed=training_params.shuffle_seed,
+            n_threads=n_threads,
+            n_prefetch_batches=training_params.n_pre_calc_batches,
+            allow_smaller_batches=training_params.allow_smaller_batches,
+            prefetch_device=training_params.prefetch_device,
+            bucket_by_frames=bucket_by_frames,
+            bucket_batch_sizes=bucket_batch_sizes)
+
+        add_padding_summaries(placeholder_dict, bucket_boundaries, bucket_by_frames)
+
+        return placeholder_dict, n_samples
+
     # Convert everything into tf.Tensor objects for queue based processing.
     sentences = tf.convert_to_tensor(sentences)
     sentence_lengths = tf.convert_to_tensor(sentence_lengths)
@@ -115,32 +212,16 @@ def batched_placeholders(dataset, max_samples, n_epochs, batch_size):
         [sentences, sentence_lengths, wav_paths],
         capacity=n_threads * batch_size,
         num_epochs=n_epochs,
-        shuffle=training_params.shuffle_samples)
+        shuffle=training_params.shuffle_samples,
+        seed=training_params.shuffle_seed)
 
     # The sentence is a integer sequence (char2idx), we need to interpret it as such since it is
     # stored in a tensor that hold objects in order to manage sequences of different lengths in a
     # single tensor.
     sentence = tf.decode_raw(sentence, tf.int32)
 
-    if training_params.load_preprocessed:
-        # The training files are expected to be preprocessed to they can be used directly.
-
-        def _load_processed(wav_path):
-            file_path = os.path.splitext(wav_path.decode())[0]
-
-            # Either load features from the cache or from disk.
-            if training_params.cache_preprocessed:
-                data = feature_cache[file_path]
-            else:
-                data = np.load('{}.npz'.format(file_path))
-
-            return data['mel_mag_db'], data['linear_mag_db']
-
-        mel_spec, lin_spec = tf.py_func(_load_processed, [wav_path], [tf.float32, tf.float32])
-    else:
-        # Load and process audio file from disk.
-        # Apply load_audio to each wav_path of the tensorflow iterator.
-        mel_spec, lin_spec = tf.py_func(dataset.load_audio, [wav_path], [tf.float32, tf.float32])
+    # Apply the feature loading function to each wav_path of the tensorflow iterator.
+    mel_spec, lin_spec = tf.py_func(load_fn, [wav_path], [tf.float32, tf.float32])
 
     # The shape of the returned values from py_func seems to get lost for some reason.
     mel_spec.set_shape((None, model_params.n_mels * model_params.reduction))
@@ -180,22 +261,238 @@ def batched_placeholders(dataset, max_samples, n_epochs, batch_size):
         'ph_time_frames': ph_time_frames
     }
 
+    add_padding_summaries(placeholder_dict, bucket_boundaries)
+
     return placeholder_dict, n_samples
 
 
-def train(model):
+def add_feature_cache_summaries(feature_cache):
+    """
+    Add summaries reporting the hit, miss and eviction counters of a feature cache.
+
+    Arguments:
+        feature_cache (datasets.feature_cache.FeatureCache):
+            Feature cache to be reported.
+    """
+    def __counters():
+        return np.array(feature_cache.counters(), dtype=np.int64)
+
+    with tf.name_scope('feature_cache'):
+        counters = tf.py_func(__counters, [], tf.int64, stateful=True)
+        hits, misses, evictions, n_bytes = tf.unstack(tf.reshape(counters, [4]))
+
+        tf.summary.scalar('hits', hits)
+        tf.summary.scalar('misses', misses)
+        tf.summary.scalar('evictions', evictions)
+        tf.summary.scalar('megabytes', tf.cast(n_bytes, tf.float32) / 2.0 ** 20)
+
+        # Fraction of all lookups that were answered from the cache.
+        lookups = tf.maximum(hits + misses, 1)
+        tf.summary.scalar('hit_rate', tf.cast(hits, tf.float32) / tf.cast(lookups, tf.float32))
+
+
+def create_towers(placeholders, devices):
+    """
+    Replicate the Tacotron model on several devices for data-parallel training.
+
+    Each batch is split into `len(devices)` equally sized parts and each part is processed by
+    a separate model replica (tower). All towers share the same variables, which are placed on
+    `training_params.variables_device`. Every batch has to hold at least `len(devices)` samples,
+    which is verified by `batched_placeholders`.
+
+    Arguments:
+        placeholders (dict):
+            Placeholder dictionary of the full batches (see `batched_placeholders`).
+
+        devices (:obj:`list` of str):
+            Devices to place the towers on (e.g. ['/gpu:0', '/gpu:1']).
+
+    Returns:
+        (:obj:`list` of Tacotron):
+            Model replicas. Only the first tower writes the optional training summaries.
+    """
+    n_towers = len(devices)
+    batch_size = tf.shape(placeholders['ph_sentence_length'])[0]
+
+    def __device_fn(_device):
+        def __assign(_op):
+            # Share the variables between all towers by placing them on a common device.
+            if _op.type in VARIABLE_OPS:
+                return training_params.variables_device
+            return _device
+
+        return __assign
+
+    towers = []
+    for i, device in enumerate(devices):
+        # Slice the part of the batch processed by this tower.
+        start = (batch_size * i) // n_towers
+        end = (batch_size * (i + 1)) // n_towers
+        tower_inputs = {key: value[start:end] for key, value in placeholders.items()}
+
+        with tf.device(__device_fn(device)), \
+                tf.name_scope(TOWER_SCOPE.format(i)), \
+                tf.variable_scope(tf.get_variable_scope(), reuse=i > 0):
+            towers.append(Tacotron(inputs=tower_inputs,
+                                   mode=Mode.TRAIN,
+                                   training_summary=training_params.write_summary and i == 0))
+
+    return towers
+
+
+def average_gradients(tower_grads_and_vars):
+    """
+    Average the gradients calculated by several towers.
+
+    Arguments:
+        tower_grads_and_vars (:obj:`list` of :obj:`list` of tuple):
+            List of (gradient, variable) pairs for each tower, as returned by
+            `tf.train.Optimizer.compute_gradients`. All lists have to share the same variable
+            order.
+
+    Returns:
+        (:obj:`list` of tuple):
+            Averaged (gradient, variable) pairs.
+    """
+    # Nothing to average for a single tower. This also keeps sparse gradients intact.
+    if len(tower_grads_and_vars) == 1:
+        return tower_grads_and_vars[0]
+
+    averaged = []
+    for grads_and_vars in zip(*tower_grads_and_vars):
+        variable = grads_and_vars[0][1]
+        gradients = [gradient for gradient, _ in grads_and_vars if gradient is not None]
+
+        if len(gradients) == 0:
+            averaged.append((None, variable))
+            continue
+
+        # Sparse gradients (e.g. of the embedding lookup) are converted to dense tensors.
+        gradients = [tf.convert_to_tensor(gradient) for gradient in gradients]
+        averaged.append((tf.add_n(gradients) / float(len(gradients)), variable))
+
+    return averaged
+
+
+class GradientAccumulator:
+    """
+    Accumulates the gradients of several consecutive micro-batches.
+
+    The accumulated gradients are stored in local variables, which are not saved in checkpoints.
+    Each evaluation of `ready` adds the gradients of the current micro-batch to the accumulators.
+    """
+
+    def __init__(self, grads_and_vars, n_steps):
+        """
+        Creates the accumulator variables.
+
+        Arguments:
+            grads_and_vars (:obj:`list` of tuple):
+                List of (gradient, variable) pairs of a single micro-batch.
+
+            n_steps (int):
+                Number of micro-batches to accumulate for each optimizer step.
+        """
+        self.n_steps = n_steps
+
+        self.__variables = []
+        self.__accumulators = []
+
+        accumulate_ops = []
+        with tf.variable_scope('gradient_accumulation'):
+            # Number of micro-batches processed so far.
+            micro_step = tf.get_variable('micro_step',
+                                         initializer=tf.constant(0, dtype=tf.int64),
+                                         trainable=False,
+                                         collections=[tf.GraphKeys.LOCAL_VARIABLES])
+
+            for gradient, variable in grads_and_vars:
+                self.__variables.append(variable)
+
+                if gradient is None:
+                    self.__accumulators.append(None)
+                    continue
+
+                with tf.colocate_with(variable):
+                    accumulator = tf.get_variable(variable.op.name,
+                                                  shape=variable.get_shape(),
+                                                  dtype=variable.dtype.base_dtype,
+                                                  initializer=tf.zeros_initializer(),
+                                                  trainable=False,
+                                                  collections=[tf.GraphKeys.LOCAL_VARIABLES])
+
+                # Sparse gradients (e.g. of the embedding lookup) are accumulated densely.
+                accumulate_ops.append(tf.assign_add(accumulator, tf.convert_to_tensor(gradient)))
+                self.__accumulators.append(accumulator)
+
+            with tf.control_dependencies(accumulate_ops):
+                micro_step = tf.assign_add(micro_step, 1)
+
+        # True for every `n_steps`'th micro-batch, after its gradients have been accumulated.
+        self.ready = tf.equal(micro_step % n_steps, 0)
+
+    def gradients(self):
+        """
+        Get the mean of the accumulated gradients.
+
+        Returns:
+            (:obj:`list` of tuple):
+                List of (gradient, variable) pairs.
+        """
+        grads_and_vars = []
+        for accumulator, variable in zip(self.__accumulators, self.__variables):
+            if accumulator is None:
+                grads_and_vars.append((None, variable))
+            else:
+                grads_and_vars.append((accumulator.read_value() / float(self.n_steps), variable))
+
+        return grads_and_vars
+
+    def reset(self):
+        """
+        Create an operation resetting the accumulated gradients to zero.
+
+        Returns:
+            tf.Operation
+        """
+        return tf.group(*[
+            tf.assign(accumulator, tf.zeros_like(accumulator))
+            for accumulator in self.__accumulators if accumulator is not None
+        ])
+
+
+def train(models, hooks=None):
     """
     Trains a Tacotron model.
 
     Arguments:
-        model (Tacotron):
-            The Tacotron model instance to be trained.
+        models (:obj:`list` of Tacotron):
+            The Tacotron model instance to be trained, or several towers sharing their variables
+            (see `create_towers`) to train data-parallel. The gradients of all towers are
+            averaged before they are clipped and applied.
+
+            If `model_params.mixed_precision` is enabled, the losses are scaled dynamically
+            (see `tacotron.precision.DynamicLossScale`) and updates with overflowing gradients
+            are skipped.
+
+            If `training_params.accumulation_steps` is larger than one, the gradients of that
+            many consecutive batches are accumulated (see `GradientAccumulator`) before a single
+            optimizer step is made. The global step, and therefore the learning rate schedule,
+            the summaries and the checkpoints, count optimizer steps.
+
+        hooks (:obj:`list` of tf.train.SessionRunHook, optional):
+            Additional hooks to run during training (e.g. `tacotron.hooks.StepProfilerHook`).
     """
     # NOTE: The global step has to be created before the optimizer is created.
     global_step = tf.train.create_global_step()
 
-    # Get the models loss function.
-    loss_op = model.get_loss_op()
+    # Get the models loss function, averaged over all towers.
+    tower_losses = [model.get_loss_op() for model in models]
+    if len(models) == 1:
+        loss_op = tower_losses[0]
+    else:
+        loss_op = tf.add_n(tower_losses) / float(len(models))
+        tf.summary.scalar('loss/tower_average', loss_op)
 
     with tf.name_scope('optimizer'):
         # Let the learning rate decay exponentially.
@@ -215,18 +512,76 @@ def train(model):
         # Create a optimizer.
         optimizer = tf.train.AdamOptimizer(learning_rate)
 
-        # Apply gradient clipping by global norm.
-        gradients, variables = zip(*optimizer.compute_gradients(loss_op))
-        clipped_gradients, _ = tf.clip_by_global_norm(gradients, training_params.gradient_clip_norm)
+        # Scale the losses to prevent float16 gradients from underflowing.
+        loss_scale = None
+        if model_params.mixed_precision:
+            loss_scale = DynamicLossScale(
+                initial_scale=training_params.loss_scale_initial,
+                increment_steps=training_params.loss_scale_increment_steps,
+                factor=training_params.loss_scale_factor)
+            tf.summary.scalar('loss_scale', loss_scale.scale)
+            tower_losses = [loss_scale.scale_loss(tower_loss) for tower_loss in tower_losses]
+
+        # Calculate the gradients of each tower on the towers device and average them.
+        tower_grads_and_vars = [
+            optimizer.compute_gradients(tower_loss, colocate_gradients_with_ops=len(models) > 1)
+            for tower_loss in tower_losses
+        ]
+        grads_and_vars = average_gradients(tower_grads_and_vars)
+
+        if loss_scale is not None:
+            grads_and_vars = loss_scale.unscale_gradients(grads_and_vars)
+
+        # Accumulate the gradients of several micro-batches before applying them.
+        accumulator = None
+        if training_params.accumulation_steps > 1:
+            accumulator = GradientAccumulator(grads_and_vars, training_params.accumulation_steps)
+
+        def __optimizer_step():
+            step_grads_and_vars = grads_and_vars
+            if accumulator is not None:
+                # Use the mean of the accumulated gradients.
+                step_grads_and_vars = accumulator.gradients()
+
+            # Apply gradient clipping by global norm.
+            gradients, variables = zip(*step_grads_and_vars)
+            clipped_gradients, _ = tf.clip_by_global_norm(gradients,
+                                                          training_params.gradient_clip_norm)
+
+            def __apply_gradients():
+                return optimizer.apply_gradients(zip(clipped_gradients, variables), global_step)
+
+            if loss_scale is None:
+                step = __apply_gradients()
+            else:
+                # Skip the update (including the global step increment) if the gradients
+                # overflowed and adjust the loss scale afterwards.
+                finite = loss_scale.all_finite(gradients)
+                step = tf.cond(finite, __apply_gradients, tf.no_op)
+                with tf.control_dependencies([step]):
+                    step = loss_scale.update(finite)
+
+            if accumulator is not None:
+                # Start accumulating from scratch after each optimizer step.
+                with tf.control_dependencies([step]):
+                    step = accumulator.reset()
+
+            return step
 
         # Add dependency on UPDATE_OPS; otherwise batch normalization won't work correctly.
         # See: https://github.com/tensorflow/tensorflow/issues/1122
-        update_ops = tf.get_collection(tf.GraphKeys.UPDATE_OPS)
+        # The towers share the batch normalization statistics, only the first tower updates them.
+        update_scope = TOWER_SCOPE.format(0) if len(models) > 1 else None
+        update_ops = tf.get_collection(tf.GraphKeys.UPDATE_OPS, scope=update_scope)
         with tf.control_dependencies(update_ops):
-            optimize = optimizer.apply_gradients(zip(clipped_gradients, variables), global_step)
+            if accumulator is None:
+                optimize = __optimizer_step()
+            else:
+                # Only every `accumulation_steps`'th micro-batch triggers an optimizer step.
+                optimize = tf.cond(accumulator.ready, __optimizer_step, tf.no_op)
 
     # Create the training session.
-    session = start_session(loss_op=loss_op, summary_op=model.summary())
+    session = start_session(loss_op=loss_op, summary_op=models[0].summary(), hooks=hooks)
 
     # Start training.
     while not session.should_stop():
@@ -238,7 +593,7 @@ def train(model):
     session.close()
 
 
-def start_session(loss_op, summary_op):
+def start_session(loss_op, summary_op, hooks=None):
     """
     Creates a session that can be used for training.
 
@@ -249,24 +604,28 @@ def start_session(loss_op, summary_op):
             A tensor of type `string` containing the serialized `Summary` protocol
             buffer containing all merged model summaries.
 
+        hooks (:obj:`list` of tf.train.SessionRunHook, optional):
+            Additional hooks to run with the session.
+
     Returns:
         tf.train.SingularMonitoredSession
     """
     checkpoint_dir = os.path.join(training_params.checkpoint_dir, training_params.checkpoint_run)
 
+    # NOTE: The saver is only used to restore checkpoints, saving is done by the saver hook.
     saver = tf.train.Saver(
             # NOTE: CUDNN RNNs do not support distributed saving of parameters.
             sharded=False,
             allow_empty=True,
-            max_to_keep=training_params.checkpoints_to_keep,
             save_relative_paths=True
         )
 
-    saver_hook = tf.train.CheckpointSaverHook(
+    saver_hook = AsyncCheckpointSaverHook(
         checkpoint_dir=checkpoint_dir,
-        # save_secs=training_params.checkpoint_save_secs,
         save_steps=training_params.checkpoint_save_steps,
-        saver=saver
+        keep_last=training_params.checkpoints_keep_last,
+        keep_every_steps=training_params.checkpoints_keep_every_steps,
+        max_in_flight=training_params.checkpoint_max_in_flight
     )
 
     summary_hook = tf.train.SummarySaverHook(
@@ -295,7 +654,7 @@ def start_session(loss_op, summary_op):
         saver_hook,
         summary_hook,
         nan_hook,
-        counter_hook],
+        counter_hook] + (hooks or []),
         # Note: When using a monitored session in combination with CUDNN RNNs this needs to be
         # set otherwise the CUDNN RNN does not find a default device to collect variables for
         # saving.
@@ -314,15 +673,35 @@ if __name__ == '__main__':
                                                   char_dict=dataset_params.vocabulary_dict,
                                                   fill_dict=False)
 
+    # Profile the input pipeline and the training steps if requested.
+    training_hooks = []
+    profiler_hook = None
+    if training_params.profile_steps is not None:
+        profiler_hook = StepProfilerHook(
+            output_dir=os.path.join(training_params.checkpoint_dir, training_params.checkpoint_run),
+            every_n_steps=training_params.profile_steps,
+            trace_steps=training_params.profile_trace_steps)
+        training_hooks.append(profiler_hook)
+
     # Create batched placeholders from the dataset.
     with tf.device('/cpu:0'):
-        placeholders, n_samples = batched_placeholders(dataset=train_dataset,
-                                                   max_samples=training_params.max_samples,
-                                                   n_epochs=training_params.n_epochs,
-                                                   batch_size=training_params.batch_size)
-
-    # Create the Tacotron model.
-    tacotron_model = Tacotron(inputs=placeholders, mode=Mode.TRAIN, training_summary=training_params.write_summary)
+        placeholders, n_samples = batched_placeholders(
+            dataset=train_dataset,
+            max_samples=training_params.max_samples,
+            n_epochs=training_params.n_epochs,
+            batch_size=training_params.batch_size,
+            load_latency=None if profiler_hook is None else profiler_hook.load_latency)
+
+    if profiler_hook is not None:
+        placeholders = profiler_hook.watch_inputs(placeholders)
+
+    if training_params.tower_devices is None:
+        # Create the Tacotron model.
+        tacotron_models = [Tacotron(inputs=placeholders, mode=Mode.TRAIN,
+                                    training_summary=training_params.write_summary)]
+    else:
+        # Replicate the Tacotron model for data-parallel training.
+        tacotron_models = create_towers(placeholders, training_params.tower_devices)
 
     # Train the model.
-    train(tacotron_model)
+    train(tacotron_models, hooks=training_hooks)
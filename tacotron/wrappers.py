@@ -122,3 +122,263 @@ class PrenetWrapper(tfc.rnn.RNNCell):
         projected_inputs = pre_net(inputs, self._layers, scope='pre_net', training=self._training)
 
         return self._cell(projected_inputs, state)
+
+
+class SilenceCounterWrapper(tfc.rnn.RNNCell):
+    """
+    RNNCell wrapper counting the number of consecutive near-silent frames the wrapped decoder
+    cell has generated so far.
+
+    The count is carried along with the state of the wrapped cell, so that an inference helper
+    can stop decoding a sequence once it has generated enough silence.
+    """
+
+    def __init__(self, cell, frame_size, reduction_factor, threshold):
+        """
+        Wraps a RNNCell instance and counts the consecutive near-silent output frames.
+
+        Arguments:
+            cell (tensorflow.contrib.rnn.RNNCell):
+                RNN cell to be wrapped. Each output of the cell is expected to contain
+                `reduction_factor` frames with `frame_size` features each.
+
+            frame_size (int):
+                Number of features of a single output frame.
+
+            reduction_factor (int):
+                Number of frames contained in a single output of the cell.
+
+            threshold (float):
+                A frame is considered near-silent if all its (normalized) features are below
+                this value.
+        """
+        super(SilenceCounterWrapper, self).__init__()
+        self._cell = cell
+        self._frame_size = frame_size
+        self._reduction_factor = reduction_factor
+        self._threshold = threshold
+
+    @property
+    def state_size(self):
+        """
+        Get the size(s) of state(s) used by the wrapper.
+
+        Returns:
+            object:
+                Tuple (cell_state_size, 1) of the wrapped cells state size and the size of the
+                silent frame count.
+        """
+        return self._cell.state_size, 1
+
+    @property
+    def output_size(self):
+        """
+        Get the size of the outputs produced by the wrapped cell.
+
+        Returns:
+            object:
+                Integer or TensorShape.
+        """
+        return self._cell.output_size
+
+    def compute_output_shape(self, input_shape):
+        """
+        Computes the output shape of the layer given the input shape.
+
+        Note:
+            - This is function is implemented since it is abstract in the super classes.
+            - This function is unused however.
+
+        Arguments:
+            input_shape: Unused
+        """
+        raise NotImplementedError
+
+    def zero_state(self, batch_size, dtype):
+        """Return zero-filled state tensor(s).
+
+        Arguments:
+          batch_size (object):
+            int, float, or unit Tensor representing the batch size.
+
+          dtype (tf.DType):
+            The data type to use for the state.
+
+        Returns:
+            (cell_state, silent_frames):
+                cell_state:
+                    The zero state of the wrapped cell.
+                silent_frames (tf.Tensor):
+                    A all zero tensor of shape `[batch_size, 1]`.
+        """
+        with tf.name_scope(type(self).__name__ + 'ZeroState', values=[batch_size]):
+            return (self._cell.zero_state(batch_size, dtype),
+                    tf.zeros([batch_size, 1], dtype=dtype))
+
+    def __call__(self, inputs, state, scope=None):
+        """
+        Run this RNN cell on inputs, starting from the given state.
+
+        The inputs are fed unmodified into the wrapped cell.
+
+        Arguments:
+            inputs (tf.Tensor):
+                `2-D` tensor with shape `[batch_size, input_size]`.
+
+            state:
+                Tuple (cell_state, silent_frames) of the wrapped cells state and the number of
+                consecutive near-silent frames generated so far with shape `[batch_size, 1]`.
+
+            scope:
+                Unused.
+
+        Returns:
+            (output, new_state):
+                output (tf.Tensor):
+                    A `2-D` tensor with shape `[batch_size, self.output_size]`.
+                new_state:
+                    Tuple (cell_state, silent_frames) with the updated silent frame count.
+        """
+        cell_state, silent_frames = state
+        output, cell_state = self._cell(inputs, cell_state)
+
+        # Split the output into its frames, shape => (B, r, frame_size).
+        frames = tf.reshape(tf.cast(output, tf.float32),
+                            [-1, self._reduction_factor, self._frame_size])
+
+        # A frame is near-silent if none of its features exceeds the threshold, shape => (B, r).
+        silent = tf.cast(tf.reduce_max(frames, axis=-1) < self._threshold, tf.float32)
+
+        # Count the silent frames at the end of the output, shape => (B, 1).
+        trailing = tf.reduce_sum(tf.cumprod(tf.reverse(silent, axis=[1]), axis=1),
+                                 axis=1, keepdims=True)
+
+        # Continue counting if the whole output is silent, restart counting otherwise.
+        all_silent = tf.equal(trailing, self._reduction_factor)
+        count = tf.where(all_silent, tf.cast(silent_frames, tf.float32) + trailing, trailing)
+
+        return output, (cell_state, tf.cast(count, silent_frames.dtype))
+
+
+class AlignmentCounterWrapper(tfc.rnn.RNNCell):
+    """
+    RNNCell wrapper counting the number of consecutive decoder steps the attention alignment of
+    the wrapped decoder cell focused on the last encoder position (the <EOS> token).
+
+    The count is carried along with the state of the wrapped cell, so that an inference helper
+    can stop decoding a sequence once the attention stayed on the <EOS> token long enough.
+    """
+
+    def __init__(self, cell, sentence_lengths, alignments_fn):
+        """
+        Wraps a RNNCell instance and counts the consecutive steps focusing on the <EOS> token.
+
+        Arguments:
+            cell (tensorflow.contrib.rnn.RNNCell):
+                RNN cell to be wrapped.
+
+            sentence_lengths (tf.Tensor):
+                Number of tokens in each sentence including the <EOS> token, shape=(B).
+
+            alignments_fn (function):
+                Function `alignments_fn(cell_state)` returning the attention alignments of the
+                current step from the state of the wrapped cell, shape=(B, T_sent).
+        """
+        super(AlignmentCounterWrapper, self).__init__()
+        self._cell = cell
+        self._sentence_lengths = sentence_lengths
+        self._alignments_fn = alignments_fn
+
+    @property
+    def state_size(self):
+        """
+        Get the size(s) of state(s) used by the wrapper.
+
+        Returns:
+            object:
+                Tuple (cell_state_size, 1) of the wrapped cells state size and the size of the
+                <EOS> step count.
+        """
+        return self._cell.state_size, 1
+
+    @property
+    def output_size(self):
+        """
+        Get the size of the outputs produced by the wrapped cell.
+
+        Returns:
+            object:
+                Integer or TensorShape.
+        """
+        return self._cell.output_size
+
+    def compute_output_shape(self, input_shape):
+        """
+        Computes the output shape of the layer given the input shape.
+
+        Note:
+            - This is function is implemented since it is abstract in the super classes.
+            - This function is unused however.
+
+        Arguments:
+            input_shape: Unused
+        """
+        raise NotImplementedError
+
+    def zero_state(self, batch_size, dtype):
+        """Return zero-filled state tensor(s).
+
+        Arguments:
+          batch_size (object):
+            int, float, or unit Tensor representing the batch size.
+
+          dtype (tf.DType):
+            The data type to use for the state.
+
+        Returns:
+            (cell_state, eos_steps):
+                cell_state:
+                    The zero state of the wrapped cell.
+                eos_steps (tf.Tensor):
+                    A all zero tensor of shape `[batch_size, 1]`.
+        """
+        with tf.name_scope(type(self).__name__ + 'ZeroState', values=[batch_size]):
+            return (self._cell.zero_state(batch_size, dtype),
+                    tf.zeros([batch_size, 1], dtype=dtype))
+
+    def __call__(self, inputs, state, scope=None):
+        """
+        Run this RNN cell on inputs, starting from the given state.
+
+        The inputs are fed unmodified into the wrapped cell.
+
+        Arguments:
+            inputs (tf.Tensor):
+                `2-D` tensor with shape `[batch_size, input_size]`.
+
+            state:
+                Tuple (cell_state, eos_steps) of the wrapped cells state and the number of
+                consecutive steps focusing on the <EOS> token with shape `[batch_size, 1]`.
+
+            scope:
+                Unused.
+
+        Returns:
+            (output, new_state):
+                output (tf.Tensor):
+                    A `2-D` tensor with shape `[batch_size, self.output_size]`.
+                new_state:
+                    Tuple (cell_state, eos_steps) with the updated <EOS> step count.
+        """
+        cell_state, eos_steps = state
+        output, cell_state = self._cell(inputs, cell_state)
+
+        # Position the attention focuses on after this step, shape => (B).
+        position = tf.argmax(self._alignments_fn(cell_state), axis=-1, output_type=tf.int32)
+
+        # Continue counting while the attention stays on the <EOS> token, restart otherwise.
+        at_eos = tf.expand_dims(position >= self._sentence_lengths - 1, -1)
+        steps = tf.cast(eos_steps, tf.float32)
+        count = tf.where(at_eos, steps + 1.0, tf.zeros_like(steps))
+
+        return output, (cell_state, tf.cast(count, eos_steps.dtype))